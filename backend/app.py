@@ -1,57 +1,255 @@
-from typing import Union, Literal, List, Tuple
-from threading import Thread
-from time import sleep, time
+from typing import Union, List, Tuple, Optional
 from decimal import Decimal
-from flask import Flask, request, render_template
+from datetime import datetime
+from math import ceil
+from itertools import chain
+from time import perf_counter
+from flask import Flask, Response, g, request, render_template, stream_with_context
 from flask_cors import CORS
-from pydantic import BaseModel, ValidationError
-from pydantic_core import ErrorDetails
 from mysql.connector import Error, IntegrityError, DataError, ProgrammingError, DatabaseError
-from utils import http_response, _HTTPResponse
-import enums
+from utils import (
+    http_response, not_modified_response,
+    encode_cursor, decode_cursor, _HTTPResponse
+)
+from health import CircuitBreaker, HealthMonitor, CLOSED, OPEN, BreakerState
+from events import EventBroker, TooManySubscribersError, RESYNC_EVENT, format_sse
+from ratelimit import MemoryBucketStore, SQLiteBucketStore, rate_limit
+from json_provider import FastJSONProvider
+from metrics import REGISTRY, CONTENT_TYPE
+from profiler import RequestProfiler
+from suggest import PrefixIndex
+from stats import CategorySummary, stats_from_totals
+from query import in_
+from enums import ProductSort
+from validation import validate_product, validate_products, validate_bulk, validate_search
+import config
 import db
 
 # pylint: disable=broad-exception-caught,broad-exception-raised
-def is_valide_product_json(
-    product_dict: dict
-) -> Union[Tuple[Literal[True], Literal[None]], Tuple[Literal[False], List[ErrorDetails]]]:
-    """Verifica se um dicionário que representa um produto é valido em tipo."""
-    class BaseProductDict(BaseModel):
-        """Representa a estrutura de um dicionário representando um produto."""
-        name: str
-        price: Union[int, float, Decimal]
-        category: enums.ProductCategory
-    try:
-        _ = BaseProductDict(**product_dict)
-    except ValidationError as VError:
-        return False, VError.errors()
-    return True, None
-
-_db_connected = False
-
 MYSQL_ERRORS = (Error, IntegrityError, DataError, ProgrammingError, DatabaseError)
-COOLDOWN_SECONDS = 2
-routes_cooldowns = {}
+if config.RATE_LIMIT_BACKEND == "sqlite":
+    rate_limit_store = SQLiteBucketStore(
+        config.RATE_LIMIT_SQLITE_PATH, idle_seconds=config.RATE_LIMIT_IDLE_SECONDS
+    )
+else:
+    rate_limit_store = MemoryBucketStore(
+        max_keys=config.RATE_LIMIT_MAX_KEYS, idle_seconds=config.RATE_LIMIT_IDLE_SECONDS
+    )
+write_rate_limit = rate_limit(
+    rate_limit_store,
+    capacity=config.WRITE_RATE_LIMIT_BURST,
+    refill_rate=config.WRITE_RATE_LIMIT_PER_SECOND
+)
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
+app.json = FastJSONProvider(app, config.JSON_BACKEND) # pyright: ignore[reportArgumentType]
 CORS(app, resources={r"/api/*": {"origins": "http://127.0.0.1:5500"}})
 
-def on_test_connection() -> None:
-    """Testa a conexão com o DB."""
-    global _db_connected # pylint: disable=global-statement
-    _has_connected = False
-    while True:
-        if _db_connected is True and _has_connected is False:
+def on_test_connection() -> bool:
+    """Testa a conexão com o DB, inicializando-o na primeira conexão."""
+    if not db.db_has_initialized():
+        try:
             db.init_db()
-            _has_connected = True
-        if db.test_connection():
-            _db_connected = True
-        else:
-            _db_connected = False
-            _has_connected = False
-        sleep(5)
-test_connection = Thread(target=on_test_connection, daemon=True)
-test_connection.start()
+        except MYSQL_ERRORS:
+            return False
+        return True
+    return db.test_connection()
+
+db_breaker = CircuitBreaker(
+    base_backoff=config.HEALTH_BASE_BACKOFF,
+    max_backoff=config.HEALTH_MAX_BACKOFF
+)
+event_broker = EventBroker(
+    queue_size=config.EVENTS_QUEUE_SIZE, max_subscribers=config.EVENTS_MAX_SUBSCRIBERS
+)
+
+def on_breaker_state_changed(old_state: BreakerState, new_state: BreakerState) -> None:
+    """Avisa os clientes de /api/events quando o DB cai ou volta."""
+    if new_state == CLOSED:
+        event_broker.publish("db_up")
+    elif old_state == CLOSED and new_state == OPEN:
+        event_broker.publish("db_down")
+
+db_breaker.add_listener(on_breaker_state_changed)
+db_monitor = HealthMonitor(
+    on_test_connection, db_breaker, interval=config.HEALTH_CHECK_INTERVAL
+)
+
+def load_all_names() -> List[Tuple[int, str]]:
+    """Lê os pares (id, nome) de todos os produtos, para o índice de sugestões."""
+    return [(row["id"], row["name"]) for row in db.iter_select(("id", "name"))]
+
+def load_names(ids: List[int]) -> List[Tuple[int, str]]:
+    """Lê os pares (id, nome) dos produtos de `ids`, para o índice de sugestões."""
+    rows = db.select(("id", "name"), where=[in_("id", ids)]) or []
+    return [(row["id"], row["name"]) for row in rows]
+
+def load_all_prices() -> List[Tuple[int, str, Decimal]]:
+    """Lê a categoria e o preço de todos os produtos, para o resumo por categoria."""
+    return [
+        (row["id"], row["category"], row["price"])
+        for row in db.iter_select(("id", "category", "price"))
+    ]
+
+def load_prices(ids: List[int]) -> List[Tuple[int, str, Decimal]]:
+    """Lê a categoria e o preço dos produtos de `ids`, para o resumo por categoria."""
+    rows = db.select(("id", "category", "price"), where=[in_("id", ids)]) or []
+    return [(row["id"], row["category"], row["price"]) for row in rows]
+
+suggest_index = PrefixIndex(
+    load_all_names, load_names, max_entries=config.SUGGEST_MAX_ENTRIES
+)
+category_summary = CategorySummary(load_all_prices, load_prices)
+
+def on_catalog_changed(ids: Optional[List[int]]) -> None:
+    """Mantém o índice de sugestões e o resumo por categoria iguais ao DB depois de cada escrita."""
+    for view in (suggest_index, category_summary):
+        try:
+            view.refresh(ids)
+        except Exception:
+            # Sem o DB, os dados são descartados e recarregados na próxima leitura.
+            view.invalidate()
+
+# Registrado antes do monitor: depois do `init_db` da primeira conexão,
+# os listeners são avisados e o índice e o resumo são carregados do DB.
+db.add_catalog_listener(on_catalog_changed)
+db_monitor.start()
+
+def publish_products(event_type: str, ids: Optional[List[int]]) -> None:
+    """
+    Publica um evento por produto alterado, com a linha atual do DB
+    (ou só o id, em `product_deleted`). Se os ids forem desconhecidos
+    ou a leitura falhar, publica um `resync` para os clientes
+    recarregarem a tabela.
+    """
+    if ids is None:
+        event_broker.publish(RESYNC_EVENT)
+        return
+    if not ids:
+        return
+    if event_type == "product_deleted":
+        for id_ in ids:
+            event_broker.publish(event_type, {"id": id_})
+        return
+    try:
+        with db.primary_reads():
+            products = db.select(where=[in_("id", ids)]) or []
+    except Exception:
+        event_broker.publish(RESYNC_EVENT)
+        return
+    for product in products:
+        event_broker.publish(event_type, product)
+
+def db_unavailable_response() -> _HTTPResponse:
+    """Resposta 503 enviada enquanto o circuito do DB está aberto."""
+    response, code = http_response(preset="db_connection_error")
+    response.headers["Retry-After"] = str(max(1, ceil(db_breaker.retry_after())))
+    return response, code
+
+def sql_error_response(error: BaseException) -> _HTTPResponse:
+    """Resposta para um erro de SQL, avisando o monitor de saúde do DB."""
+    db_monitor.report_error(error)
+    if not db_breaker.is_available():
+        return db_unavailable_response()
+    return http_response(preset="sql_error", error=error)
+
+http_request_seconds = REGISTRY.histogram(
+    "cantina_http_request_seconds",
+    "Tempo de resposta das requisições, por método e rota.",
+    ("method", "route")
+)
+http_responses = REGISTRY.counter(
+    "cantina_http_responses_total",
+    "Respostas enviadas, por método, rota e código de status.",
+    ("method", "route", "status")
+)
+REGISTRY.stats("cantina_db_pool", "Estatísticas do pool de conexões com o DB", db.pool_stats)
+REGISTRY.stats("cantina_db_cache", "Estatísticas do cache de leituras do DB", db.cache_stats)
+REGISTRY.stats(
+    "cantina_db_statements", "Estatísticas dos comandos preparados", db.statement_cache_stats
+)
+REGISTRY.stats("cantina_db_writes", "Estatísticas do agrupador de escritas", db.write_coalescing_stats)
+REGISTRY.gauge(
+    "cantina_rate_limit_buckets",
+    "Token buckets guardados em memória pelo limitador de requisições.",
+    lambda: len(rate_limit_store) if isinstance(rate_limit_store, MemoryBucketStore) else None
+)
+REGISTRY.gauge(
+    "cantina_event_subscribers", "Clientes conectados em /api/events.", lambda: len(event_broker)
+)
+REGISTRY.gauge(
+    "cantina_db_available", "Se o circuito do DB está fechado (1) ou não (0).",
+    lambda: int(db_breaker.is_available())
+)
+
+request_profiler = RequestProfiler(
+    config.PROFILER_OUTPUT_DIR,
+    sample_rate=config.PROFILER_SAMPLE_RATE,
+    token=config.PROFILER_TOKEN,
+    output_format=config.PROFILER_FORMAT, # pyright: ignore[reportArgumentType]
+    interval=config.PROFILER_INTERVAL_MS / 1000,
+    max_files=config.PROFILER_MAX_FILES
+)
+# Cabeçalho que pede o perfil de uma requisição (com o `PROFILER_TOKEN`).
+PROFILE_HEADER = "X-Cantina-Profile"
+
+@app.before_request
+def start_request_timer() -> None:
+    """Marca o início da requisição, para as métricas."""
+    g.request_start = perf_counter()
+
+@app.before_request
+def bind_db_client() -> None:
+    """Identifica o cliente nas leituras do DB, para que ele leia as próprias escritas."""
+    g.db_client_token = db.bind_client(request.remote_addr)
+
+@app.teardown_request
+def unbind_db_client(_error: Optional[BaseException]) -> None:
+    """Desfaz o `bind_db_client` da requisição."""
+    token = g.pop("db_client_token", None)
+    if token is not None:
+        db.unbind_client(token)
+
+@app.before_request
+def start_request_profile() -> None:
+    """Começa o perfil da requisição, se ela foi escolhida pelo cabeçalho ou por sorteio."""
+    if request_profiler.enabled and request_profiler.should_profile(request.headers.get(PROFILE_HEADER)):
+        g.request_profile = request_profiler.start(f"{request.method}-{request.path}")
+
+@app.after_request
+def finish_request_profile(response: Response) -> Response:
+    """Salva o perfil da requisição e envia o nome do arquivo no cabeçalho `X-Profile-File`."""
+    profile = g.pop("request_profile", None)
+    if profile is not None:
+        response.headers["X-Profile-File"] = profile.stop()
+    return response
+
+@app.teardown_request
+def discard_request_profile(_error: Optional[BaseException]) -> None:
+    """Encerra o perfil de uma requisição que terminou sem passar pelo `after_request`."""
+    profile = g.pop("request_profile", None)
+    if profile is not None:
+        profile.stop()
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    """
+    Registra o tempo e o código de status da resposta. A rota é o
+    padrão da URL (ex.: `/api/products/<int:id_>`), não o caminho,
+    para não criar uma série por id. Em respostas em streaming, o
+    tempo vai até o início do envio.
+    """
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        http_request_seconds.observe(perf_counter() - start, request.method, route)
+        http_responses.inc(request.method, route, str(response.status_code))
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Rota com as métricas da aplicação no formato de texto do Prometheus."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 @app.route("/")
 def index():
@@ -71,137 +269,507 @@ def test():
 @app.route("/api/test/db", methods=["GET"])
 def test_db():
     """Rota para testar a conexão com o DB."""
-    if db.test_connection():
+    if db_breaker.is_available():
         return http_response()
-    return http_response(preset="db_connection_error")
+    return db_unavailable_response()
+
+@app.route("/api/test/db/pool", methods=["GET"])
+def test_db_pool():
+    """Rota com as estatísticas do pool de conexões com o DB."""
+    return http_response(data=db.pool_stats() or {})
+
+@app.route("/api/test/db/statements", methods=["GET"])
+def test_db_statements():
+    """Rota com as estatísticas dos comandos preparados das conexões com o DB."""
+    return http_response(data=db.statement_cache_stats())
+
+@app.route("/api/test/db/cache", methods=["GET"])
+def test_db_cache():
+    """Rota com as estatísticas do cache de leituras do DB."""
+    return http_response(data=db.cache_stats() or {})
+
+@app.route("/api/test/db/writes", methods=["GET"])
+def test_db_writes():
+    """Rota com as estatísticas do agrupador de escritas do DB."""
+    return http_response(data=db.write_coalescing_stats() or {})
+
+@app.route("/api/test/db/replicas", methods=["GET"])
+def test_db_replicas():
+    """Rota com as estatísticas das réplicas de leitura do DB."""
+    return http_response(data=db.replica_stats())
+
+@app.route("/api/test/db/slow", methods=["GET"])
+def test_db_slow():
+    """Rota com os últimos comandos lentos do DB."""
+    return http_response(data=db.slow_queries())
+
+def catalog_etag() -> str:
+    """
+    Retorna o ETag de uma leitura do catálogo. Só uma revalidação
+    (`If-None-Match`) lê a versão atual do primário; as outras
+    leituras usam a versão conhecida pelo processo, sem ir ao DB.
+    """
+    if request.if_none_match:
+        return db.catalog_version()
+    return db.known_catalog_version()
+
+def with_etag(result: _HTTPResponse, etag: str) -> _HTTPResponse:
+    """
+    Adiciona o ETag de uma leitura a uma resposta. Logo depois de uma
+    escrita, a leitura pode ter vindo de uma réplica atrasada e fica sem ETag.
+    """
+    response, code = result
+    if 200 <= code <= 299 and not db.reads_may_be_stale():
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response, code
+
+def get_page_args() -> Tuple[int, Optional[int]]:
+    """
+    Lê `limit` e `cursor` (ou `after_id`) da query string.
+
+    Raises:
+        ValueError: Algum dos argumentos é inválido.
+    """
+    limit = int(request.args.get("limit", config.PRODUCTS_PAGE_SIZE))
+    if not 1 <= limit <= config.PRODUCTS_MAX_PAGE_SIZE:
+        raise ValueError(f"`limit` deve estar entre 1 e {config.PRODUCTS_MAX_PAGE_SIZE}.")
+    after_id = request.args.get("after_id")
+    cursor = request.args.get("cursor")
+    if cursor is not None:
+        after_id = decode_cursor(cursor).get("after_id")
+    if after_id is not None:
+        after_id = int(after_id)
+    return limit, after_id
 
 @app.route("/api/products", methods=["GET"])
 def list_all_products() -> _HTTPResponse:
+    """
+    Rota para listar os produtos em páginas ordenadas por id.
+    A próxima página é pedida com o `next_cursor` da resposta.
+    """
     try:
-        all_products = db.select()
-        if not all_products:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        try:
+            limit, after_id = get_page_args()
+        except ValueError as e:
+            return http_response(400, "Parâmetros de paginação inválidos.", error=e)
+        # A versão é lida antes da consulta: se uma escrita acontecer no
+        # meio, o ETag fica mais antigo que o corpo, nunca mais novo.
+        etag = catalog_etag()
+        if request.if_none_match.contains(etag):
+            return not_modified_response(etag)
+        # Busca um item a mais para saber se existe uma próxima página.
+        products = db.select(limit=limit + 1, after_id=after_id) or []
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = encode_cursor({"after_id": products[-1]["id"]})
+        if not products and after_id is None:
             return http_response(204, "Nenhum produto foi criado ainda.", data=[])
-        return http_response(200, data=all_products)
+        return with_etag(
+            http_response(200, data=products, extra={"next_cursor": next_cursor}), etag
+        )
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
+
+@app.route("/api/products/search", methods=["GET"])
+def search_products() -> _HTTPResponse:
+    """
+    Rota para buscar produtos por categoria (`category`), faixa de
+    preço (`min_price`, `max_price`) e prefixo do nome (`name`),
+    com ordenação (`sort`, ex.: `-price`) e limite (`limit`).
+    """
+    args, error = validate_search(request.args.to_dict())
+    if args is None:
+        return http_response(400, "Parâmetros de busca inválidos.", error=error)
+    try:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        etag = catalog_etag()
+        if request.if_none_match.contains(etag):
+            return not_modified_response(etag)
+        products = db.search(
+            category=args.category, min_price=args.min_price, max_price=args.max_price,
+            name_prefix=args.name, sort=args.sort, limit=args.limit
+        ) or []
+        return with_etag(http_response(200, data=products), etag)
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
+
+@app.route("/api/products/suggest", methods=["GET"])
+def suggest_products() -> _HTTPResponse:
+    """
+    Rota com sugestões de nomes de produtos que começam com `q`,
+    sem acentos e sem diferenciar maiúsculas, até `limit` nomes.
+    """
+    prefix = request.args.get("q", "").lstrip()
+    try:
+        limit = int(request.args.get("limit", config.SUGGEST_LIMIT))
+        if not 1 <= limit <= config.SUGGEST_MAX_LIMIT:
+            raise ValueError(f"`limit` deve estar entre 1 e {config.SUGGEST_MAX_LIMIT}.")
+    except ValueError as e:
+        return http_response(400, "Parâmetros de sugestão inválidos.", error=e)
+    if not prefix:
+        return http_response(200, data=[])
+    try:
+        if not suggest_index.loaded or not suggest_index.complete:
+            if not db_breaker.is_available():
+                return db_unavailable_response()
+            if not suggest_index.loaded:
+                suggest_index.reload()
+        if suggest_index.complete:
+            suggestions = suggest_index.suggest(prefix, limit)
+        else:
+            # O índice não guarda todos os nomes: a busca vai para o DB.
+            products = db.search(name_prefix=prefix, sort=ProductSort.NAME, limit=limit) or []
+            suggestions = [{"id": product["id"], "name": product["name"]} for product in products]
+        return http_response(200, data=suggestions)
     except MYSQL_ERRORS as e:
-        return http_response(preset="sql_error", error=e)
+        return sql_error_response(e)
     except Exception as e:
         return http_response(preset="generic_internal_error", error=e)
 
+@app.route("/api/products/stats", methods=["GET"])
+def products_stats() -> _HTTPResponse:
+    """
+    Rota com a contagem e os preços mínimo, médio e máximo de cada
+    categoria. Com `fresh=true`, recalcula tudo no DB com `GROUP BY`
+    e confere o resumo em memória, recarregando-o se estiver diferente.
+    """
+    fresh = request.args.get("fresh", "").lower() in ("1", "true")
+    try:
+        if fresh or not category_summary.loaded:
+            if not db_breaker.is_available():
+                return db_unavailable_response()
+        if fresh:
+            stats = stats_from_totals(db.category_totals())
+            if category_summary.loaded and category_summary.stats() != stats:
+                category_summary.reload()
+            return http_response(200, data=stats)
+        if not category_summary.loaded:
+            category_summary.reload()
+        return http_response(200, data=category_summary.stats())
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
+
+def get_changes_args() -> Tuple[int, Optional[db.ChangesCursor]]:
+    """
+    Lê `limit` e `since` (um cursor de `next_cursor`) da query string.
+
+    Raises:
+        ValueError: Algum dos argumentos é inválido.
+    """
+    limit = int(request.args.get("limit", config.CHANGES_PAGE_SIZE))
+    if not 1 <= limit <= config.CHANGES_MAX_PAGE_SIZE:
+        raise ValueError(f"`limit` deve estar entre 1 e {config.CHANGES_MAX_PAGE_SIZE}.")
+    since = request.args.get("since")
+    if since is None:
+        return limit, None
+    cursor = decode_cursor(since)
+    try:
+        return limit, (datetime.fromisoformat(cursor["t"]), int(cursor["id"]))
+    except (KeyError, TypeError) as e:
+        raise ValueError("Cursor inválido.") from e
+
+@app.route("/api/products/changes", methods=["GET"])
+def product_changes() -> _HTTPResponse:
+    """
+    Rota com os produtos criados ou alterados (`upserted`) e os ids
+    apagados (`deleted`) depois do cursor `since`. Sem `since`, só
+    retorna o cursor atual. A resposta traz o próximo cursor em
+    `next_cursor` e, se ainda houver mudanças, `has_more`. Um cursor
+    antigo demais recebe 410: o cliente deve recarregar tudo.
+    """
+    try:
+        limit, since = get_changes_args()
+    except ValueError as e:
+        return http_response(400, "Parâmetros de sincronização inválidos.", error=e)
+    try:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        changes = db.changes(since, limit)
+    except db.ChangesExpiredError as e:
+        return http_response(410, "Cursor expirado.", error=e)
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
+    next_moment, next_id = changes["next_cursor"]
+    return http_response(
+        200,
+        data={"upserted": changes["upserted"], "deleted": changes["deleted"]},
+        extra={
+            "next_cursor": encode_cursor({"t": next_moment.isoformat(), "id": next_id}),
+            "has_more": changes["has_more"]
+        }
+    )
+
+@app.route("/api/products/export", methods=["GET"])
+def export_products() -> Union[Response, _HTTPResponse]:
+    """
+    Rota para exportar todos os produtos em streaming, como
+    NDJSON (`format=ndjson`, padrão) ou como um array JSON
+    (`format=json`), sem carregar a tabela inteira na memória.
+    """
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "json"):
+        return http_response(400, "Formato inválido. Use `ndjson` ou `json`.")
+    try:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        etag = catalog_etag()
+        if request.if_none_match.contains(etag):
+            return not_modified_response(etag)
+        rows = db.iter_select()
+        # Lê a primeira linha antes de responder para que erros de
+        # conexão ainda possam virar uma resposta de erro.
+        first_row = next(rows, None)
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
+    all_rows = rows if first_row is None else chain((first_row,), rows)
+
+    def generate_ndjson():
+        for row in all_rows:
+            yield app.json.dumps(row) + "\n"
+
+    def generate_json():
+        yield "["
+        for i, row in enumerate(all_rows):
+            yield ("," if i else "") + app.json.dumps(row)
+        yield "]"
+
+    if export_format == "ndjson":
+        response = Response(
+            stream_with_context(generate_ndjson()), mimetype="application/x-ndjson"
+        )
+    else:
+        response = Response(stream_with_context(generate_json()), mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 @app.route("/api/products", methods=["POST"])
+@write_rate_limit
 def create_product() -> _HTTPResponse:
     """Rota para criar um produto novo."""
-    route_ip = request.remote_addr
-    last_use = routes_cooldowns.get(route_ip, 0)
-    current_time = time()
-    time_execute = current_time - last_use
-    if time_execute < COOLDOWN_SECONDS:
-        return http_response(
-            200, f"Tente novamente em {(COOLDOWN_SECONDS - time_execute):.2} segundos."
-        )
-    routes_cooldowns[route_ip] = current_time
     try:
-        if not _db_connected:
-            return http_response(preset="db_connection_error")
+        if not db_breaker.is_available():
+            return db_unavailable_response()
         new_data: dict = request.get_json(silent=True)
         if new_data is None:
             return http_response(preset="bad_json")
-        is_valide, error = is_valide_product_json(new_data)
-        if not is_valide:
+        fields, error = validate_product(new_data)
+        if fields is None:
             return http_response(
                 400,
                 "Os dados estão inválidos.",
                 error=error
             )
         try:
-            new_id = db.insert(**new_data)
-        except MYSQL_ERRORS as e:
+            product = db.insert_row(**fields)
+        except IntegrityError as e:
             return http_response(409, "Esse produto já existe", error=e)
-        if new_id is None:
-            raise Exception("Produto não encontrado no primeiro processo.")
-        data = db.select(id=new_id)
-        if data is None:
-            raise Exception("Produto não encontrado no segundo processo.")
-        return http_response(201, "Produto criado.", data=data[0])
+        if product["id"] is None:
+            raise Exception("Produto não encontrado após a inserção.")
+        event_broker.publish("product_created", product)
+        return http_response(201, "Produto criado.", data=product)
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
+
+
+@app.route("/api/products/batch", methods=["POST"])
+@write_rate_limit
+def create_products_batch() -> _HTTPResponse:
+    """
+    Rota para criar vários produtos numa única transação.
+    Aceita uma lista de produtos (ou `{"products": [...]}`) e
+    responde com o resultado de cada item.
+    """
+    try:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        new_data = request.get_json(silent=True)
+        if isinstance(new_data, dict):
+            new_data = new_data.get("products")
+        if not isinstance(new_data, list) or not new_data:
+            return http_response(preset="bad_json")
+        if len(new_data) > config.PRODUCTS_MAX_BATCH_SIZE:
+            return http_response(
+                413, f"O lote deve ter no máximo {config.PRODUCTS_MAX_BATCH_SIZE} produtos."
+            )
+        results: List[Optional[dict]] = [None] * len(new_data)
+        fields, errors = validate_products(new_data)
+        for i, error in errors.items():
+            results[i] = {"index": i, "success": False, "error": error}
+        valid_indexes = [i for i, product in enumerate(fields) if product is not None]
+        inserted = db.insert_many([fields[i] for i in valid_indexes]) # pyright: ignore[reportArgumentType]
+        for i, result in zip(valid_indexes, inserted):
+            if result["error"] is None:
+                results[i] = {"index": i, "success": True, "id": result["id"]}
+            else:
+                results[i] = {"index": i, "success": False, "error": result["error"]}
+        publish_products(
+            "product_created", [result["id"] for result in inserted if result["id"] is not None]
+        )
+        created = sum(1 for result in results if result and result["success"])
+        return http_response(
+            201 if created == len(results) else 207,
+            f"{created} de {len(results)} produtos criados.",
+            data=results,
+            extra={"created": created, "failed": len(results) - created}
+        )
     except MYSQL_ERRORS as e:
-        return http_response(preset="sql_error", error=e)
+        return sql_error_response(e)
     except Exception as e:
         return http_response(preset="generic_internal_error", error=e)
 
+@app.route("/api/products", methods=["PATCH", "DELETE"])
+@write_rate_limit
+def bulk_products() -> _HTTPResponse:
+    """
+    Rota para atualizar (PATCH) ou apagar (DELETE) vários produtos
+    de uma vez, por lista de `ids` e/ou `filter`. O PATCH aceita
+    novos valores em `set` e uma mudança relativa em `price_factor`.
+    """
+    try:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        new_data = request.get_json(silent=True)
+        if not isinstance(new_data, dict):
+            return http_response(preset="bad_json")
+        is_update = request.method == "PATCH"
+        parsed, error = validate_bulk(new_data, is_update=is_update)
+        if parsed is None:
+            return http_response(400, "Os dados estão inválidos.", error=error)
+        filters = parsed.filter.model_dump(exclude_none=True) if parsed.filter else None
+        try:
+            if is_update:
+                set_fields = parsed.set.model_dump(exclude_none=True) if parsed.set else {}
+                affected_lines = db.update_many(
+                    ids=parsed.ids,
+                    filters=filters,
+                    price_factor=parsed.price_factor,
+                    **set_fields
+                )
+            else:
+                affected_lines = db.delete_many(ids=parsed.ids, filters=filters)
+        except ValueError as e:
+            return http_response(400, "Os dados estão inválidos.", error=e)
+        if affected_lines:
+            publish_products(
+                "product_updated" if is_update else "product_deleted",
+                None if filters else parsed.ids
+            )
+        message = "Produtos atualizados." if is_update else "Produtos apagados."
+        return http_response(200, message, data={"affected": affected_lines})
+    except MYSQL_ERRORS as e:
+        return sql_error_response(e)
+    except Exception as e:
+        return http_response(preset="generic_internal_error", error=e)
 
 @app.route("/api/products/<int:id_>", methods=["GET"])
 def get_product(id_: int) -> _HTTPResponse:
     try:
-        if not _db_connected:
-            return http_response(preset="db_connection_error")
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        etag = catalog_etag()
+        if request.if_none_match.contains(etag):
+            return not_modified_response(etag)
         product = db.select("*", id=id_)
         if product is None:
             return http_response(404, "Produto não encontrado.")
-        return http_response(message="Produto encontrado.", data=product[0])
+        return with_etag(http_response(message="Produto encontrado.", data=product[0]), etag)
     except MYSQL_ERRORS as e:
-        return http_response(preset="sql_error", error=e)
+        return sql_error_response(e)
     except Exception as e:
         return http_response(preset="generic_internal_error", error=e)
 
 @app.route("/api/products/<int:id_>", methods=["PUT"])
+@write_rate_limit
 def update_product(id_: int) -> _HTTPResponse:
     """Rota para atualizar um produto."""
-    route_ip = request.remote_addr
-    last_use = routes_cooldowns.get(route_ip, 0)
-    current_time = time()
-    time_execute = current_time - last_use
-    if time_execute < COOLDOWN_SECONDS:
-        return http_response(
-            200, f"Tente novamente em {(COOLDOWN_SECONDS - time_execute):.2} segundos."
-        )
-    routes_cooldowns[route_ip] = current_time
     try:
-        if not _db_connected:
-            return http_response(preset="db_connection_error")
+        if not db_breaker.is_available():
+            return db_unavailable_response()
         new_data: dict = request.get_json(silent=True)
         if new_data is None:
             return http_response(preset="bad_json")
-        is_valide, error = is_valide_product_json(new_data)
-        if not is_valide:
+        fields, error = validate_product(new_data, partial=True)
+        if fields is None:
             return http_response(
                 400,
                 "Os dados estão inválidos.",
                 error=error
             )
-        affected_lines = db.update(("id", id_), **new_data)
+        affected_lines = db.update(("id", id_), **fields)
         if affected_lines in [0, None]:
             return http_response(404, error="Produto não encontrado.")
+        publish_products("product_updated", [id_])
         return http_response(204, "Produto atualizado.")
     except MYSQL_ERRORS as e:
-        return http_response(preset="sql_error", error=e)
+        return sql_error_response(e)
     except Exception as e:
         return http_response(preset="generic_internal_error", error=e)
 
 @app.route("/api/products/<int:id_>", methods=["DELETE"])
+@write_rate_limit
 def delete_product(id_: int) -> _HTTPResponse:
     """Rota para apagar um produto por id."""
-    route_ip = request.remote_addr
-    last_use = routes_cooldowns.get(route_ip, 0)
-    current_time = time()
-    time_execute = current_time - last_use
-    if time_execute < COOLDOWN_SECONDS:
-        return http_response(
-            200, f"Tente novamente em {(COOLDOWN_SECONDS - time_execute):.2} segundos."
-        )
-    routes_cooldowns[route_ip] = current_time
     try:
-        if not _db_connected:
-            return http_response(preset="db_connection_error")
-        product = db.select(id=id_)
-        if product is None:
+        if not db_breaker.is_available():
+            return db_unavailable_response()
+        if not db.delete(("id", id_)):
             return http_response(404, error="Produto não encontado.")
-        db.delete(("id", id_))
+        publish_products("product_deleted", [id_])
         return http_response(204, "O produto foi deletado.")
     except MYSQL_ERRORS as e:
-        return http_response(preset="sql_error", error=e)
+        return sql_error_response(e)
     except Exception as e:
         return http_response(preset="generic_internal_error", error=e)
 
+@app.route("/api/events", methods=["GET"])
+def events() -> Union[Response, _HTTPResponse]:
+    """
+    Rota de Server-Sent Events com as mudanças dos produtos
+    (`product_created`, `product_updated`, `product_deleted` e
+    `resync`) e da conexão com o DB (`db_up` e `db_down`). O
+    primeiro evento é o estado atual do DB.
+    """
+    try:
+        subscription = event_broker.subscribe()
+    except TooManySubscribersError as e:
+        return http_response(503, "Muitas conexões de eventos abertas.", error=e)
+    db_state_event = "db_up" if db_breaker.is_available() else "db_down"
+
+    def generate():
+        yield "retry: 3000\n"
+        yield format_sse({"id": 0, "type": db_state_event, "data": None}, app.json.dumps)
+        while True:
+            event = subscription.get(timeout=config.EVENTS_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_sse(event, app.json.dumps)
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    # Roda quando o cliente desconecta, mesmo que o gerador nem tenha começado.
+    response.call_on_close(subscription.close)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 # pylint: enable=broad-exception-caught,broad-exception-raised
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+"""
+Esse módulo contém um cache LRU thread-safe com expiração (TTL)
+e invalidação por tags.
+"""
+from typing import (
+    Any, Callable, Dict,
+    Hashable, Iterable, Set,
+    Tuple, TypedDict
+)
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+# Valor retornado por `get` quando a chave não está no cache.
+MISSING = object()
+
+class CacheStatsDict(TypedDict):
+    """Representa um dicionário tipado com as estatísticas de um cache."""
+    size: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    generation: int
+
+class TaggedLRUCache:
+    """
+    Cache LRU com TTL. Cada entrada recebe tags, usadas para
+    invalidar apenas as entradas afetadas por uma escrita.
+
+    A `generation` aumenta a cada invalidação. Uma leitura que
+    começou antes de uma invalidação não é guardada (veja `set`),
+    evitando que um valor antigo volte para o cache.
+    """
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._entries: OrderedDict[Hashable, Tuple[float, Any, Tuple[Hashable, ...]]] = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """Contador de invalidações do cache."""
+        return self._generation
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove uma entrada e suas tags. Deve ser chamado com o lock."""
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna o valor guardado na chave ou `MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return MISSING
+            if entry[0] <= self._clock():
+                self._remove(key)
+                self._evictions += 1
+                self._misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        tags: Iterable[Hashable] = (),
+        generation: int
+    ) -> bool:
+        """
+        Guarda um valor com as tags indicadas. `generation` deve ser o
+        valor de `self.generation` lido antes de buscar o valor; se
+        houve uma invalidação desde então, nada é guardado.
+
+        Returns:
+            (bool): Se o valor foi guardado.
+        """
+        tags = tuple(tags)
+        with self._lock:
+            if generation != self._generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            return True
+
+    def invalidate_tags(self, *tags: Hashable) -> None:
+        """Remove todas as entradas com alguma das tags indicadas."""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> CacheStatsDict:
+        """Retorna as estatísticas atuais do cache."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "generation": self._generation
+            }
@@ -0,0 +1,152 @@
+"""
+Esse módulo contém o agrupador de escritas (group commit): escritas
+concorrentes que chegam dentro de uma pequena janela de tempo são
+executadas juntas, numa única transação e com um único commit.
+"""
+from typing import Any, Callable, List, Tuple, TypedDict, Union
+from concurrent.futures import Future
+from queue import Queue, Empty, Full
+from threading import Thread, Lock
+from time import monotonic
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+# Uma escrita: recebe o contexto do lote (ex.: a transação) e retorna o resultado.
+Operation = Callable[[Any], Any]
+# Executa um lote e retorna, na mesma ordem, o resultado ou o erro de cada escrita.
+BatchRunner = Callable[[List[Operation]], List[Union[Any, BaseException]]]
+
+class CoalescerStatsDict(TypedDict):
+    """Estatísticas do agrupador de escritas."""
+    batches: int
+    operations: int
+    largest_batch: int
+    queued: int
+
+class WriteQueueFullError(Exception):
+    """A fila de escritas ficou cheia durante todo o tempo de espera."""
+
+_STOP = object()
+
+# * ===========================
+# * == AGRUPADOR DE ESCRITAS ==
+# * ===========================
+
+class WriteCoalescer:
+    """
+    Fila de escritas com uma thread que as executa em lotes. A thread
+    espera a primeira escrita e junta as que chegarem nos próximos
+    `linger_seconds`, até `max_batch` escritas, e passa o lote para
+    `run_batch`, que deve executá-lo numa única transação. Cada quem
+    chamou `execute` recebe o seu próprio resultado ou erro.
+
+    A fila tem no máximo `queue_size` escritas: quando ela enche,
+    `execute` espera até `enqueue_timeout` segundos por uma vaga.
+    As escritas não devem chamar `execute`, pois rodam na própria
+    thread do agrupador.
+    """
+    def __init__(
+        self,
+        run_batch: BatchRunner,
+        *,
+        max_batch: int = 64,
+        linger_seconds: float = 0.002,
+        queue_size: int = 1024,
+        enqueue_timeout: float = 5.0
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("`max_batch` deve ser maior que zero.")
+        self._run_batch = run_batch
+        self.max_batch = max_batch
+        self.linger_seconds = linger_seconds
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Queue[Union[Tuple[Operation, Future], object]] = Queue(maxsize=queue_size)
+        self._batches = 0
+        self._operations = 0
+        self._largest_batch = 0
+        self._stats_lock = Lock()
+        self._thread = Thread(target=self._run, name="db-write-coalescer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation: Operation) -> Future:
+        """
+        Coloca uma escrita na fila e retorna o `Future` do seu resultado.
+
+        Raises:
+            WriteQueueFullError: Não houve vaga na fila a tempo.
+        """
+        future: Future = Future()
+        try:
+            self._queue.put((operation, future), timeout=self.enqueue_timeout)
+        except Full as e:
+            raise WriteQueueFullError("A fila de escritas está cheia.") from e
+        return future
+
+    def execute(self, operation: Operation) -> Any:
+        """Executa uma escrita num lote e espera o seu resultado (ou erro)."""
+        return self.submit(operation).result()
+
+    def close(self) -> None:
+        """Executa as escritas que já estão na fila e encerra a thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> CoalescerStatsDict:
+        """Retorna as estatísticas dos lotes executados."""
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "operations": self._operations,
+                "largest_batch": self._largest_batch,
+                "queued": self._queue.qsize()
+            }
+
+    def _collect(self, first: Tuple[Operation, Future]) -> Tuple[List[Tuple[Operation, Future]], bool]:
+        """Junta ao lote as escritas que chegarem dentro da janela. Retorna o lote e se deve parar."""
+        batch = [first]
+        deadline = monotonic() + self.linger_seconds
+        while len(batch) < self.max_batch:
+            remaining = deadline - monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item) # pyright: ignore[reportArgumentType]
+        return batch, False
+
+    def _run(self) -> None:
+        """Laço principal da thread."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch, should_stop = self._collect(item) # pyright: ignore[reportArgumentType]
+            self._execute_batch(batch)
+            if should_stop:
+                return
+
+    def _execute_batch(self, batch: List[Tuple[Operation, Future]]) -> None:
+        """Executa um lote e entrega o resultado de cada escrita."""
+        batch = [(operation, future) for operation, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        with self._stats_lock:
+            self._batches += 1
+            self._operations += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+        try:
+            results = self._run_batch([operation for operation, _ in batch])
+        except Exception as e: # pylint: disable=broad-exception-caught
+            # O lote inteiro falhou (ex.: o commit): todos recebem o erro.
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
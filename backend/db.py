@@ -7,39 +7,133 @@ from typing import (
     Union, TypeAlias,
     Literal, List, Dict,
     Unpack, TypedDict,
-    Tuple, Optional
+    Tuple, Optional, Iterator,
+    Sequence, Iterable, Callable, Any, TypeVar
 )
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 import datetime
+import re
+import time
 from enum import Enum
-from mysql.connector import connect
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from threading import Lock
 from mysql.connector.pooling import PooledMySQLConnection
-from mysql.connector.errors import DatabaseError
+from mysql.connector.errors import Error, IntegrityError, DataError
 from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
-from enums import ProductCategory
-from utils import to_unique_depth, get_even_elements, get_odd_elements
+from enums import ProductCategory, ProductSort
+from utils import fold_text
+from pool import ConnectionPool, PoolStatsDict, PoolTimeoutError
+from cache import TaggedLRUCache, CacheStatsDict, MISSING
+from statements import PreparedStatementCache, StatementCacheStatsDict
+from coalescer import WriteCoalescer, CoalescerStatsDict
+from stats import CategoryTotalsDict
+from metrics import REGISTRY
+from slowlog import SlowQueryLog, SlowQueryDict
+from storage import (
+    StorageBackend, SQLiteConnection, create_backend, backend_from_dsn, backends_from_dsns
+)
+from routing import ReplicaRouter, RecentWriters, ReplicaStatsDict
+from health import is_connection_error
+from query import Condition, Table, eq, ge, gt, in_, le, lt, starts_with
+import config
 
 # * ==============================
 # * == INICIALIZANDO CONSTANTES ==
 # * ==============================
 
 _INITIZALIED = False
-_DATABASE_NAME = "cantina_escolar"
 _TABLE_NAME = 'produtos'
 _TABLE_NAME_REFERENCE = f"`{_TABLE_NAME}`"
 _TABLE_COLUMNS = ("name", "category", "price")
-_DATABASE_NAME_REFERENCE = f"`{_DATABASE_NAME}`"
+_TABLE = Table(_TABLE_NAME, ("id", *_TABLE_COLUMNS, "time_stamp"), decimal_columns=("price",))
+_PRICE_QUANTUM = Decimal("0.01")
+# Registros dos produtos apagados, preenchidos por um trigger (veja `schema.sql`).
+_TOMBSTONE_TABLE_REFERENCE = "`produtos_removidos`"
+# Versão do catálogo, avançada uma vez por transação de escrita (veja `schema.sql`).
+_CATALOG_VERSION_TABLE_REFERENCE = "`catalogo_versao`"
+# Onde os produtos ficam (MySQL ou SQLite): o primário, que recebe as escritas.
+_BACKEND: StorageBackend = (
+    backend_from_dsn(config.DB_PRIMARY_DSN) if config.DB_PRIMARY_DSN
+    else create_backend(config.DB_BACKEND)
+)
+# Réplicas de leitura, por nome (o DSN sem senha). Os pools delas e a
+# escolha de cada leitura ficam em `_REPLICAS`, criado na primeira leitura.
+_REPLICA_BACKENDS: Dict[str, StorageBackend] = backends_from_dsns(config.DB_REPLICA_DSNS.split(","))
+_REPLICA_OPTIONS: Dict[str, Union[str, float]] = {}
+_REPLICAS: Optional[ReplicaRouter[ConnectionPool]] = None
+_REPLICAS_LOCK = Lock()
+# Clientes que escreveram há pouco: as leituras deles vão ao primário.
+_RECENT_WRITERS = RecentWriters(config.DB_READ_YOUR_WRITES_MS / 1000)
+# Cliente das leituras e escritas do contexto atual (ex.: o IP da requisição).
+_CLIENT: ContextVar[Optional[str]] = ContextVar("cantina_db_client", default=None)
+# Se as leituras do contexto atual devem ir ao primário (veja `primary_reads`).
+_PRIMARY_READS: ContextVar[bool] = ContextVar("cantina_db_primary_reads", default=False)
+_POOL: Optional[ConnectionPool] = None
+_POOL_LOCK = Lock()
+# Cache de comandos preparados de cada conexão do pool, por `id(conexão)`.
+_STATEMENT_CACHES: Dict[int, PreparedStatementCache] = {}
+_STATEMENT_CACHES_LOCK = Lock()
+# Agrupador de escritas, criado na primeira escrita se estiver ligado.
+_COALESCER: Optional[WriteCoalescer] = None
+_COALESCING_ENABLED = config.WRITE_COALESCING_ENABLED
+_COALESCER_OPTIONS: Dict[str, Union[int, float]] = {}
+_COALESCER_LOCK = Lock()
+_CACHE: Optional[TaggedLRUCache] = TaggedLRUCache(
+    max_entries=config.CACHE_MAX_ENTRIES,
+    ttl_seconds=config.CACHE_TTL_SECONDS
+) if config.CACHE_ENABLED else None
+# Tag das consultas que não são por um único id (listas e filtros).
+_LIST_CACHE_TAG = "list"
+# Versão do catálogo com que o cache está de acordo: as escritas até ela
+# já foram invalidadas. None quando desconhecida (ex.: antes da primeira).
+_CATALOG_VERSION: Optional[int] = None
+_CATALOG_VERSION_LOCK = Lock()
+# Callbacks chamados depois de cada escrita (veja `add_catalog_listener`).
+_CATALOG_LISTENERS: List[Callable[[Optional[List[int]]], None]] = []
+# Momento (`time.monotonic`) da última limpeza dos registros de exclusão.
+_LAST_TOMBSTONE_PURGE: Optional[float] = None
+_TOMBSTONE_PURGE_INTERVAL = 3600.0
+# Latências das conexões, dos comandos e dos commits (exportadas em GET /metrics).
+_CONNECT_SECONDS = REGISTRY.histogram(
+    "cantina_db_connect_seconds",
+    "Tempo para obter uma conexão com o DB, do pool ou global.",
+    ("source",)
+)
+_QUERY_SECONDS = REGISTRY.histogram(
+    "cantina_db_query_seconds",
+    "Tempo de execução dos comandos no DB, pelo formato do comando.",
+    ("statement",)
+)
+_COMMIT_SECONDS = REGISTRY.histogram(
+    "cantina_db_commit_seconds",
+    "Tempo do commit (ou rollback) ao encerrar uma conexão.",
+    ("action",)
+)
+# Registro dos comandos lentos. A lambda adia a busca de `_explain_query`,
+# definida mais abaixo.
+_SLOW_QUERY_LOG: Optional[SlowQueryLog] = SlowQueryLog(
+    threshold_seconds=config.SLOW_QUERY_THRESHOLD_MS / 1000,
+    max_entries=config.SLOW_QUERY_MAX_ENTRIES,
+    explain=(lambda cmd, values: _explain_query(cmd, values)) if config.SLOW_QUERY_EXPLAIN else None # pylint: disable=unnecessary-lambda
+) if config.SLOW_QUERY_LOG_ENABLED else None
+# Listas de `%s` (ex.: `IN (%s, %s, %s)`) e espaços repetidos num comando.
+_PLACEHOLDER_LIST_PATTERN = re.compile(r"%s(?:\s*,\s*%s)+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
 
 # * ===============================
 # * == DEFININDO TIPOS ESTÁTICOS ==
 # * ===============================
 
-_Connection: TypeAlias = Union[PooledMySQLConnection, MySQLConnectionAbstract]
+_Connection: TypeAlias = Union[PooledMySQLConnection, MySQLConnectionAbstract, SQLiteConnection]
+T_Result = TypeVar("T_Result")
 _ColumnsValuesTypes: TypeAlias = Union[
     str, Union[Decimal, float, int], ProductCategory
 ]
 _ColumnsNamesLiteral = Literal["id", "name", "category", "price"]
-_WhereConditions = Tuple[_ColumnsNamesLiteral, _ColumnsValuesTypes]
+# `("id", 5)` é o mesmo que `eq("id", 5)`.
+_WhereConditions = Union[Tuple[_ColumnsNamesLiteral, _ColumnsValuesTypes], Condition]
 
 class ProductDataDict(TypedDict):
     """
@@ -50,6 +144,7 @@ class ProductDataDict(TypedDict):
     category: ProductCategory
     price: Decimal
     time_stamp: datetime.datetime
+    updated_at: datetime.datetime
 
 class ProductDBDataDict(ProductDataDict):
     """
@@ -78,59 +173,599 @@ class AllTableColumnsDict(TableColumnsDict, total=False):
     """
     id: int
 
+class SearchFiltersDict(TypedDict, total=False):
+    """
+    Representa um dicionário tipado com os filtros da busca de produtos.
+    Os preços mínimo e máximo são inclusivos.
+    """
+    category: Union[ProductCategory, str]
+    min_price: Union[Decimal, float, int]
+    max_price: Union[Decimal, float, int]
+    name_prefix: str
+    sort: Union[ProductSort, str]
+
+class InsertManyResultDict(TypedDict):
+    """
+    Representa o resultado da inserção de um item em `insert_many`.
+    Se `error` não for None, o item não foi inserido.
+    """
+    index: int
+    id: Optional[int]
+    error: Optional[str]
+
+# Posição na sequência de mudanças: (momento da mudança, id).
+ChangesCursor: TypeAlias = Tuple[datetime.datetime, int]
+
+class ChangesDict(TypedDict):
+    """
+    Representa as mudanças retornadas por `changes`: produtos criados
+    ou alterados, ids apagados e a posição para a próxima consulta.
+    """
+    upserted: _SelectedItemsDict
+    deleted: List[int]
+    next_cursor: ChangesCursor
+    has_more: bool
+
+class ChangesExpiredError(ValueError):
+    """A posição pedida é mais antiga que os registros de exclusão guardados."""
+
 # * ======================
 # * == FUNÇÕES PRIVADAS ==
 # * ======================
 
 def _get_global_connection() -> _Connection:
-    """Retorna uma conexão global do MySQL."""
-    return connect(
-        host="localhost",
-        user="root",
-        password=""
+    """Retorna uma conexão global do backend, sem escolher o banco."""
+    return _BACKEND.connect_server()
+
+def _new_connection() -> _Connection:
+    """Abre uma conexão nova com o banco de dados `cantina_escolar`."""
+    return _BACKEND.connect()
+
+def _ping_connection(conn: _Connection) -> bool:
+    """Retorna se a conexão ainda responde ao servidor."""
+    try:
+        conn.ping(reconnect=False)
+    except Error:
+        return False
+    return True
+
+def _close_raw_connection(conn: _Connection) -> None:
+    """Fecha uma conexão sem devolvê-la ao pool."""
+    with _STATEMENT_CACHES_LOCK:
+        # Os comandos preparados morrem junto com a conexão.
+        _STATEMENT_CACHES.pop(id(conn), None)
+    conn.close()
+
+def _close_prepared_cursor(cursor: MySQLCursorAbstract) -> None:
+    """Fecha um cursor preparado, liberando o comando no servidor."""
+    try:
+        cursor.close()
+    except Error:
+        pass
+
+def _statement_cache(conn: _Connection) -> Optional[PreparedStatementCache]:
+    """
+    Retorna o cache de comandos preparados de uma conexão do pool.
+    Retorna None se o cache estiver desligado ou a conexão não for do pool.
+    """
+    pool = _POOL
+    if config.STATEMENT_CACHE_SIZE <= 0 or pool is None or not pool.owns(conn):
+        return None
+    with _STATEMENT_CACHES_LOCK:
+        statement_cache = _STATEMENT_CACHES.get(id(conn))
+        if statement_cache is None:
+            statement_cache = PreparedStatementCache(
+                lambda dictionary: conn.cursor(prepared=True, dictionary=dictionary),
+                close=_close_prepared_cursor,
+                max_size=config.STATEMENT_CACHE_SIZE
+            )
+            _STATEMENT_CACHES[id(conn)] = statement_cache
+    return statement_cache
+
+@lru_cache(maxsize=1024)
+def _statement_shape(cmd: str) -> str:
+    """
+    Retorna o formato de um comando, usado como label das métricas:
+    listas de `%s` viram um único `%s, ...`, para que cada tamanho
+    de `IN (...)` não crie uma série nova.
+    """
+    return _PLACEHOLDER_LIST_PATTERN.sub("%s, ...", _WHITESPACE_PATTERN.sub(" ", cmd).strip())
+
+def _run(
+    cursor: MySQLCursorAbstract,
+    cmd: str,
+    values: Union[Sequence[Any], Sequence[Sequence[Any]]] = (),
+    *,
+    many: bool = False
+) -> None:
+    """
+    Executa um comando (ou, com `many`, um lote) num cursor, medindo
+    o tempo e registrando-o em `_SLOW_QUERY_LOG` se for lento.
+    """
+    start = time.perf_counter()
+    try:
+        if many:
+            cursor.executemany(cmd, values) # pyright: ignore[reportArgumentType]
+        else:
+            cursor.execute(cmd, values)
+    finally:
+        duration = time.perf_counter() - start
+        _QUERY_SECONDS.observe(duration, _statement_shape(cmd))
+    slow_query_log = _SLOW_QUERY_LOG
+    if slow_query_log is not None and duration >= slow_query_log.threshold_seconds:
+        slow_query_log.record(_statement_shape(cmd), cmd, values, cursor.rowcount, duration)
+
+def _explain_query(cmd: str, values: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Executa o `EXPLAIN` de um comando lento numa conexão separada."""
+    conn = _new_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN {cmd}", values)
+        return cursor.fetchall() # pyright: ignore[reportReturnType]
+    finally:
+        conn.close()
+
+def _execute(
+    conn: _Connection,
+    cursor: MySQLCursorAbstract,
+    cmd: str,
+    values: Sequence[_ColumnsValuesTypes],
+    *,
+    dictionary: bool = False
+) -> MySQLCursorAbstract:
+    """
+    Executa um comando como comando preparado, reaproveitando o
+    cursor preparado da conexão, e retorna o cursor com o resultado.
+    Sem cache, executa o comando como texto em `cursor`.
+    """
+    statement_cache = _statement_cache(conn)
+    if statement_cache is None:
+        _run(cursor, cmd, values)
+        return cursor
+    prepared_cursor = statement_cache.get(cmd, dictionary=dictionary)
+    _run(prepared_cursor, cmd, values)
+    return prepared_cursor
+
+def _create_pool(factory: Callable[[], _Connection] = _new_connection, **options) -> ConnectionPool:
+    """
+    Cria um pool de conexões a partir de `config` e das opções indicadas.
+    Por padrão, as conexões são com o primário.
+    """
+    pool_options = {
+        "max_size": config.POOL_MAX_SIZE,
+        "acquire_timeout": config.POOL_ACQUIRE_TIMEOUT,
+        "max_idle_seconds": config.POOL_MAX_IDLE_SECONDS,
+        "max_lifetime_seconds": config.POOL_MAX_LIFETIME_SECONDS,
+        "ping_after_seconds": config.POOL_PING_AFTER_SECONDS,
+    }
+    pool_options.update(options)
+    return ConnectionPool(
+        factory,
+        close=_close_raw_connection,
+        ping=_ping_connection,
+        **pool_options
     )
 
-def _where_SQL(*columns: _ColumnsNamesLiteral) -> str:
-    """Cria um comando WHERE com as condições indicadas."""
-    # Sintaxe: WHERE coluna1 = valor1, ...
-    # Sendo os valores em %s
-    where_cmd = f"WHERE {' AND '.join([f"{column} = %s" for column in columns])}"
-    return where_cmd
-
-def _set_SQL(*set_fields: _ColumnsNamesLiteral) -> str:
-    """Cria um comando SET com os campos e valores indicados."""
-    # Sintaxe: SET coluna1 = valor1, coluna2 = valor2, ...
-    set_cmd = f"SET {', '.join([f"{column} = %s" for column in set_fields])}"
-    return set_cmd
-
-def _delete_SQL(*delete_fields: _ColumnsNamesLiteral) -> str:
-    """Cria um comando DELETE com nos campos indicados."""
-    where_cmd = _where_SQL(*delete_fields)
-    delete_cmd = f"DELETE FROM {_TABLE_NAME_REFERENCE} {where_cmd}"
-    return delete_cmd
-
-def _order_by_SQL(
-    *sort_columns: _ColumnsNamesLiteral,
-    desc_sort: bool = False
-) -> str:
-    """Cria um comando ORDER BY com as colunas indicadas."""
-    mode = "DESC" if desc_sort else "ASC"
-    order_by_cmd = f"ORDER BY {", ".join(sort_columns)} {mode}"
-    return order_by_cmd
-
-def _group_by_SQL(*group_columns: _ColumnsNamesLiteral) -> str:
-    """Cria um comando GROUP BY com as colunas indicadas."""
-    return f"GROUP BY {", ".join(group_columns)}"
+def _get_pool() -> ConnectionPool:
+    """Retorna o pool de conexões, criando-o na primeira chamada."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = _create_pool()
+    return _POOL
+
+def _get_replicas() -> Optional[ReplicaRouter[ConnectionPool]]:
+    """Retorna as réplicas de leitura, criando os pools delas na primeira chamada. None sem réplicas."""
+    global _REPLICAS  # pylint: disable=global-statement
+    if not _REPLICA_BACKENDS:
+        return None
+    if _REPLICAS is None:
+        with _REPLICAS_LOCK:
+            if _REPLICAS is None:
+                options: Dict[str, Union[str, float]] = {
+                    "strategy": config.DB_REPLICA_STRATEGY,
+                    "eject_seconds": config.DB_REPLICA_EJECT_SECONDS,
+                    "max_eject_seconds": config.DB_REPLICA_MAX_EJECT_SECONDS
+                }
+                options.update(_REPLICA_OPTIONS)
+                _REPLICAS = ReplicaRouter(
+                    {
+                        name: _create_pool(backend.connect)
+                        for name, backend in _REPLICA_BACKENDS.items()
+                    },
+                    **options # pyright: ignore[reportArgumentType]
+                )
+    return _REPLICAS
+
+def _get_coalescer() -> Optional[WriteCoalescer]:
+    """Retorna o agrupador de escritas, criando-o na primeira chamada. None se desligado."""
+    global _COALESCER  # pylint: disable=global-statement
+    if not _COALESCING_ENABLED:
+        return None
+    if _COALESCER is None:
+        with _COALESCER_LOCK:
+            if _COALESCER is None:
+                options: Dict[str, Union[int, float]] = {
+                    "max_batch": config.WRITE_COALESCING_MAX_BATCH,
+                    "linger_seconds": config.WRITE_COALESCING_LINGER_MS / 1000,
+                    "queue_size": config.WRITE_COALESCING_QUEUE_SIZE,
+                    "enqueue_timeout": config.WRITE_COALESCING_QUEUE_TIMEOUT
+                }
+                options.update(_COALESCER_OPTIONS)
+                _COALESCER = WriteCoalescer(_run_write_batch, **options) # pyright: ignore[reportArgumentType]
+    return _COALESCER
+
+def _abort_connection(conn: _Connection, cursor: MySQLCursorAbstract) -> None:
+    """
+    Desfaz a transação e libera a conexão após um erro. Se a
+    própria conexão estiver quebrada, ela é descartada.
+    """
+    pool = _POOL
+    is_pooled = pool is not None and pool.owns(conn)
+    with _STATEMENT_CACHES_LOCK:
+        statement_cache = _STATEMENT_CACHES.get(id(conn))
+    if statement_cache is not None:
+        # Um cursor preparado pode ter ficado num estado inválido.
+        statement_cache.clear()
+    try:
+        conn.rollback()
+        cursor.close()
+    except Error:
+        if is_pooled:
+            pool.release(conn, discard=True) # pyright: ignore[reportOptionalMemberAccess]
+        else:
+            conn.close()
+        return
+    if is_pooled:
+        pool.release(conn) # pyright: ignore[reportOptionalMemberAccess]
+    else:
+        conn.close()
+
+@contextmanager
+def _connection_scope(
+    *,
+    is_global_connection: bool = False,
+    dictionary_cursor: bool = False,
+    with_commit: bool = True
+):
+    """
+    Abre uma conexão e um cursor, encerrando-os ao sair do bloco.
+    Se ocorrer um erro, a transação é desfeita.
+    """
+    conn, cursor = start_connection(
+        is_global_connection=is_global_connection,
+        dictionary_cursor=dictionary_cursor
+    )
+    try:
+        yield conn, cursor
+    except BaseException:
+        _abort_connection(conn, cursor)
+        raise
+    close_connection(conn, cursor, with_commit=with_commit)
+
+def _read_replicas() -> Optional[ReplicaRouter[ConnectionPool]]:
+    """
+    Retorna as réplicas que podem receber as leituras do contexto atual,
+    ou None se elas devem ir ao primário: sem réplicas, com `primary_reads`
+    ou quando o cliente atual escreveu há menos de `DB_READ_YOUR_WRITES_MS`.
+    """
+    if not _INITIZALIED or _PRIMARY_READS.get() or _RECENT_WRITERS.wrote_recently(_CLIENT.get()):
+        return None
+    return _get_replicas()
+
+def _read_on_replica(
+    pool: ConnectionPool,
+    query: Callable[[_Connection, MySQLCursorAbstract], T_Result]
+) -> T_Result:
+    """Executa uma leitura numa conexão do pool de uma réplica."""
+    start = time.perf_counter()
+    conn = pool.acquire()
+    _CONNECT_SECONDS.observe(time.perf_counter() - start, "replica")
+    try:
+        cursor = conn.cursor(dictionary=True)
+        result = query(conn, cursor)
+        # Encerra o snapshot de leitura antes de reutilizar a conexão.
+        conn.rollback()
+        cursor.close()
+    except BaseException:
+        pool.release(conn, discard=True)
+        raise
+    pool.release(conn)
+    return result
+
+def _read(query: Callable[[_Connection, MySQLCursorAbstract], T_Result]) -> Tuple[T_Result, bool]:
+    """
+    Executa uma leitura numa réplica, se houver uma disponível (veja
+    `_read_replicas`), ou no primário. Se a réplica falhar por conexão,
+    ela sai do rodízio e a leitura é refeita no primário. Retorna o
+    resultado e se ele veio de uma réplica.
+    """
+    replicas = _read_replicas()
+    chosen = replicas.choose() if replicas is not None else None
+    if replicas is not None and chosen is not None:
+        name, pool = chosen
+        failed = False
+        try:
+            return _read_on_replica(pool, query), True
+        except PoolTimeoutError:
+            pass # A réplica está ocupada: lê no primário.
+        except Error as e:
+            if not is_connection_error(e):
+                raise
+            failed = True
+        finally:
+            replicas.release(name, failed=failed)
+    with _connection_scope(dictionary_cursor=True, with_commit=False) as (conn, cursor):
+        return query(conn, cursor), False
+
+def _select_SQL(
+    selected_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]],
+    desc_sort: bool,
+    order_by_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]],
+    group_by_columns: Optional[Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]]],
+    limit: Optional[int],
+    after_id: Optional[int],
+    where_fields: AllTableColumnsDict,
+    where: Sequence[Condition] = (),
+    for_update: bool = False
+) -> Tuple[str, List[_ColumnsValuesTypes]]:
+    """Cria um comando SELECT e a lista de valores dos seus `%s`."""
+    conditions = [*(eq(column, value) for column, value in where_fields.items()), *where]
+    if after_id is not None:
+        conditions.append(lt("id", after_id) if desc_sort else gt("id", after_id))
+    if order_by_columns == "*":
+        order_by_columns = ("id", *_TABLE_COLUMNS)
+    if group_by_columns == "*":
+        group_by_columns = ("id", *_TABLE_COLUMNS)
+    return _TABLE.select(
+        selected_columns, conditions,
+        order_by=order_by_columns, desc=desc_sort, group_by=group_by_columns or (),
+        limit=limit, for_update=for_update
+    )
+
+def _bulk_conditions(
+    ids: Optional[Sequence[int]],
+    filters: Optional[TableColumnsDict]
+) -> List[Condition]:
+    """
+    Cria as condições de uma operação em massa, com uma lista
+    de ids (`id IN (...)`) e/ou filtros de igualdade.
+
+    Raises:
+        ValueError: Nenhum id ou filtro foi indicado, ou há uma coluna inválida.
+    """
+    conditions = [in_("id", ids)] if ids else []
+    for column, value in (filters or {}).items():
+        if column not in _TABLE_COLUMNS:
+            raise ValueError(f"Coluna inválida para filtro: {column}")
+        conditions.append(eq(column, value))
+    if not conditions:
+        raise ValueError("Ao menos um id ou filtro deve ser indicado.")
+    return conditions
+
+def _insert_SQL() -> str:
+    """Cria o comando INSERT de um produto. As datas ficam com os padrões do DB."""
+    return f"INSERT INTO {_TABLE_NAME_REFERENCE} ({", ".join(_TABLE_COLUMNS)}) VALUES (%s, %s, %s)"
+
+def _to_conditions(conditions: Sequence[_WhereConditions]) -> List[Condition]:
+    """
+    Converte as condições `(coluna, valor)` em condições de igualdade.
+    Sequências aninhadas de condições também são aceitas.
+    """
+    converted: List[Condition] = []
+    for condition in conditions:
+        if isinstance(condition, Condition):
+            converted.append(condition)
+        elif isinstance(condition[0], str):
+            converted.append(eq(*condition))
+        else:
+            converted.extend(_to_conditions(condition)) # pyright: ignore[reportArgumentType]
+    return converted
+
+def _name_key(name: str) -> str:
+    """
+    Normaliza um nome como a collation `utf8mb4_unicode_ci`
+    compara: sem acentos, sem diferenciar maiúsculas e
+    ignorando espaços no fim.
+    """
+    return fold_text(name).rstrip(" ")
+
+def _normalize_product_values(
+    name: str,
+    category: Union[ProductCategory, str],
+    price: Union[float, Decimal, int, str]
+) -> Tuple[str, str, Decimal]:
+    """Converte os valores de um produto para os tipos enviados ao MySQL."""
+    if not isinstance(price, Decimal):
+        price = Decimal(price)
+    if isinstance(category, Enum):
+        category = category.value
+    return name, category, price
+
+def _insert_pending_rows(
+    cursor: MySQLCursorAbstract,
+    pending: Dict[str, Tuple[int, Tuple[str, str, Decimal]]],
+    results: List[InsertManyResultDict]
+) -> None:
+    """
+    Executa a parte transacional de `insert_many`, preenchendo
+    `results` com os ids inseridos e os erros de cada item.
+    """
+    columns_cmd = ", ".join(_TABLE_COLUMNS)
+    insert_cmd = f"INSERT INTO {_TABLE_NAME_REFERENCE} ({columns_cmd}) VALUES (%s, %s, %s)"
+
+    def names_in_cmd(count: int) -> str:
+        return (
+            f"SELECT id, name FROM {_TABLE_NAME_REFERENCE} " +
+            f"WHERE name IN ({", ".join(["%s"] * count)})"
+        )
+
+    def insert_row_by_row() -> None:
+        for index, values in pending.values():
+            cursor.execute("SAVEPOINT insert_many_row")
+            try:
+                _run(cursor, insert_cmd, values)
+            except IntegrityError as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT insert_many_row")
+                results[index]["error"] = f"Produto já existe: {values[0]} ({e.msg})"
+            else:
+                results[index]["id"] = cursor.lastrowid
+
+    names = [values[0] for _, values in pending.values()]
+    _run(cursor, names_in_cmd(len(names)), names)
+    unmatched_existing = False
+    for _, existing_name in cursor.fetchall():
+        match = pending.pop(_name_key(existing_name), None) # pyright: ignore[reportArgumentType]
+        if match is None:
+            # `_name_key` e a collation do DB discordam sobre este nome
+            # (ex.: "æ" e "ae"): o INSERT linha a linha acha o conflito.
+            unmatched_existing = True
+            continue
+        index, values = match
+        results[index]["error"] = f"Produto já existe: {values[0]}"
+    if not pending:
+        return
+    if unmatched_existing:
+        insert_row_by_row()
+        return
+    rows = [values for _, values in pending.values()]
+    try:
+        cursor.execute("SAVEPOINT insert_many")
+        _run(cursor, insert_cmd, rows, many=True)
+    except IntegrityError:
+        # Outro processo inseriu um dos nomes entre a verificação e
+        # o INSERT: insere linha a linha para isolar os conflitos.
+        cursor.execute("ROLLBACK TO SAVEPOINT insert_many")
+        insert_row_by_row()
+        return
+    names = [values[0] for values in rows]
+    _run(cursor, names_in_cmd(len(names)), names)
+    for id_, inserted_name in cursor.fetchall():
+        match = pending.get(_name_key(inserted_name)) # pyright: ignore[reportArgumentType]
+        if match is not None:
+            results[match[0]]["id"] = id_ # pyright: ignore[reportArgumentType]
+
+def _id_cache_tag(id_: int) -> Tuple[str, int]:
+    """Tag de cache das consultas de um único produto por id."""
+    return ("id", id_)
+
+def _bump_catalog_version(conn: _Connection) -> int:
+    """
+    Avança a versão do catálogo na transação de uma escrita e retorna
+    a nova versão. Deve ser o último comando antes do commit: a linha
+    da versão fica travada só até ele.
+    """
+    cursor = conn.cursor()
+    try:
+        _run(cursor, f"UPDATE {_CATALOG_VERSION_TABLE_REFERENCE} SET versao = versao + 1 WHERE id = 1")
+        _run(cursor, f"SELECT versao FROM {_CATALOG_VERSION_TABLE_REFERENCE} WHERE id = 1")
+        return int(cursor.fetchone()[0]) # pyright: ignore[reportOptionalSubscript, reportArgumentType]
+    finally:
+        cursor.close()
+
+def _on_catalog_changed(
+    ids: Optional[Iterable[int]] = None,
+    version: Optional[int] = None
+) -> None:
+    """
+    Chamado depois de cada escrita confirmada. Invalida as consultas
+    em cache afetadas: as listas e as consultas dos `ids` indicados.
+    Sem `ids`, ou seja, quando as linhas afetadas são desconhecidas,
+    limpa o cache todo. Por último, avisa os listeners de
+    `add_catalog_listener`.
+
+    `version` é a versão gerada pela escrita. Se ela não for a seguinte
+    à versão conhecida, outros processos escreveram no meio e o cache
+    também é limpo. Sem `version` (ex.: em `init_db`), a versão
+    conhecida é descartada.
+    """
+    global _CATALOG_VERSION  # pylint: disable=global-statement
+    _RECENT_WRITERS.record_write(_CLIENT.get())
+    changed_ids = None if ids is None else list(ids)
+    with _CATALOG_VERSION_LOCK:
+        known_version = _CATALOG_VERSION
+        stale_ids = changed_ids
+        if version is None or known_version is None:
+            stale_ids = None
+        elif version <= known_version:
+            # A versão conhecida já inclui esta escrita (lida por
+            # `catalog_version` ou vinda de uma escrita concorrente).
+            version = known_version
+        elif version != known_version + 1:
+            # Outros processos escreveram desde a versão conhecida.
+            stale_ids = None
+        if _CACHE is not None:
+            if stale_ids is None:
+                _CACHE.clear()
+            else:
+                _CACHE.invalidate_tags(_LIST_CACHE_TAG, *(_id_cache_tag(id_) for id_ in stale_ids))
+        _CATALOG_VERSION = version
+    # Os listeners releem as linhas alteradas, que as réplicas podem ainda não ter.
+    with primary_reads():
+        for listener in _CATALOG_LISTENERS:
+            listener(changed_ids)
+
+def _ids_from_conditions(conditions: Sequence[Condition]) -> Optional[List[int]]:
+    """
+    Retorna os ids de uma única condição `id = valor` ou `id IN (...)`.
+    Com outras condições, os ids afetados são desconhecidos e retorna None.
+    """
+    if len(conditions) != 1:
+        return None
+    column, operator, value = conditions[0]
+    if column != "id" or operator not in ("=", "IN"):
+        return None
+    return [int(id_) for id_ in value] if operator == "IN" else [int(value)]
+
+def _search_query(filters: SearchFiltersDict) -> Tuple[List[Condition], Tuple[str, ...]]:
+    """
+    Cria as condições e a ordenação de uma busca. As condições
+    seguem a ordem dos índices `(category, price)`, `(price)` e `name`.
+    """
+    conditions: List[Condition] = []
+    if filters.get("category") is not None:
+        conditions.append(eq("category", filters["category"])) # pyright: ignore[reportTypedDictNotRequiredAccess]
+    min_price, max_price = filters.get("min_price"), filters.get("max_price")
+    if min_price is not None:
+        conditions.append(ge("price", min_price))
+    if max_price is not None:
+        conditions.append(le("price", max_price))
+    if filters.get("name_prefix"):
+        conditions.append(starts_with("name", filters["name_prefix"])) # pyright: ignore[reportTypedDictNotRequiredAccess]
+    sort = filters.get("sort", ProductSort.ID)
+    sort = ProductSort(sort.value if isinstance(sort, Enum) else sort).value
+    # O id desempata a ordenação, para que o resultado seja estável.
+    order_by = (sort,) if sort.lstrip("-") == "id" else (sort, "id")
+    return conditions, order_by
+
+def _copy_rows(rows: Optional[_SelectedItemsDict]) -> Optional[_SelectedItemsDict]:
+    """Copia as linhas do cache para que quem chamou possa alterá-las."""
+    if rows is None:
+        return None
+    return [dict(row) for row in rows] # pyright: ignore[reportReturnType]
 
 # * ======================
 # * == FUNÇÕES PÚBLICAS ==
 # * ======================
 
 def test_connection() -> bool:
-    """Testa a conexão com o banco de dados."""
+    """
+    Testa a conexão com o banco de dados. Depois de inicializado,
+    o teste usa uma conexão do pool; antes disso, abre e fecha
+    uma conexão global.
+    """
     try:
-        _get_global_connection()
-    except DatabaseError:
+        with _connection_scope(
+            is_global_connection=not _INITIZALIED,
+            with_commit=False
+        ) as (_, cursor):
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+    except PoolTimeoutError:
+        # Todas as conexões estão em uso, então o servidor está respondendo.
+        return True
+    except Error:
         return False
     return True
 
@@ -140,11 +775,32 @@ def close_connection(
     *,
     with_commit: bool = True
 ) -> None:
-    """Encerra a conexão e o cursor com o banco de dados"""
-    if with_commit:
-        conn.commit()
-    cursor.close()
-    conn.close()
+    """
+    Encerra o cursor e devolve a conexão ao pool. Conexões que
+    não vieram do pool são fechadas.
+    """
+    pool = _POOL
+    if pool is None or not pool.owns(conn):
+        if with_commit:
+            start = time.perf_counter()
+            conn.commit()
+            _COMMIT_SECONDS.observe(time.perf_counter() - start, "commit")
+        cursor.close()
+        conn.close()
+        return
+    try:
+        start = time.perf_counter()
+        if with_commit:
+            conn.commit()
+        else:
+            # Encerra o snapshot de leitura antes de reutilizar a conexão.
+            conn.rollback()
+        _COMMIT_SECONDS.observe(time.perf_counter() - start, "commit" if with_commit else "rollback")
+        cursor.close()
+    except Error:
+        pool.release(conn, discard=True)
+        raise
+    pool.release(conn)
 
 def start_connection(
     *,
@@ -152,20 +808,261 @@ def start_connection(
     dictionary_cursor: bool = False
 ) -> Tuple[_Connection, MySQLCursorAbstract]:
     """Retorna uma conexão e um cursor dessa conexão."""
+    start = time.perf_counter()
     conn = _get_global_connection() if is_global_connection else get_connection()
+    _CONNECT_SECONDS.observe(time.perf_counter() - start, "global" if is_global_connection else "pool")
     return (conn, conn.cursor(dictionary=dictionary_cursor))
 
 def get_connection() -> _Connection:
-    """Retorna uma conexão com um banco de dados."""
+    """
+    Retira uma conexão do pool. Ela deve ser devolvida
+    com `close_connection`.
+    """
     if not _INITIZALIED:
         raise ConnectionError(
             "O banco de dados esperado não foi inicializado.")
-    return connect(
-        host="localhost",
-        user="root",
-        password="",
-        database=_DATABASE_NAME
-    )
+    return _get_pool().acquire()
+
+def configure_pool(**options) -> None:
+    """
+    Recria o pool de conexões com as opções indicadas
+    (`max_size`, `acquire_timeout`, `max_idle_seconds`,
+    `max_lifetime_seconds` e `ping_after_seconds`).
+    """
+    global _POOL  # pylint: disable=global-statement
+    with _POOL_LOCK:
+        old_pool, _POOL = _POOL, _create_pool(**options)
+    if old_pool is not None:
+        old_pool.clear()
+
+def close_pool() -> None:
+    """Fecha as conexões ociosas do pool e dos pools das réplicas."""
+    if _POOL is not None:
+        _POOL.clear()
+    if _REPLICAS is not None:
+        for pool in _REPLICAS.values():
+            pool.clear()
+
+def configure_replicas(
+    dsns: Sequence[str] = (),
+    *,
+    read_your_writes_seconds: Optional[float] = None,
+    **options
+) -> None:
+    """
+    Troca as réplicas de leitura pelas de `dsns` (vazio desliga), com
+    as opções `strategy` ("round_robin" ou "least_busy"), `eject_seconds`
+    e `max_eject_seconds`. `read_your_writes_seconds` muda por quanto
+    tempo as leituras de um cliente que escreveu vão ao primário.
+
+    Raises:
+        ValueError: DSN inválido ou repetido.
+    """
+    global _REPLICAS, _REPLICA_BACKENDS, _REPLICA_OPTIONS, _RECENT_WRITERS  # pylint: disable=global-statement
+    backends = backends_from_dsns(dsns)
+    with _REPLICAS_LOCK:
+        old_replicas, _REPLICAS = _REPLICAS, None
+        _REPLICA_BACKENDS = backends
+        _REPLICA_OPTIONS = dict(options)
+        if read_your_writes_seconds is not None:
+            _RECENT_WRITERS = RecentWriters(read_your_writes_seconds)
+    if old_replicas is not None:
+        for pool in old_replicas.values():
+            pool.clear()
+
+def reads_may_be_stale() -> bool:
+    """
+    Retorna se uma leitura agora pode vir de uma réplica que ainda não
+    tem as últimas escritas (houve uma escrita deste processo, ou uma
+    mudança de versão vista por `catalog_version`, há menos de
+    `DB_READ_YOUR_WRITES_MS`). Nesse caso, a versão do catálogo
+    (`catalog_version`) não deve marcar a leitura.
+    """
+    return _REPLICAS is not None and _RECENT_WRITERS.any_recent()
+
+def replica_stats() -> List[ReplicaStatsDict]:
+    """Retorna as estatísticas de cada réplica de leitura (vazio sem réplicas)."""
+    replicas = _REPLICAS
+    return [] if replicas is None else replicas.stats()
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    Faz as leituras do bloco irem ao primário, por exemplo para reler
+    o que acabou de ser escrito, que as réplicas podem ainda não ter.
+    """
+    token = _PRIMARY_READS.set(True)
+    try:
+        yield
+    finally:
+        _PRIMARY_READS.reset(token)
+
+def bind_client(client: Optional[str]) -> Token:
+    """
+    Define o cliente (ex.: o IP) das leituras e escritas do contexto
+    atual. Depois de uma escrita, as leituras desse cliente vão ao
+    primário por `DB_READ_YOUR_WRITES_MS`. Desfaça com `unbind_client`.
+    """
+    return _CLIENT.set(client)
+
+def unbind_client(token: Token) -> None:
+    """Desfaz um `bind_client`."""
+    _CLIENT.reset(token)
+
+def catalog_version() -> str:
+    """
+    Retorna a versão atual do catálogo de produtos, lida do primário.
+    Ela avança a cada transação de escrita, de qualquer processo, e
+    serve para revalidar o ETag das leituras (`If-None-Match`).
+
+    Se a versão for outra que a conhecida, outros processos escreveram
+    sem invalidar este cache, e ele é limpo antes de retornar.
+    """
+    global _CATALOG_VERSION  # pylint: disable=global-statement
+    with _connection_scope(with_commit=False) as (_, cursor):
+        _run(cursor, f"SELECT versao FROM {_CATALOG_VERSION_TABLE_REFERENCE} WHERE id = 1")
+        version = int(cursor.fetchone()[0]) # pyright: ignore[reportOptionalSubscript, reportArgumentType]
+    with _CATALOG_VERSION_LOCK:
+        # Uma escrita concorrente pode já ter avançado a versão conhecida.
+        if _CATALOG_VERSION is None or version > _CATALOG_VERSION:
+            if _CACHE is not None:
+                _CACHE.clear()
+            if _CATALOG_VERSION is not None:
+                # As réplicas podem ainda não ter a escrita: veja `reads_may_be_stale`.
+                _RECENT_WRITERS.record_write(None)
+            _CATALOG_VERSION = version
+    return str(version)
+
+def known_catalog_version() -> str:
+    """
+    Retorna a versão do catálogo conhecida pelo processo, sem ir ao DB
+    (só na primeira vez, com `catalog_version`). O cache está de acordo
+    com ela e uma leitura nova é no mínimo dela: serve de ETag às
+    respostas, sem nunca ser mais nova que os dados.
+    """
+    version = _CATALOG_VERSION
+    if version is None:
+        return catalog_version()
+    return str(version)
+
+def add_catalog_listener(listener: Callable[[Optional[List[int]]], None]) -> None:
+    """
+    Registra um callback chamado depois de cada escrita confirmada,
+    com a lista de ids alterados (None se forem desconhecidos).
+    O callback roda na thread da escrita e não deve lançar erros.
+    """
+    _CATALOG_LISTENERS.append(listener)
+
+def configure_write_coalescing(*, enabled: bool = True, **options) -> None:
+    """
+    Liga (ou desliga, com `enabled=False`) o agrupamento de escritas
+    de `insert`, `insert_row` e `update`, com as opções `max_batch`,
+    `linger_seconds`, `queue_size` e `enqueue_timeout`. O agrupador
+    anterior termina as escritas que já estão na fila.
+    """
+    global _COALESCER, _COALESCING_ENABLED, _COALESCER_OPTIONS  # pylint: disable=global-statement
+    with _COALESCER_LOCK:
+        old_coalescer, _COALESCER = _COALESCER, None
+        _COALESCING_ENABLED = enabled
+        _COALESCER_OPTIONS = dict(options)
+    if old_coalescer is not None:
+        old_coalescer.close()
+
+def write_coalescing_stats() -> Optional[CoalescerStatsDict]:
+    """Retorna as estatísticas do agrupador de escritas, se ele já existir."""
+    if _COALESCER is None:
+        return None
+    return _COALESCER.stats()
+
+def configure_cache(*, enabled: bool = True, **options) -> None:
+    """
+    Recria (ou desliga, com `enabled=False`) o cache de leituras
+    de `select`, com as opções `max_entries` e `ttl_seconds`.
+    """
+    global _CACHE  # pylint: disable=global-statement
+    cache_options = {
+        "max_entries": config.CACHE_MAX_ENTRIES,
+        "ttl_seconds": config.CACHE_TTL_SECONDS,
+    }
+    cache_options.update(options)
+    _CACHE = TaggedLRUCache(**cache_options) if enabled else None
+
+def configure_slow_query_log(*, enabled: bool = True, **options) -> None:
+    """
+    Recria (ou desliga, com `enabled=False`) o registro dos comandos
+    lentos, com as opções `threshold_seconds`, `max_entries` e
+    `explain` (se os SELECTs lentos recebem o `EXPLAIN`).
+    """
+    global _SLOW_QUERY_LOG  # pylint: disable=global-statement
+    slow_query_options = {
+        "threshold_seconds": config.SLOW_QUERY_THRESHOLD_MS / 1000,
+        "max_entries": config.SLOW_QUERY_MAX_ENTRIES,
+        "explain": config.SLOW_QUERY_EXPLAIN
+    }
+    slow_query_options.update(options)
+    explain = slow_query_options.pop("explain")
+    _SLOW_QUERY_LOG = SlowQueryLog(
+        explain=_explain_query if explain else None, **slow_query_options # pyright: ignore[reportArgumentType]
+    ) if enabled else None
+
+def slow_queries() -> List[SlowQueryDict]:
+    """Retorna os comandos lentos registrados, do mais antigo ao mais recente."""
+    if _SLOW_QUERY_LOG is None:
+        return []
+    return _SLOW_QUERY_LOG.entries()
+
+def cache_stats() -> Optional[CacheStatsDict]:
+    """Retorna as estatísticas do cache de leituras, se ele estiver ligado."""
+    if _CACHE is None:
+        return None
+    return _CACHE.stats()
+
+def pool_stats() -> Optional[PoolStatsDict]:
+    """Retorna as estatísticas do pool de conexões, se ele já existir."""
+    if _POOL is None:
+        return None
+    return _POOL.stats()
+
+def statement_cache_stats() -> StatementCacheStatsDict:
+    """Retorna as estatísticas somadas dos caches de comandos preparados das conexões."""
+    with _STATEMENT_CACHES_LOCK:
+        caches = list(_STATEMENT_CACHES.values())
+    totals: StatementCacheStatsDict = {
+        "size": 0,
+        "max_size": config.STATEMENT_CACHE_SIZE,
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0
+    }
+    for statement_cache in caches:
+        stats = statement_cache.stats()
+        for key in ("size", "hits", "misses", "evictions"):
+            totals[key] += stats[key] # pyright: ignore[reportGeneralTypeIssues]
+    return totals
+
+def storage_backend() -> str:
+    """Retorna o nome do backend de armazenamento em uso ("mysql" ou "sqlite")."""
+    return _BACKEND.name
+
+def configure_backend(
+    name: Optional[str] = None, *, dsn: Optional[str] = None, **options: Any
+) -> None:
+    """
+    Troca o backend de armazenamento do primário, pelo nome (com as
+    `options` do backend, ex.: `path` do SQLite) ou por um `dsn`. Sem
+    os dois, volta ao de `config`. Fecha o pool e limpa o cache: o
+    novo banco precisa ser inicializado com `init_db`.
+    """
+    global _BACKEND, _INITIZALIED  # pylint: disable=global-statement
+    close_pool()
+    if dsn is not None:
+        _BACKEND = backend_from_dsn(dsn)
+    elif name is None and config.DB_PRIMARY_DSN:
+        _BACKEND = backend_from_dsn(config.DB_PRIMARY_DSN)
+    else:
+        _BACKEND = create_backend(name or config.DB_BACKEND, **options)
+    _INITIZALIED = False
+    _on_catalog_changed()
 
 def db_has_initialized():
     """Retorna se o banco de dados `cantina_escolar` já foi inicializado."""
@@ -176,27 +1073,194 @@ def init_db() -> None:
     global _INITIZALIED  # pylint: disable=global-statement
     if _INITIZALIED:
         return
-    with open("backend/schema.sql", encoding="utf-8") as f:
-        data = f.read()
-    data = data.split(";")
-    conn = _get_global_connection()
-    cursor = conn.cursor()
-    for line in data:
-        line = line.strip()
-        if line:
-            cursor.execute(line)
-    close_connection(conn, cursor)
+    _BACKEND.create_schema()
+    # Antes de avisar: os listeners já podem reler o banco.
     _INITIZALIED = True
+    _on_catalog_changed()
 
 def drop_db(*, force_drop: bool = False) -> None:
     """Exclui o banco de dados `cantina_escolar`."""
     global _INITIZALIED  # pylint: disable=global-statement
     if not (_INITIZALIED or force_drop):
         return
-    conn, cursor = start_connection(is_global_connection=True)
-    cursor.execute(f"DROP DATABASE IF EXISTS {_DATABASE_NAME_REFERENCE}")
-    close_connection(conn, cursor)
+    close_pool()
+    _BACKEND.drop()
     _INITIZALIED = False
+    _on_catalog_changed()
+
+#* UNIDADE DE TRABALHO
+class Transaction:
+    """
+    Unidade de trabalho: executa vários comandos numa única conexão
+    e numa única transação. É criada por `transaction()`.
+    """
+    def __init__(self, conn: _Connection, cursor: MySQLCursorAbstract) -> None:
+        self._conn = conn
+        self._cursor = cursor
+        self._has_changes = False
+        # Ids alterados na transação; None se forem desconhecidos.
+        self._changed_ids: Optional[List[int]] = []
+
+    @property
+    def has_changes(self) -> bool:
+        """Se algum comando de escrita foi executado."""
+        return self._has_changes
+
+    @property
+    def changed_ids(self) -> Optional[List[int]]:
+        """Ids alterados na transação; None se forem desconhecidos."""
+        return self._changed_ids
+
+    def _record_changes(self, ids: Optional[Iterable[int]]) -> None:
+        """Guarda os ids alterados para invalidar os caches após o commit."""
+        self._has_changes = True
+        if ids is None or self._changed_ids is None:
+            self._changed_ids = None
+        else:
+            self._changed_ids.extend(ids)
+
+    def insert(
+        self,
+        name: str,
+        category: Union[ProductCategory, str],
+        price: Union[float, Decimal, int]
+    ) -> ProductDBDataDict:
+        """
+        Insere um novo produto e retorna a linha inserida, montada
+        com os valores enviados e o `lastrowid`. Só as datas, que o DB
+        preenche, são relidas (pela chave primária).
+        """
+        values = _normalize_product_values(name, category, price)
+        cursor = _execute(self._conn, self._cursor, _insert_SQL(), values)
+        id_ = cursor.lastrowid
+        self._record_changes(() if id_ is None else (id_,))
+        cursor = _execute(
+            self._conn, self._cursor,
+            f"SELECT time_stamp, updated_at FROM {_TABLE_NAME_REFERENCE} WHERE id = %s", (id_,),
+            dictionary=True
+        )
+        dates: Dict[str, datetime.datetime] = cursor.fetchone() # pyright: ignore[reportAssignmentType]
+        return { # pyright: ignore[reportReturnType]
+            "id": id_,
+            "name": values[0],
+            "category": values[1],
+            # A coluna é DECIMAL(10, 2) e o MySQL arredonda o meio para cima.
+            "price": values[2].quantize(_PRICE_QUANTUM, rounding=ROUND_HALF_UP),
+            "time_stamp": dates["time_stamp"],
+            "updated_at": dates["updated_at"]
+        }
+
+    def select(
+        self,
+        selected_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = "*",
+        *,
+        for_update: bool = False,
+        **where_fields: Unpack[AllTableColumnsDict]
+    ) -> Optional[_SelectedItemsDict]:
+        """
+        Retorna uma seleção feita dentro da transação, sem usar o cache.
+        Com `for_update`, as linhas lidas ficam travadas até o commit.
+        """
+        cmd, values = _select_SQL(
+            selected_columns, False, ("id",), None, None, None, where_fields,
+            for_update=for_update
+        )
+        cursor = _execute(self._conn, self._cursor, cmd, values, dictionary=True)
+        selected_return = cursor.fetchall()
+        return selected_return or None # pyright: ignore[reportReturnType]
+
+    @contextmanager
+    def savepoint(self, name: str = "tx_savepoint") -> Iterator[None]:
+        """
+        Se o bloco lançar um erro, desfaz só os seus comandos (com
+        `ROLLBACK TO SAVEPOINT`) e a transação pode continuar.
+        """
+        self._cursor.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except Exception:
+            self._cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        self._cursor.execute(f"RELEASE SAVEPOINT {name}")
+
+    def update(
+        self,
+        *conditions: _WhereConditions,
+        **set_fields: Unpack[AllTableColumnsDict]
+    ) -> int:
+        """
+        Atualiza os produtos que batem com as condições.
+
+        Returns:
+            (int): Número de linhas encontradas pelas condições.
+        """
+        where = _to_conditions(conditions)
+        cmd, values = _TABLE.update(set_fields, where)
+        cursor = _execute(self._conn, self._cursor, cmd, values)
+        self._record_changes(_ids_from_conditions(where))
+        return cursor.rowcount
+
+    def delete(self, *where_condition: _WhereConditions) -> int:
+        """
+        Apaga os produtos que batem com as condições.
+
+        Returns:
+            (int): Número de linhas apagadas.
+        """
+        where = _to_conditions(where_condition)
+        cmd, values = _TABLE.delete(where)
+        cursor = _execute(self._conn, self._cursor, cmd, values)
+        self._record_changes(_ids_from_conditions(where))
+        return cursor.rowcount
+
+@contextmanager
+def transaction() -> Iterator[Transaction]:
+    """
+    Abre uma unidade de trabalho. Todos os comandos do bloco usam a
+    mesma conexão; o commit é feito ao sair do bloco e um erro desfaz
+    tudo. Os caches são invalidados só depois do commit.
+
+    Exemplo:
+        with db.transaction() as tx:
+            product = tx.insert("Coxinha", ProductCategory.SALGADOS, 5)
+    """
+    with _connection_scope(dictionary_cursor=True) as (conn, cursor):
+        tx = Transaction(conn, cursor)
+        yield tx
+        version = _bump_catalog_version(conn) if tx.has_changes else None
+    if tx.has_changes:
+        _on_catalog_changed(ids=tx.changed_ids, version=version)
+
+def _run_write_batch(operations: List[Callable[[Transaction], Any]]) -> List[Any]:
+    """
+    Executa um lote do agrupador de escritas numa única transação.
+    Cada escrita roda num SAVEPOINT: um erro de dados (ex.: nome
+    repetido) vira o resultado dela e não desfaz as outras. Outros
+    erros (conexão, deadlock) desfazem e falham o lote inteiro.
+    """
+    results: List[Any] = []
+    with transaction() as tx:
+        for operation in operations:
+            try:
+                with tx.savepoint("coalesced_write"):
+                    results.append(operation(tx))
+            except (IntegrityError, DataError, ValueError) as e:
+                results.append(e)
+    return results
+
+def _write(operation: Callable[[Transaction], Any]) -> Any:
+    """
+    Executa uma escrita pelo agrupador de escritas, se ele estiver
+    ligado, ou numa transação própria.
+    """
+    coalescer = _get_coalescer()
+    if coalescer is not None:
+        result = coalescer.execute(operation)
+        # O lote é confirmado na thread do agrupador, sem o cliente atual.
+        _RECENT_WRITERS.record_write(_CLIENT.get())
+        return result
+    with transaction() as tx:
+        return operation(tx)
 
 #* CREATE
 def insert(
@@ -205,60 +1269,237 @@ def insert(
     price: Union[float, Decimal, int]
 ) -> Optional[int]:
     """Insere um novo produto na tabela `produtos`."""
-    if not isinstance(price, Decimal):
-        price = Decimal(price)
-    if isinstance(category, ProductCategory):
-        category = category.value
-    values = (name, category, price)
-    cmd = f"INSERT INTO {_TABLE_NAME_REFERENCE} ({", ".join(_TABLE_COLUMNS)}) VALUES (%s, %s, %s)"
-    conn, cursor = start_connection()
-    cursor.execute(cmd, values)
-    id_ = cursor.lastrowid
-    close_connection(conn, cursor)
-    return id_
+    return insert_row(name, category, price)["id"]
+
+def insert_row(
+    name: str,
+    category: Union[ProductCategory, str],
+    price: Union[float, Decimal, int]
+) -> ProductDBDataDict:
+    """Insere um novo produto e retorna a linha inserida (veja `Transaction.insert`)."""
+    return _write(lambda tx: tx.insert(name, category, price))
+
+def insert_many(products: Sequence[TableColumnsDict]) -> List[InsertManyResultDict]:
+    """
+    Insere vários produtos numa única transação, com um INSERT
+    de várias linhas (`executemany`).
+
+    Nomes repetidos, no lote ou já existentes na tabela, não são
+    inseridos e recebem um erro próprio, sem impedir os outros itens.
+
+    Returns:
+        (list[InsertManyResultDict]): Resultado de cada item, na ordem recebida.
+    """
+    results: List[InsertManyResultDict] = [
+        {"index": i, "id": None, "error": None} for i in range(len(products))
+    ]
+    pending: Dict[str, Tuple[int, Tuple[str, str, Decimal]]] = {}
+    for i, product in enumerate(products):
+        values = _normalize_product_values(
+            product["name"], product["category"], product["price"]
+        )
+        key = _name_key(values[0])
+        if key in pending:
+            results[i]["error"] = f"Nome repetido no lote: {values[0]}"
+            continue
+        pending[key] = (i, values)
+    if not pending:
+        return results
+
+    with _connection_scope() as (conn, cursor):
+        _insert_pending_rows(cursor, pending, results)
+        version = _bump_catalog_version(conn)
+    _on_catalog_changed(
+        ids=[result["id"] for result in results if result["id"] is not None], version=version
+    )
+    return results
 
 #* READ
 def select(
     selected_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = "*",
     desc_sort: bool = False,
-    order_by_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = "*",
-    group_by_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = "*",
+    order_by_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = ("id",),
+    group_by_columns: Optional[Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]]] = None,
+    *,
+    where: Sequence[Condition] = (),
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
     **where_fields: Unpack[AllTableColumnsDict]
 ) -> Optional[_SelectedItemsDict]:
-    """Retorna uma seleção feita no SQL."""
-    where_cmd = ""
-    columns_cmd = "*"
-
-    if selected_columns and selected_columns != "*":
-        columns_cmd = ", ".join(selected_columns)
-    if where_fields:
-        if where_fields.get("category") is not None and isinstance(where_fields["category"], ProductCategory):
-            where_fields["category"] = where_fields["category"].value
-        if where_fields.get("price") is not None:
-            where_fields["price"] = Decimal(where_fields["price"])
-        where_cmd = _where_SQL(*where_fields) # pyright: ignore[reportArgumentType]
-    if order_by_columns == "*":
-        order_by_columns = ("id", *_TABLE_COLUMNS)
-    if group_by_columns == "*":
-        group_by_columns = ("id", *_TABLE_COLUMNS)
-    order_by_cmd = _order_by_SQL(*order_by_columns, desc_sort=desc_sort)
-    group_by_cmd = _group_by_SQL(*group_by_columns)
+    """
+    Retorna uma seleção feita no SQL.
+
+    Por padrão, ordena apenas pela chave primária e não agrupa.
+    Os campos em `where_fields` são filtros de igualdade; `where`
+    recebe outras condições de `query` (`in_`, `between`, `like`, ...).
+    Para paginar por keyset, passe `limit` e o `after_id` do
+    último item da página anterior (exige ordenação por `id`).
+    """
+    cmd, values = _select_SQL(
+        selected_columns, desc_sort, order_by_columns, group_by_columns,
+        limit, after_id, where_fields, where
+    )
+    cache_key = (cmd, tuple(values))
+    if _CACHE is not None:
+        generation = _CACHE.generation
+        cached = _CACHE.get(cache_key)
+        if cached is not MISSING:
+            return _copy_rows(cached)
+    selected_return: _SelectedItemsDict
+    selected_return, from_replica = _read(
+        lambda conn, cursor: _execute(conn, cursor, cmd, values, dictionary=True).fetchall()
+    )
+    if _CACHE is None:
+        return selected_return or None
+    if from_replica and _RECENT_WRITERS.any_recent():
+        # A réplica pode ainda não ter as últimas escritas: o resultado não vai ao cache.
+        return selected_return or None
+    if set(where_fields) == {"id"} and not where and after_id is None:
+        cache_tag = _id_cache_tag(int(where_fields["id"])) # pyright: ignore[reportTypedDictNotRequiredAccess]
+    else:
+        cache_tag = _LIST_CACHE_TAG
+    _CACHE.set(
+        cache_key, selected_return or None, tags=(cache_tag,), generation=generation
+    )
+    return _copy_rows(selected_return or None)
+
+def iter_select(
+    selected_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = "*",
+    desc_sort: bool = False,
+    order_by_columns: Union[Tuple[_ColumnsNamesLiteral, ...], Literal["*"]] = ("id",),
+    *,
+    where: Sequence[Condition] = (),
+    batch_size: int = 500,
+    **where_fields: Unpack[AllTableColumnsDict]
+) -> Iterator[_SelectedItemDict]:
+    """
+    Versão em streaming de `select`: gera as linhas uma a uma,
+    lendo-as do servidor em lotes de `batch_size` com `fetchmany`.
+    A conexão fica presa ao gerador até ele terminar ou ser fechado.
+    """
+    cmd, values = _select_SQL(
+        selected_columns, desc_sort, order_by_columns, None, None, None, where_fields, where
+    )
+    with _connection_scope(dictionary_cursor=True, with_commit=False) as (_, cursor):
+        _run(cursor, cmd, values)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows # pyright: ignore[reportReturnType]
+
+def search(
+    *,
+    limit: Optional[int] = None,
+    **filters: Unpack[SearchFiltersDict]
+) -> Optional[_SelectedItemsDict]:
+    """
+    Busca produtos por categoria, faixa de preço e prefixo do nome,
+    com a ordenação de `sort` (um `ProductSort`). Usa o cache de `select`.
+    """
+    conditions, order_by = _search_query(filters)
+    return select(
+        order_by_columns=order_by, where=conditions, limit=limit # pyright: ignore[reportArgumentType]
+    )
+
+def explain_search(
+    *,
+    limit: Optional[int] = None,
+    **filters: Unpack[SearchFiltersDict]
+) -> List[Dict[str, Union[str, int, None]]]:
+    """Retorna o `EXPLAIN` do comando que `search` executaria com os mesmos filtros."""
+    conditions, order_by = _search_query(filters)
+    cmd, values = _select_SQL(
+        "*", False, order_by, None, limit, None, {}, conditions # pyright: ignore[reportArgumentType]
+    )
+    with _connection_scope(dictionary_cursor=True, with_commit=False) as (_, cursor):
+        _run(cursor, f"EXPLAIN {cmd}", values)
+        return cursor.fetchall() # pyright: ignore[reportReturnType]
+
+def category_totals() -> List[CategoryTotalsDict]:
+    """
+    Calcula no DB, com `GROUP BY category`, a contagem, a soma e os
+    preços mínimo e máximo de cada categoria. É a conta completa,
+    usada para conferir o resumo mantido por `stats.CategorySummary`.
+    """
     cmd = (
-        f"SELECT {columns_cmd} FROM {_TABLE_NAME_REFERENCE} " +
-        f"{where_cmd} {group_by_cmd} {order_by_cmd}"
+        "SELECT category, COUNT(*) AS count, SUM(price) AS total, "
+        "MIN(price) AS min_price, MAX(price) AS max_price "
+        f"FROM {_TABLE_NAME_REFERENCE} GROUP BY category"
     )
-    conn, cursor = start_connection(dictionary_cursor=True)
-    cursor.execute(cmd, (*where_fields.values(),)) # pyright: ignore[reportArgumentType]
+    with _connection_scope(dictionary_cursor=True, with_commit=False) as (_, cursor):
+        _run(cursor, cmd)
+        return cursor.fetchall() # pyright: ignore[reportReturnType]
 
-    selected_return: _SelectedItemsDict
-    selected_return = cursor.fetchall() # pyright: ignore[reportAssignmentType]
+def _purge_tombstones(now: datetime.datetime) -> None:
+    """
+    Apaga os registros de exclusão mais antigos que o período guardado,
+    no máximo uma vez a cada `_TOMBSTONE_PURGE_INTERVAL` segundos.
+    """
+    global _LAST_TOMBSTONE_PURGE  # pylint: disable=global-statement
+    clock = time.monotonic()
+    if _LAST_TOMBSTONE_PURGE is not None and clock - _LAST_TOMBSTONE_PURGE < _TOMBSTONE_PURGE_INTERVAL:
+        return
+    _LAST_TOMBSTONE_PURGE = clock
+    oldest = now - datetime.timedelta(days=config.CHANGES_RETENTION_DAYS)
+    with _connection_scope() as (_, cursor):
+        _run(cursor, f"DELETE FROM {_TOMBSTONE_TABLE_REFERENCE} WHERE deleted_at < %s", (oldest,))
+
+def changes(since: Optional[ChangesCursor], limit: int) -> ChangesDict:
+    """
+    Retorna os produtos criados ou alterados (pelo `updated_at`) e os
+    ids apagados (pelos registros de exclusão) depois da posição `since`,
+    em ordem, até `limit` mudanças. Sem `since`, só retorna a posição
+    atual, de onde o cliente começa a acompanhar as mudanças.
 
-    close_connection(conn, cursor, with_commit=False)
-    for i, selected in enumerate(selected_return):
-        time_stamp = selected.get("time_stamp")
-        if time_stamp is not None and isinstance(time_stamp, datetime.datetime):
-            selected_return[i]["time_stamp"] = time_stamp.strftime("%d/%m/%Y - %H:%M:%S")
-    return selected_return or None
+    Uma transação pode confirmar depois que outra mais nova já foi lida.
+    Por isso, quando não há mais mudanças, a próxima posição volta
+    `CHANGES_GRACE_SECONDS`: algumas mudanças podem ser repetidas,
+    mas nenhuma é perdida.
+
+    Raises:
+        ChangesExpiredError: `since` é mais antigo que os registros de exclusão.
+    """
+    with _connection_scope(dictionary_cursor=True, with_commit=False) as (_, cursor):
+        _run(cursor, "SELECT NOW(6) AS now")
+        now: datetime.datetime = cursor.fetchone()["now"] # pyright: ignore[reportOptionalSubscript]
+        caught_up_cursor = (now - datetime.timedelta(seconds=config.CHANGES_GRACE_SECONDS), 0)
+        if since is None:
+            return {"upserted": [], "deleted": [], "next_cursor": caught_up_cursor, "has_more": False}
+        if since[0] < now - datetime.timedelta(days=config.CHANGES_RETENTION_DAYS):
+            raise ChangesExpiredError("A posição é antiga demais: recarregue todos os produtos.")
+        moment, after_id = since
+        _run(
+            cursor,
+            f"SELECT * FROM {_TABLE_NAME_REFERENCE} "
+            "WHERE updated_at > %s OR (updated_at = %s AND id > %s) "
+            "ORDER BY updated_at, id LIMIT %s",
+            (moment, moment, after_id, limit + 1)
+        )
+        upserted: _SelectedItemsDict = cursor.fetchall() # pyright: ignore[reportAssignmentType]
+        _run(
+            cursor,
+            f"SELECT id, deleted_at FROM {_TOMBSTONE_TABLE_REFERENCE} "
+            "WHERE deleted_at > %s OR (deleted_at = %s AND id > %s) "
+            "ORDER BY deleted_at, id LIMIT %s",
+            (moment, moment, after_id, limit + 1)
+        )
+        deleted = cursor.fetchall()
+    _purge_tombstones(now)
+    # Junta as duas sequências ordenadas e fica com as `limit` primeiras mudanças.
+    merged = sorted(
+        [((row["updated_at"], row["id"]), row) for row in upserted] +
+        [((row["deleted_at"], row["id"]), None) for row in deleted],
+        key=lambda change: change[0]
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    return {
+        "upserted": [row for _, row in merged if row is not None],
+        "deleted": [key[1] for key, row in merged if row is None],
+        "next_cursor": merged[-1][0] if has_more else caught_up_cursor,
+        "has_more": has_more
+    }
 
 #* UPDATE
 def update(
@@ -269,42 +1510,69 @@ def update(
     Atualiza um produto na tabela `produtos`.
 
     Returns:
-        (int | None): Número de linhas que foram atualizadas.
+        (int | None): Número de linhas encontradas pelas condições.
     """
     if not (conditions or set_fields):
         return None
-    normalized_conditions = to_unique_depth(conditions, to=list)
-    for i, condition in enumerate(normalized_conditions):
-        if isinstance(condition, Enum):
-            normalized_conditions[i] = condition.value
-        elif isinstance(condition, (float, int)):
-            normalized_conditions[i] = Decimal(condition)
-    if set_fields.get("category") is not None and isinstance(set_fields["category"], ProductCategory):
-        set_fields["category"] = set_fields["category"].value
-    if set_fields.get("price") is not None:
-        set_fields["price"] = Decimal(set_fields["price"])
-    where_columns = get_even_elements(normalized_conditions)
-    where_cmd = _where_SQL(*where_columns) # pyright: ignore[reportArgumentType]
-    set_cmd = _set_SQL(*set_fields) # pyright: ignore[reportArgumentType]
-
-    values = (*set_fields.values(), *get_odd_elements(normalized_conditions))
-    cmd = f"UPDATE {_TABLE_NAME_REFERENCE} {set_cmd} {where_cmd}"
-    conn, cursor = start_connection()
-    cursor.execute(cmd, values)
-    affected_lines = cursor.rowcount
-    close_connection(conn, cursor)
+    return _write(lambda tx: tx.update(*conditions, **set_fields))
+
+def update_many(
+    *,
+    ids: Optional[Sequence[int]] = None,
+    filters: Optional[TableColumnsDict] = None,
+    price_factor: Optional[Union[Decimal, float, int]] = None,
+    **set_fields: Unpack[TableColumnsDict]
+) -> int:
+    """
+    Atualiza em massa, num único UPDATE, os produtos com os `ids`
+    indicados e/ou que batem com `filters`. `price_factor` aplica
+    uma mudança relativa de preço (`price = price * fator`).
+
+    Returns:
+        (int): Número de linhas que foram atualizadas.
+    """
+    if price_factor is not None and "price" in set_fields:
+        raise ValueError("Use `price` ou `price_factor`, não ambos.")
+    cmd, values = _TABLE.update(
+        set_fields, _bulk_conditions(ids, filters),
+        multiply_fields=None if price_factor is None else {"price": price_factor}
+    )
+    with _connection_scope() as (conn, cursor):
+        _run(cursor, cmd, values)
+        affected_lines = cursor.rowcount
+        version = _bump_catalog_version(conn)
+    _on_catalog_changed(ids=None if filters else ids, version=version)
+    return affected_lines
+
+def delete_many(
+    *,
+    ids: Optional[Sequence[int]] = None,
+    filters: Optional[TableColumnsDict] = None
+) -> int:
+    """
+    Apaga em massa, num único DELETE, os produtos com os `ids`
+    indicados e/ou que batem com `filters`.
+
+    Returns:
+        (int): Número de linhas que foram apagadas.
+    """
+    cmd, values = _TABLE.delete(_bulk_conditions(ids, filters))
+    with _connection_scope() as (conn, cursor):
+        _run(cursor, cmd, values)
+        affected_lines = cursor.rowcount
+        version = _bump_catalog_version(conn)
+    _on_catalog_changed(ids=None if filters else ids, version=version)
     return affected_lines
 
-def delete(*where_condition: _WhereConditions) -> None:
-    """Apaga um linha da tabela `produtos`."""
+def delete(*where_condition: _WhereConditions) -> Optional[int]:
+    """
+    Apaga um linha da tabela `produtos`.
+
+    Returns:
+        (int | None): Número de linhas apagadas.
+    """
     if not where_condition:
-        return
-    normalized_conditions = to_unique_depth(where_condition, to=list)
-    for i, condition in enumerate(normalized_conditions):
-        if isinstance(condition, Enum):
-            normalized_conditions[i] = condition.value
-    delete_cmd = _delete_SQL(*get_even_elements(normalized_conditions))
-    values = get_odd_elements(normalized_conditions)
-    conn, cursor = start_connection()
-    cursor.execute(delete_cmd, values)
-    close_connection(conn, cursor)
+        return None
+    with transaction() as tx:
+        affected_lines = tx.delete(*where_condition)
+    return affected_lines
@@ -17,3 +17,18 @@ class ProductCategory(Enum):
     DOCES = "doce"
     BEBIDAS = "bebida"
     REFEICOES = "refeição"
+
+
+class ProductSort(Enum):
+    """
+    Representa uma ordenação da busca de produtos.
+    O `-` na frente indica ordem decrescente.
+    """
+    ID = "id"
+    ID_DESC = "-id"
+    NAME = "name"
+    NAME_DESC = "-name"
+    PRICE = "price"
+    PRICE_DESC = "-price"
+    TIME_STAMP = "time_stamp"
+    TIME_STAMP_DESC = "-time_stamp"
@@ -0,0 +1,119 @@
+"""
+Esse módulo contém o pub/sub em memória dos eventos enviados ao
+front-end por Server-Sent Events (GET /api/events).
+"""
+from typing import Any, Callable, List, Optional, TypedDict
+from queue import Queue, Empty, Full
+from threading import Lock
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+class EventDict(TypedDict):
+    """Um evento publicado: id sequencial, tipo e dados em JSON."""
+    id: int
+    type: str
+    data: Any
+
+# Enviado no lugar dos eventos perdidos quando a fila de um assinante
+# enche: o cliente deve recarregar tudo.
+RESYNC_EVENT = "resync"
+
+class TooManySubscribersError(Exception):
+    """O número máximo de assinantes foi atingido."""
+
+# * =================
+# * == ASSINATURAS ==
+# * =================
+
+class Subscription:
+    """
+    Fila de eventos de um assinante, com tamanho máximo. Se o
+    assinante não acompanhar os eventos e a fila encher, os eventos
+    pendentes são trocados por um único `RESYNC_EVENT`, para que
+    quem publica nunca fique esperando.
+    """
+    def __init__(self, broker: "EventBroker", queue_size: int) -> None:
+        self._broker = broker
+        self._queue: Queue[EventDict] = Queue(maxsize=queue_size)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[EventDict]:
+        """Espera o próximo evento. Retorna None se o `timeout` acabar."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def close(self) -> None:
+        """Cancela a assinatura."""
+        self._broker.unsubscribe(self)
+
+    def _offer(self, event: EventDict) -> None:
+        """Coloca um evento na fila sem bloquear."""
+        try:
+            self._queue.put_nowait(event)
+        except Full:
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except Empty:
+                    break
+            self._queue.put_nowait({"id": event["id"], "type": RESYNC_EVENT, "data": None})
+
+# * ======================
+# * == PUBLICADOR (HUB) ==
+# * ======================
+
+class EventBroker:
+    """
+    Distribui cada evento publicado para as filas de todos os
+    assinantes. Publicar nunca bloqueia, então pode ser feito
+    de dentro das rotas e dos listeners do circuit breaker.
+    """
+    def __init__(self, *, queue_size: int = 100, max_subscribers: int = 100) -> None:
+        if queue_size < 1:
+            raise ValueError("`queue_size` deve ser maior que zero.")
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscriptions: List[Subscription] = []
+        self._last_id = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        """
+        Cria uma assinatura.
+
+        Raises:
+            TooManySubscribersError: O número máximo de assinantes foi atingido.
+        """
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise TooManySubscribersError(
+                    f"O limite de {self.max_subscribers} assinantes foi atingido."
+                )
+            subscription = Subscription(self, self.queue_size)
+            self._subscriptions.append(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove uma assinatura. Não faz nada se ela já foi removida."""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event_type: str, data: Any = None) -> None:
+        """Publica um evento para todos os assinantes."""
+        with self._lock:
+            self._last_id += 1
+            event: EventDict = {"id": self._last_id, "type": event_type, "data": data}
+            for subscription in self._subscriptions:
+                subscription._offer(event) # pylint: disable=protected-access
+
+def format_sse(event: EventDict, dumps: Callable[[Any], str]) -> str:
+    """Converte um evento no formato de texto do Server-Sent Events."""
+    return f"id: {event["id"]}\nevent: {event["type"]}\ndata: {dumps(event["data"])}\n\n"
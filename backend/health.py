@@ -0,0 +1,191 @@
+"""
+Esse módulo contém o monitor de saúde do banco de dados e o
+circuit breaker usado pelas rotas para falhar rápido quando o
+DB está fora do ar.
+"""
+from typing import Callable, List, Literal, TypeAlias
+from threading import Event, Lock, Thread
+from time import monotonic
+from mysql.connector.errorcode import (
+    CR_CONN_HOST_ERROR, CR_CONNECTION_ERROR, CR_SERVER_GONE_ERROR,
+    CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED
+)
+from mysql.connector.errors import Error, InterfaceError, OperationalError
+
+BreakerState: TypeAlias = Literal["closed", "open", "half_open"]
+_StateListener: TypeAlias = Callable[[BreakerState, BreakerState], None]
+
+CLOSED: BreakerState = "closed"
+OPEN: BreakerState = "open"
+HALF_OPEN: BreakerState = "half_open"
+
+# Erros que indicam que o servidor não está acessível.
+CONNECTION_ERRORS = (InterfaceError, OperationalError)
+# Códigos dos mesmos erros: a extensão em C do `mysql.connector` lança
+# um `DatabaseError` genérico para alguns deles (ex.: 2003 e 2006).
+CONNECTION_ERRNOS = frozenset((
+    CR_CONNECTION_ERROR, # 2002: socket local
+    CR_CONN_HOST_ERROR, # 2003: não conectou ao host
+    CR_SERVER_GONE_ERROR, # 2006: o servidor sumiu
+    CR_SERVER_LOST, # 2013: conexão perdida durante a consulta
+    CR_SERVER_LOST_EXTENDED # 2055: conexão perdida (com detalhes)
+))
+
+def is_connection_error(error: BaseException) -> bool:
+    """Retorna se o erro indica que o servidor não está acessível, pela classe ou pelo código."""
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    return isinstance(error, Error) and error.errno in CONNECTION_ERRNOS
+
+class CircuitBreaker:
+    """
+    Circuit breaker com os estados fechado, aberto e meio-aberto.
+
+    - Fechado: o DB está disponível.
+    - Aberto: o DB está fora do ar; as rotas falham na hora.
+    - Meio-aberto: um teste está em andamento.
+
+    Cada teste que falha dobra o tempo até o próximo teste,
+    de `base_backoff` até `max_backoff` segundos.
+    """
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 1,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        clock: Callable[[], float] = monotonic
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._lock = Lock()
+        self._state: BreakerState = OPEN
+        self._failures = 0
+        self._backoff = 0.0
+        self._next_probe_at = 0.0
+        self._listeners: List[_StateListener] = []
+
+    @property
+    def state(self) -> BreakerState:
+        """Estado atual do circuito."""
+        return self._state
+
+    def add_listener(self, listener: _StateListener) -> None:
+        """Registra um callback chamado com `(estado_antigo, estado_novo)`."""
+        self._listeners.append(listener)
+
+    def _set_state(self, state: BreakerState) -> None:
+        """Troca o estado e avisa os listeners. Deve ser chamado com o lock."""
+        old_state, self._state = self._state, state
+        if old_state != state:
+            for listener in self._listeners:
+                listener(old_state, state)
+
+    def is_available(self) -> bool:
+        """Retorna se as rotas podem usar o DB."""
+        return self._state == CLOSED
+
+    def retry_after(self) -> float:
+        """Segundos até o próximo teste de conexão."""
+        if self._state == CLOSED:
+            return 0.0
+        return max(0.0, self._next_probe_at - self._clock())
+
+    def begin_probe(self) -> bool:
+        """
+        Passa para meio-aberto se o tempo de espera acabou.
+        Retorna se um teste deve ser feito agora.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN or self._clock() < self._next_probe_at:
+                return False
+            self._set_state(HALF_OPEN)
+            return True
+
+    def record_success(self) -> None:
+        """Registra um sucesso e fecha o circuito."""
+        with self._lock:
+            self._failures = 0
+            self._backoff = 0.0
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        """Registra uma falha, abrindo o circuito se necessário."""
+        with self._lock:
+            self._failures += 1
+            if self._state == CLOSED and self._failures < self.failure_threshold:
+                return
+            if self._state == OPEN and self._clock() < self._next_probe_at:
+                return
+            if self._backoff:
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+            else:
+                self._backoff = self.base_backoff
+            self._next_probe_at = self._clock() + self._backoff
+            self._set_state(OPEN)
+
+class HealthMonitor:
+    """
+    Thread que testa o DB periodicamente com `probe` e alimenta
+    o circuit breaker. Enquanto o circuito está aberto, os testes
+    seguem o backoff exponencial do breaker.
+    """
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        breaker: CircuitBreaker,
+        *,
+        interval: float = 5.0
+    ) -> None:
+        self.probe = probe
+        self.breaker = breaker
+        self.interval = interval
+        self._stop = Event()
+        self._wake = Event()
+        self._thread = Thread(target=self._run, name="db-health-monitor", daemon=True)
+
+    def start(self) -> None:
+        """Inicia a thread do monitor."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Encerra a thread do monitor."""
+        self._stop.set()
+        self._wake.set()
+
+    def check(self) -> bool:
+        """Faz um teste agora e registra o resultado."""
+        try:
+            is_healthy = self.probe()
+        except Exception: # pylint: disable=broad-exception-caught
+            is_healthy = False
+        if is_healthy:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return is_healthy
+
+    def report_error(self, error: BaseException) -> None:
+        """
+        Recebe um erro ocorrido numa rota. Erros de conexão
+        abrem o circuito sem esperar pelo próximo teste.
+        """
+        if is_connection_error(error):
+            self.breaker.record_failure()
+            self._wake.set()
+
+    def _run(self) -> None:
+        """Laço principal do monitor."""
+        while not self._stop.is_set():
+            if self.breaker.begin_probe():
+                self.check()
+            if self.breaker.is_available():
+                timeout = self.interval
+            else:
+                timeout = self.breaker.retry_after()
+            self._wake.wait(timeout)
+            self._wake.clear()
@@ -0,0 +1,75 @@
+"""
+Esse módulo contém o provedor de JSON do Flask usado nas respostas
+da API, com o orjson como caminho rápido (se instalado) e o módulo
+`json` como alternativa.
+"""
+from typing import Any, Callable, Literal, TypeAlias, Union
+from decimal import Decimal
+import datetime
+import json
+from flask import Flask, Response
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError: # O orjson é opcional.
+    orjson = None
+
+JSONBackendLiteral: TypeAlias = Literal["auto", "orjson", "stdlib"]
+
+def _default(obj: Any) -> Any:
+    """
+    Converte os tipos que não são nativos do JSON. Datas saem em
+    ISO 8601, como o orjson as gera sem passar por aqui.
+    """
+    if isinstance(obj, Decimal):
+        # Mantém as casas decimais do DECIMAL(10, 2), como o Flask fazia.
+        return str(obj)
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON.")
+
+class FastJSONProvider(JSONProvider):
+    """
+    Provedor de JSON com saída compacta e sem ordenar as chaves.
+    Com o orjson, as respostas são geradas direto em bytes e as
+    datas são convertidas em C; `Decimal` passa por `_default`.
+    """
+    def __init__(self, app: Flask, backend: JSONBackendLiteral = "auto") -> None:
+        super().__init__(app)
+        if backend not in ("auto", "orjson", "stdlib"):
+            raise ValueError(f"Backend de JSON inválido: {backend}.")
+        if backend == "orjson" and orjson is None:
+            raise ImportError("O backend `orjson` foi pedido, mas o orjson não está instalado.")
+        self.backend: Literal["orjson", "stdlib"] = (
+            "orjson" if backend != "stdlib" and orjson is not None else "stdlib"
+        )
+        self._encoder = json.JSONEncoder(
+            default=_default, ensure_ascii=False, separators=(",", ":")
+        )
+        self._dumps_bytes: Callable[[Any], bytes]
+        if self.backend == "orjson":
+            options = orjson.OPT_NON_STR_KEYS # pyright: ignore[reportOptionalMemberAccess]
+            dumps = orjson.dumps # pyright: ignore[reportOptionalMemberAccess]
+            self._dumps_bytes = lambda obj: dumps(obj, default=_default, option=options)
+            self._loads = orjson.loads # pyright: ignore[reportOptionalMemberAccess]
+        else:
+            self._dumps_bytes = lambda obj: self._encoder.encode(obj).encode("utf-8")
+            self._loads = json.loads
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            return json.dumps(obj, **kwargs)
+        if self.backend == "orjson":
+            return self._dumps_bytes(obj).decode("utf-8")
+        return self._encoder.encode(obj)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return self._loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype="application/json")
@@ -0,0 +1,276 @@
+"""
+Esse módulo contém as métricas da aplicação (contadores e
+histogramas de latência) e a sua exportação no formato de texto
+do Prometheus (GET /metrics), sem depender do `prometheus_client`.
+"""
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union
+from bisect import bisect_left
+from math import inf
+from threading import Lock
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+_Number = Union[int, float]
+_LabelValues = Tuple[str, ...]
+
+# Tipo de conteúdo do formato de texto do Prometheus.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Limites padrão dos buckets dos histogramas, em segundos.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+def _format_value(value: _Number) -> str:
+    """Formata um número como o Prometheus espera."""
+    if value == inf:
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def _escape(value: str) -> str:
+    """Escapa o valor de um label."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    """Monta o trecho `{nome="valor",...}` de uma amostra."""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _header(name: str, help_: str, type_: str) -> List[str]:
+    """Retorna as linhas `# HELP` e `# TYPE` de uma métrica."""
+    help_ = help_.replace("\\", "\\\\").replace("\n", "\\n")
+    return [f"# HELP {name} {help_}", f"# TYPE {name} {type_}"]
+
+# * ==============
+# * == MÉTRICAS ==
+# * ==============
+
+class Counter:
+    """
+    Contador que só cresce, com um valor para cada combinação de
+    labels. Cada `inc` é uma soma sob um único lock.
+    """
+    def __init__(self, name: str, help_: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_
+        self.label_names = tuple(labels)
+        self._values: Dict[_LabelValues, float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values: str, amount: _Number = 1) -> None:
+        """Soma `amount` ao valor dos labels indicados."""
+        if amount < 0:
+            raise ValueError("Um contador não pode diminuir.")
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Retorna o valor atual dos labels indicados."""
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        """Retorna as linhas da métrica no formato de texto."""
+        with self._lock:
+            values = list(self._values.items())
+        lines = _header(self.name, self.help, "counter")
+        for label_values, value in values:
+            lines.append(
+                f"{self.name}{_labels_text(self.label_names, label_values)} {_format_value(value)}"
+            )
+        return lines
+
+class _HistogramValues:
+    """Contagem por bucket, soma e total das observações de uma combinação de labels."""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+class Histogram:
+    """
+    Histograma com buckets fixos (`le`, em segundos). Cada `observe`
+    é uma busca binária fora do lock e três somas dentro dele; os
+    buckets só são acumulados na exportação.
+    """
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        if not buckets or list(buckets) != sorted(set(buckets)):
+            raise ValueError("`buckets` deve ser uma sequência crescente e sem repetições.")
+        self.name = name
+        self.help = help_
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[_LabelValues, _HistogramValues] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Registra uma observação nos labels indicados."""
+        # O último índice é o bucket `+Inf`.
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(label_values)
+            if values is None:
+                values = self._values[label_values] = _HistogramValues(len(self.buckets) + 1)
+            values.counts[index] += 1
+            values.sum += value
+            values.count += 1
+
+    def snapshot(self, *label_values: str) -> Optional[Tuple[List[int], float, int]]:
+        """
+        Retorna as contagens acumuladas de cada bucket (com o `+Inf`),
+        a soma e o total dos labels indicados. None se não há observações.
+        """
+        with self._lock:
+            values = self._values.get(label_values)
+            if values is None:
+                return None
+            counts, total, count = list(values.counts), values.sum, values.count
+        cumulative: List[int] = []
+        running = 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative, total, count
+
+    def render(self) -> List[str]:
+        """Retorna as linhas da métrica no formato de texto."""
+        with self._lock:
+            label_values_list = list(self._values)
+        lines = _header(self.name, self.help, "histogram")
+        bucket_names = (*self.label_names, "le")
+        bounds = [_format_value(bound) for bound in (*self.buckets, inf)]
+        for label_values in label_values_list:
+            snapshot = self.snapshot(*label_values)
+            if snapshot is None:
+                continue
+            cumulative, total, count = snapshot
+            for bound, bucket_count in zip(bounds, cumulative):
+                labels = _labels_text(bucket_names, (*label_values, bound))
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _labels_text(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class _CallbackGauge:
+    """Gauge cujo valor é lido de uma função na hora da exportação."""
+    def __init__(self, name: str, help_: str, func: Callable[[], Optional[_Number]]) -> None:
+        self.name = name
+        self.help = help_
+        self._func = func
+
+    def render(self) -> List[str]:
+        """Retorna as linhas da métrica. Sem valor (None), não retorna nada."""
+        value = self._func()
+        if value is None:
+            return []
+        return [*_header(self.name, self.help, "gauge"), f"{self.name} {_format_value(value)}"]
+
+class _StatsCollector:
+    """
+    Exporta cada campo numérico de um dicionário de estatísticas
+    (ex.: `db.pool_stats()`) como a métrica `<prefixo>_<campo>`.
+    """
+    def __init__(
+        self, prefix: str, help_: str, func: Callable[[], Optional[Mapping[str, object]]]
+    ) -> None:
+        self.name = prefix
+        self.help = help_
+        self._func = func
+
+    def render(self) -> List[str]:
+        """Retorna as linhas das métricas. Sem estatísticas (None), não retorna nada."""
+        stats = self._func()
+        lines: List[str] = []
+        for key, value in (stats or {}).items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.name}_{key}"
+            lines.extend(_header(name, f"{self.help} ({key})", "untyped"))
+            lines.append(f"{name} {_format_value(value)}")
+        return lines
+
+_Metric = Union[Counter, Histogram, _CallbackGauge, _StatsCollector]
+T_Metric = TypeVar("T_Metric", Counter, Histogram, _CallbackGauge, _StatsCollector)
+
+# * ==============
+# * == REGISTRO ==
+# * ==============
+
+class Registry:
+    """Conjunto de métricas exportadas juntas por `render`."""
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def _register(self, metric: T_Metric) -> T_Metric:
+        """
+        Adiciona uma métrica ao registro e a retorna. Se o módulo que
+        a cria for importado de novo (ex.: `db` e `backend.db`), o
+        contador ou histograma já registrado é reaproveitado, e um
+        gauge passa a ler da nova função.
+
+        Raises:
+            ValueError: Já existe uma métrica de outro tipo (ou com outros labels) com o mesmo nome.
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and (
+                type(existing) is not type(metric) or
+                getattr(existing, "label_names", ()) != getattr(metric, "label_names", ())
+            ):
+                raise ValueError(f"Métrica já registrada com outro tipo ou labels: {metric.name}")
+            if isinstance(existing, (Counter, Histogram)):
+                return existing # pyright: ignore[reportReturnType]
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_: str, labels: Sequence[str] = ()) -> Counter:
+        """Cria e registra um contador."""
+        return self._register(Counter(name, help_, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Cria e registra um histograma."""
+        return self._register(Histogram(name, help_, labels, buckets=buckets))
+
+    def gauge(self, name: str, help_: str, func: Callable[[], Optional[_Number]]) -> None:
+        """Registra um gauge lido de `func` a cada exportação."""
+        self._register(_CallbackGauge(name, help_, func))
+
+    def stats(
+        self, prefix: str, help_: str, func: Callable[[], Optional[Mapping[str, object]]]
+    ) -> None:
+        """Registra os campos numéricos das estatísticas retornadas por `func`."""
+        self._register(_StatsCollector(prefix, help_, func))
+
+    def render(self) -> str:
+        """Exporta todas as métricas no formato de texto do Prometheus (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+# Registro usado pela aplicação.
+REGISTRY = Registry()
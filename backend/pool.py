@@ -0,0 +1,248 @@
+"""
+Esse módulo contém um pool de conexões thread-safe,
+independente do driver do banco de dados.
+"""
+from typing import (
+    Callable, Generic, TypeVar,
+    Dict, Optional, TypedDict
+)
+from collections import deque
+from threading import Condition
+from time import monotonic
+
+T_Connection = TypeVar("T_Connection")
+
+# Quantidade de esperas recentes guardadas para calcular os percentis.
+_WAIT_SAMPLES = 1024
+
+class PoolTimeoutError(Exception):
+    """Erro lançado quando nenhuma conexão fica livre dentro do tempo limite."""
+
+class PoolStatsDict(TypedDict):
+    """
+    Representa um dicionário tipado com as estatísticas de um pool.
+    Os tempos de espera estão em milissegundos.
+    """
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    acquired: int
+    created: int
+    recycled: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_p50_ms: float
+    wait_p99_ms: float
+    wait_max_ms: float
+
+class _PoolEntry(Generic[T_Connection]):
+    """Representa uma conexão guardada no pool."""
+    __slots__ = ("connection", "created_at", "last_used_at")
+
+    def __init__(self, connection: T_Connection, now: float) -> None:
+        self.connection = connection
+        self.created_at = now
+        self.last_used_at = now
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    """Retorna o percentil de uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+class ConnectionPool(Generic[T_Connection]):
+    """
+    Pool de conexões com tamanho máximo, tempo limite de espera,
+    teste de saúde ao retirar uma conexão e reciclagem de conexões
+    ociosas ou antigas.
+
+    Args:
+        factory: Cria uma conexão nova.
+        close: Fecha uma conexão.
+        ping: Retorna se uma conexão ainda está válida.
+        max_size: Número máximo de conexões abertas.
+        acquire_timeout: Tempo máximo (s) esperando uma conexão livre.
+        max_idle_seconds: Conexões ociosas por mais tempo são recicladas.
+        max_lifetime_seconds: Conexões mais antigas que isso são recicladas.
+        ping_after_seconds: Conexões ociosas por mais tempo recebem um
+            ping antes de serem entregues.
+    """
+    def __init__(
+        self,
+        factory: Callable[[], T_Connection],
+        *,
+        close: Callable[[T_Connection], None],
+        ping: Callable[[T_Connection], bool],
+        max_size: int = 10,
+        acquire_timeout: float = 5.0,
+        max_idle_seconds: float = 300.0,
+        max_lifetime_seconds: float = 3600.0,
+        ping_after_seconds: float = 5.0
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("O tamanho máximo do pool deve ser ao menos 1.")
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.ping_after_seconds = ping_after_seconds
+        self._factory = factory
+        self._close = close
+        self._ping = ping
+        self._condition = Condition()
+        # Conexões livres: o fim da fila é a mais recente (LIFO).
+        self._idle: deque[_PoolEntry[T_Connection]] = deque()
+        self._in_use: Dict[int, _PoolEntry[T_Connection]] = {}
+        # Conexões abertas, incluindo as que estão sendo criadas.
+        self._size = 0
+        self._acquired = 0
+        self._created = 0
+        self._recycled = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def _is_expired(self, entry: _PoolEntry[T_Connection], now: float) -> bool:
+        """Retorna se uma conexão passou do tempo de vida ou de ociosidade."""
+        return (
+            now - entry.created_at >= self.max_lifetime_seconds
+            or now - entry.last_used_at >= self.max_idle_seconds
+        )
+
+    def _is_healthy(self, entry: _PoolEntry[T_Connection], now: float) -> bool:
+        """Testa uma conexão ociosa antes de entregá-la."""
+        if self._is_expired(entry, now):
+            return False
+        if now - entry.last_used_at < self.ping_after_seconds:
+            return True
+        return self._ping(entry.connection)
+
+    def _discard(self, entry: _PoolEntry[T_Connection]) -> None:
+        """Fecha uma conexão e libera sua vaga no pool."""
+        try:
+            self._close(entry.connection)
+        except Exception: # pylint: disable=broad-exception-caught
+            pass
+        with self._condition:
+            self._size -= 1
+            self._recycled += 1
+            self._condition.notify()
+
+    def _prune_idle(self, now: float) -> list:
+        """
+        Remove da fila as conexões ociosas expiradas. Deve ser
+        chamado com o lock adquirido.
+        """
+        expired = []
+        while self._idle and self._is_expired(self._idle[0], now):
+            expired.append(self._idle.popleft())
+        return expired
+
+    def acquire(self, timeout: Optional[float] = None) -> T_Connection:
+        """
+        Retira uma conexão do pool, esperando até `timeout`
+        segundos por uma vaga.
+
+        Raises:
+            PoolTimeoutError: Nenhuma conexão ficou livre a tempo.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = monotonic()
+        deadline = start + timeout
+        while True:
+            entry: Optional[_PoolEntry[T_Connection]] = None
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Nenhuma conexão livre em {timeout} segundos."
+                        )
+                    self._condition.wait(remaining)
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    # Reserva a vaga antes de criar a conexão fora do lock.
+                    self._size += 1
+            now = monotonic()
+            if entry is None:
+                try:
+                    connection = self._factory()
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                entry = _PoolEntry(connection, now)
+                with self._condition:
+                    self._created += 1
+            elif not self._is_healthy(entry, now):
+                self._discard(entry)
+                continue
+            waited = monotonic() - start
+            with self._condition:
+                self._in_use[id(entry.connection)] = entry
+                self._acquired += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._waits.append(waited)
+            return entry.connection
+
+    def owns(self, connection: T_Connection) -> bool:
+        """Retorna se a conexão foi retirada deste pool."""
+        with self._condition:
+            return id(connection) in self._in_use
+
+    def release(self, connection: T_Connection, *, discard: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool. Se `discard` for verdadeiro,
+        a conexão é fechada em vez de reutilizada.
+        """
+        now = monotonic()
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                raise ValueError("A conexão não pertence a este pool.")
+            expired = self._prune_idle(now)
+            if not discard:
+                entry.last_used_at = now
+                if not self._is_expired(entry, now):
+                    self._idle.append(entry)
+                    self._condition.notify()
+                    entry = None
+            if entry is not None:
+                expired.append(entry)
+        for expired_entry in expired:
+            self._discard(expired_entry)
+
+    def clear(self) -> None:
+        """Fecha todas as conexões ociosas do pool."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self) -> PoolStatsDict:
+        """Retorna as estatísticas atuais do pool."""
+        with self._condition:
+            waits = sorted(self._waits)
+            acquired = self._acquired
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "acquired": acquired,
+                "created": self._created,
+                "recycled": self._recycled,
+                "timeouts": self._timeouts,
+                "wait_avg_ms": (self._wait_total / acquired * 1000) if acquired else 0.0,
+                "wait_p50_ms": _percentile(waits, 0.50) * 1000,
+                "wait_p99_ms": _percentile(waits, 0.99) * 1000,
+                "wait_max_ms": self._wait_max * 1000
+            }
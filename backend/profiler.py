@@ -0,0 +1,174 @@
+"""
+Esse módulo contém o profiler das requisições: só as requisições
+escolhidas (por cabeçalho ou por amostragem) são medidas, e cada
+perfil é salvo num arquivo do `pstats` (cProfile) ou em pilhas
+colapsadas, o formato de entrada dos flame graphs.
+"""
+from typing import Callable, Dict, Literal, Optional
+from threading import Event, Lock, Thread, get_ident
+from time import time_ns
+import cProfile
+import hmac
+import os
+import random
+import re
+import sys
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+ProfileFormatLiteral = Literal["pstats", "collapsed"]
+_EXTENSIONS: Dict[str, str] = {"pstats": ".prof", "collapsed": ".folded"}
+_UNSAFE_NAME_PATTERN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# * ==========================
+# * == AMOSTRAGEM DE PILHAS ==
+# * ==========================
+
+class _StackSampler:
+    """
+    Lê a pilha de uma thread a cada `interval` segundos e conta
+    quantas vezes cada pilha apareceu. Só a thread da requisição
+    é medida, mesmo com outras requisições rodando ao mesmo tempo.
+    """
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._counts: Dict[str, int] = {}
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Laço da thread de amostragem."""
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id) # pylint: disable=protected-access
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+                frame = frame.f_back
+            if frames:
+                stack = ";".join(reversed(frames))
+                self._counts[stack] = self._counts.get(stack, 0) + 1
+
+    def stop(self) -> Dict[str, int]:
+        """Para a amostragem e retorna a contagem de cada pilha."""
+        self._stop.set()
+        self._thread.join()
+        return self._counts
+
+# * ==============================
+# * == PROFILER DAS REQUISIÇÕES ==
+# * ==============================
+
+class RequestProfile:
+    """Perfil de uma requisição em andamento, criado por `RequestProfiler.start`."""
+    def __init__(self, profiler: "RequestProfiler", name: str) -> None:
+        self._profiler = profiler
+        self.name = name
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        if profiler.output_format == "pstats":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _StackSampler(get_ident(), profiler.interval)
+
+    def stop(self) -> str:
+        """Para a medição, salva o perfil e retorna o nome do arquivo."""
+        filename = self.name + _EXTENSIONS[self._profiler.output_format]
+        path = os.path.join(self._profiler.output_dir, filename)
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+                self._profile.dump_stats(path)
+            elif self._sampler is not None:
+                counts = self._sampler.stop()
+                with open(path, "w", encoding="utf-8") as file:
+                    file.writelines(f"{stack} {count}\n" for stack, count in counts.items())
+        finally:
+            self._profiler._finished() # pylint: disable=protected-access
+        return filename
+
+class RequestProfiler:
+    """
+    Decide quais requisições medir e salva os seus perfis em
+    `output_dir`, mantendo só os `max_files` mais recentes.
+
+    Uma requisição é medida se o cabeçalho trouxer o `token`
+    configurado, ou por sorteio, com a chance `sample_rate`.
+    No formato "pstats" é usado o cProfile, que mede o processo
+    inteiro e só permite uma medição por vez: requisições sorteadas
+    enquanto outra é medida não são medidas. O formato "collapsed"
+    lê a pilha só da thread da requisição a cada `interval` segundos.
+    """
+    def __init__(
+        self,
+        output_dir: str,
+        *,
+        sample_rate: float = 0.0,
+        token: str = "",
+        output_format: ProfileFormatLiteral = "pstats",
+        interval: float = 0.001,
+        max_files: int = 100,
+        chance: Callable[[], float] = random.random
+    ) -> None:
+        if output_format not in _EXTENSIONS:
+            raise ValueError(f"Formato de perfil inválido: {output_format}")
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.token = token
+        self.output_format = output_format
+        self.interval = interval
+        self.max_files = max_files
+        self._chance = chance
+        # Com o cProfile, só um perfil pode estar ativo no processo.
+        self._pstats_lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Se alguma requisição pode ser medida."""
+        return self.sample_rate > 0 or bool(self.token)
+
+    def should_profile(self, header_value: Optional[str]) -> bool:
+        """Decide se a requisição, com o valor do cabeçalho de perfil, deve ser medida."""
+        if self.token and header_value is not None:
+            return hmac.compare_digest(header_value.encode(), self.token.encode())
+        return self.sample_rate > 0 and self._chance() < self.sample_rate
+
+    def start(self, label: str) -> Optional[RequestProfile]:
+        """
+        Começa a medir a requisição atual. `label` entra no nome do
+        arquivo. Retorna None se outro perfil do cProfile está ativo.
+        """
+        if self.output_format == "pstats" and not self._pstats_lock.acquire(blocking=False):
+            return None
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            name = f"{time_ns()}-{_UNSAFE_NAME_PATTERN.sub("_", label).strip("_")}"
+            return RequestProfile(self, name)
+        except ValueError:
+            # Outra ferramenta de profiling (ex.: um debugger) já está ativa.
+            self._release()
+            return None
+        except BaseException:
+            self._release()
+            raise
+
+    def _release(self) -> None:
+        """Libera o cProfile para o próximo perfil."""
+        if self.output_format == "pstats":
+            self._pstats_lock.release()
+
+    def _finished(self) -> None:
+        """Libera o cProfile e apaga os perfis mais antigos."""
+        self._release()
+        extension = _EXTENSIONS[self.output_format]
+        try:
+            files = sorted(name for name in os.listdir(self.output_dir) if name.endswith(extension))
+            for name in files[:max(0, len(files) - self.max_files)]:
+                os.remove(os.path.join(self.output_dir, name))
+        except OSError:
+            pass
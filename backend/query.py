@@ -0,0 +1,295 @@
+"""
+Esse módulo contém um construtor de comandos SQL com condições
+(`=`, `IN`, `<`, `>`, `<=`, `>=`, `BETWEEN`, `LIKE`), ordenação e limite.
+
+O texto SQL de cada formato de consulta (colunas, operadores e
+quantidade de valores) é compilado uma única vez e reaproveitado;
+a cada chamada só a lista de valores dos `%s` é montada.
+"""
+from typing import (
+    Any, Dict, Iterable,
+    List, Literal, Mapping,
+    NamedTuple, Optional, Sequence,
+    Tuple, TypeAlias, Union
+)
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+
+OperatorLiteral: TypeAlias = Literal["=", "IN", "<", ">", "<=", ">=", "BETWEEN", "LIKE"]
+_Shape: TypeAlias = Tuple[Tuple[str, OperatorLiteral, int], ...]
+
+class Condition(NamedTuple):
+    """
+    Representa uma condição do WHERE. Em `IN`, `value` é uma
+    sequência de valores; em `BETWEEN`, uma tupla `(mínimo, máximo)`.
+    """
+    column: str
+    operator: OperatorLiteral
+    value: Any
+
+# * ===============
+# * == CONDIÇÕES ==
+# * ===============
+
+def eq(column: str, value: Any) -> Condition:
+    """Condição `coluna = valor`."""
+    return Condition(column, "=", value)
+
+def in_(column: str, values: Iterable[Any]) -> Condition:
+    """Condição `coluna IN (valores)`."""
+    return Condition(column, "IN", tuple(values))
+
+def lt(column: str, value: Any) -> Condition:
+    """Condição `coluna < valor`."""
+    return Condition(column, "<", value)
+
+def gt(column: str, value: Any) -> Condition:
+    """Condição `coluna > valor`."""
+    return Condition(column, ">", value)
+
+def le(column: str, value: Any) -> Condition:
+    """Condição `coluna <= valor`."""
+    return Condition(column, "<=", value)
+
+def ge(column: str, value: Any) -> Condition:
+    """Condição `coluna >= valor`."""
+    return Condition(column, ">=", value)
+
+def between(column: str, low: Any, high: Any) -> Condition:
+    """Condição `coluna BETWEEN mínimo AND máximo`."""
+    return Condition(column, "BETWEEN", (low, high))
+
+def like(column: str, pattern: str) -> Condition:
+    """Condição `coluna LIKE padrão`."""
+    return Condition(column, "LIKE", pattern)
+
+def escape_like(text: str) -> str:
+    """Escapa os curingas `%` e `_` de um texto usado num LIKE."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def starts_with(column: str, prefix: str) -> Condition:
+    """Condição `coluna LIKE 'prefixo%'`, com os curingas escapados."""
+    return like(column, f"{escape_like(prefix)}%")
+
+# * ======================
+# * == FUNÇÕES PRIVADAS ==
+# * ======================
+
+def _shape(conditions: Sequence[Condition]) -> _Shape:
+    """Retorna o formato das condições, usado como chave do SQL compilado."""
+    return tuple(
+        (column, operator, len(value) if operator == "IN" else 0)
+        for column, operator, value in conditions
+    )
+
+def _where_SQL(shape: _Shape) -> str:
+    """
+    Cria um comando WHERE a partir do formato das condições.
+
+    Raises:
+        ValueError: A lista de um IN está vazia.
+    """
+    if not shape:
+        return ""
+    parts = []
+    for column, operator, count in shape:
+        if operator == "IN":
+            if count == 0:
+                raise ValueError(f"A lista do IN de `{column}` está vazia.")
+            parts.append(f"{column} IN ({", ".join(["%s"] * count)})")
+        elif operator == "BETWEEN":
+            parts.append(f"{column} BETWEEN %s AND %s")
+        else:
+            parts.append(f"{column} {operator} %s")
+    return f"WHERE {" AND ".join(parts)}"
+
+def _order_by_SQL(order_by: Tuple[str, ...], desc: bool) -> str:
+    """
+    Cria um comando ORDER BY. Colunas com `-` na frente são
+    ordenadas no sentido contrário ao de `desc`.
+    """
+    parts = []
+    for column in order_by:
+        column_desc = desc
+        if column.startswith("-"):
+            column, column_desc = column[1:], not desc
+        parts.append(f"{column} {"DESC" if column_desc else "ASC"}")
+    return f"ORDER BY {", ".join(parts)}"
+
+# * ============
+# * == TABELA ==
+# * ============
+
+class Table:
+    """
+    Gera os comandos SELECT, UPDATE e DELETE de uma tabela,
+    recusando colunas que não estão em `columns`.
+
+    Os valores de `Enum` são trocados pelo seu `value` e os das
+    colunas em `decimal_columns` são convertidos para `Decimal`.
+    """
+    def __init__(
+        self,
+        name: str,
+        columns: Iterable[str],
+        *,
+        decimal_columns: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.reference = f"`{name}`"
+        self.columns = tuple(columns)
+        self.decimal_columns = frozenset(decimal_columns)
+        self._column_set = frozenset(self.columns)
+
+    def __repr__(self) -> str:
+        return f"Table({self.name!r})"
+
+    def _check_columns(self, columns: Iterable[str]) -> None:
+        """
+        Raises:
+            ValueError: Alguma coluna não pertence à tabela.
+        """
+        for column in columns:
+            if column not in self._column_set:
+                raise ValueError(f"Coluna inválida: {column}")
+
+    def _value(self, column: str, value: Any) -> Any:
+        """Converte um valor para o tipo enviado ao banco."""
+        if isinstance(value, Enum):
+            return value.value
+        if column in self.decimal_columns and not isinstance(value, Decimal):
+            # `str` evita que floats como 5.1 virem 5.0999999...
+            return Decimal(str(value))
+        return value
+
+    def _where_values(self, conditions: Sequence[Condition], values: List[Any]) -> None:
+        """Adiciona a `values` os valores das condições, na ordem dos `%s`."""
+        for column, operator, value in conditions:
+            if operator in ("IN", "BETWEEN"):
+                values.extend(self._value(column, item) for item in value)
+            else:
+                values.append(self._value(column, value))
+
+    @lru_cache(maxsize=256)
+    def _compile_select(
+        self,
+        columns: Tuple[str, ...],
+        shape: _Shape,
+        order_by: Tuple[str, ...],
+        desc: bool,
+        group_by: Tuple[str, ...],
+        has_limit: bool,
+        for_update: bool
+    ) -> str:
+        """Compila o texto de um SELECT. O resultado fica em cache por formato."""
+        self._check_columns((*columns, *(column for column, _, _ in shape), *group_by))
+        self._check_columns(column.removeprefix("-") for column in order_by)
+        parts = [
+            f"SELECT {", ".join(columns) if columns else "*"} FROM {self.reference}",
+            _where_SQL(shape)
+        ]
+        if group_by:
+            parts.append(f"GROUP BY {", ".join(group_by)}")
+        if order_by:
+            parts.append(_order_by_SQL(order_by, desc))
+        if has_limit:
+            parts.append("LIMIT %s")
+        if for_update:
+            parts.append("FOR UPDATE")
+        return " ".join(part for part in parts if part)
+
+    @lru_cache(maxsize=256)
+    def _compile_update(
+        self,
+        set_columns: Tuple[str, ...],
+        multiply_columns: Tuple[str, ...],
+        shape: _Shape
+    ) -> str:
+        """Compila o texto de um UPDATE. O resultado fica em cache por formato."""
+        self._check_columns((*set_columns, *multiply_columns, *(column for column, _, _ in shape)))
+        if not shape:
+            raise ValueError("Um UPDATE precisa de ao menos uma condição.")
+        set_parts = [f"{column} = %s" for column in set_columns]
+        set_parts.extend(f"{column} = {column} * %s" for column in multiply_columns)
+        return f"UPDATE {self.reference} SET {", ".join(set_parts)} {_where_SQL(shape)}"
+
+    @lru_cache(maxsize=256)
+    def _compile_delete(self, shape: _Shape) -> str:
+        """Compila o texto de um DELETE. O resultado fica em cache por formato."""
+        self._check_columns(column for column, _, _ in shape)
+        if not shape:
+            raise ValueError("Um DELETE precisa de ao menos uma condição.")
+        return f"DELETE FROM {self.reference} {_where_SQL(shape)}"
+
+    def select(
+        self,
+        columns: Union[Sequence[str], Literal["*"]] = "*",
+        where: Sequence[Condition] = (),
+        *,
+        order_by: Sequence[str] = (),
+        desc: bool = False,
+        group_by: Sequence[str] = (),
+        limit: Optional[int] = None,
+        for_update: bool = False
+    ) -> Tuple[str, List[Any]]:
+        """
+        Cria um comando SELECT e a lista de valores dos seus `%s`.
+
+        Raises:
+            ValueError: Alguma coluna é inválida ou um IN está vazio.
+        """
+        if isinstance(columns, str):
+            columns = () if columns == "*" else (columns,)
+        cmd = self._compile_select(
+            tuple(columns), _shape(where),
+            tuple(order_by), desc, tuple(group_by), limit is not None, for_update
+        )
+        values: List[Any] = []
+        self._where_values(where, values)
+        if limit is not None:
+            values.append(limit)
+        return cmd, values
+
+    def update(
+        self,
+        set_fields: Mapping[str, Any],
+        where: Sequence[Condition],
+        *,
+        multiply_fields: Optional[Mapping[str, Any]] = None
+    ) -> Tuple[str, List[Any]]:
+        """
+        Cria um comando UPDATE e a lista de valores dos seus `%s`.
+        `multiply_fields` aplica mudanças relativas (`coluna = coluna * valor`).
+
+        Raises:
+            ValueError: Nenhum campo ou condição foi indicado, ou há uma coluna inválida.
+        """
+        multiply_fields = multiply_fields or {}
+        if not (set_fields or multiply_fields):
+            raise ValueError("Ao menos um campo deve ser atualizado.")
+        cmd = self._compile_update(tuple(set_fields), tuple(multiply_fields), _shape(where))
+        values = [self._value(column, value) for column, value in set_fields.items()]
+        values.extend(Decimal(str(value)) for value in multiply_fields.values())
+        self._where_values(where, values)
+        return cmd, values
+
+    def delete(self, where: Sequence[Condition]) -> Tuple[str, List[Any]]:
+        """
+        Cria um comando DELETE e a lista de valores dos seus `%s`.
+
+        Raises:
+            ValueError: Nenhuma condição foi indicada ou há uma coluna inválida.
+        """
+        cmd = self._compile_delete(_shape(where))
+        values: List[Any] = []
+        self._where_values(where, values)
+        return cmd, values
+
+    def compiled_stats(self) -> Dict[str, Any]:
+        """Retorna as estatísticas dos caches de SQL compilado."""
+        return {
+            "select": self._compile_select.cache_info()._asdict(),
+            "update": self._compile_update.cache_info()._asdict(),
+            "delete": self._compile_delete.cache_info()._asdict()
+        }
@@ -0,0 +1,167 @@
+"""
+Esse módulo contém o limitador de requisições das rotas, baseado
+em token bucket por rota e por cliente.
+"""
+from typing import Callable, Optional, Protocol, Tuple
+from collections import OrderedDict
+from functools import wraps
+from math import ceil
+from threading import Lock, local
+from time import monotonic, time
+import sqlite3
+from flask import request
+from utils import http_response
+
+class BucketStore(Protocol):
+    """Representa um armazenamento de token buckets."""
+    def take(
+        self, key: str, capacity: float, refill_rate: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        """
+        Tenta retirar `cost` fichas do bucket `key`.
+
+        Returns:
+            (tuple[bool, float]): Se a requisição foi permitida e, se não,
+            quantos segundos faltam para haver fichas suficientes.
+        """
+        ...
+
+def _refill(
+    tokens: float, updated_at: float, now: float, capacity: float, refill_rate: float
+) -> float:
+    """Calcula as fichas de um bucket depois de reabastecê-lo até `now`."""
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+
+def _consume(tokens: float, cost: float, refill_rate: float) -> Tuple[bool, float, float]:
+    """Retira fichas de um bucket. Retorna (permitido, fichas restantes, espera)."""
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / refill_rate
+
+class MemoryBucketStore:
+    """
+    Buckets em memória, com lock e remoção LRU. Buckets parados por
+    mais de `idle_seconds` são removidos e, passando de `max_keys`,
+    os menos usados também. Cada `take` é O(1) amortizado.
+    """
+    def __init__(
+        self,
+        *,
+        max_keys: int = 10000,
+        idle_seconds: float = 600.0,
+        clock: Callable[[], float] = monotonic
+    ) -> None:
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = Lock()
+        # chave -> (fichas, última atualização); o início é o menos usado.
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(
+        self, key: str, capacity: float, refill_rate: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens = capacity if bucket is None else _refill(*bucket, now, capacity, refill_rate)
+            allowed, tokens, retry_after = _consume(tokens, cost, refill_rate)
+            self._buckets[key] = (tokens, now)
+            while self._buckets:
+                oldest_key, (_, updated_at) = next(iter(self._buckets.items()))
+                if len(self._buckets) <= self.max_keys and now - updated_at < self.idle_seconds:
+                    break
+                del self._buckets[oldest_key]
+        return allowed, retry_after
+
+class SQLiteBucketStore:
+    """
+    Buckets guardados num arquivo SQLite, compartilhados entre
+    vários processos (workers) na mesma máquina. Cada `take` é uma
+    transação `BEGIN IMMEDIATE`, que serializa os processos.
+    """
+    # A cada quantos `take` os buckets parados são apagados.
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, *, idle_seconds: float = 600.0) -> None:
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self._local = local()
+        self._takes = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna a conexão SQLite desta thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(
+        self, key: str, capacity: float, refill_rate: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        # O relógio precisa ser o mesmo entre processos, então usa `time`.
+        now = time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else _refill(*row, now, capacity, refill_rate)
+            allowed, tokens, retry_after = _consume(tokens, cost, refill_rate)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+                "updated_at = excluded.updated_at",
+                (key, tokens, now)
+            )
+            self._takes += 1
+            if self._takes % self._PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM buckets WHERE updated_at < ?", (now - self.idle_seconds,)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+def rate_limit(
+    store: BucketStore,
+    *,
+    capacity: float,
+    refill_rate: float,
+    key_func: Optional[Callable[[], str]] = None
+):
+    """
+    Decorator que limita uma rota com um token bucket por rota e por
+    cliente. O bucket guarda até `capacity` fichas e recebe
+    `refill_rate` fichas por segundo. Sem fichas, a rota responde
+    `429 Too Many Requests` com o cabeçalho `Retry-After`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            client = key_func() if key_func is not None else request.remote_addr
+            allowed, retry_after = store.take(
+                f"{request.endpoint}:{client}", capacity, refill_rate
+            )
+            if not allowed:
+                response, code = http_response(
+                    429, f"Tente novamente em {retry_after:.2f} segundos."
+                )
+                response.headers["Retry-After"] = str(max(1, ceil(retry_after)))
+                return response, code
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,207 @@
+"""
+Esse módulo contém a divisão das leituras entre as réplicas do DB:
+cada leitura vai para uma réplica disponível (em rodízio ou a menos
+ocupada) e as réplicas que falham ficam de fora por um tempo. Também
+lembra quais clientes escreveram há pouco, para que as leituras deles
+vão ao primário e vejam as próprias escritas.
+"""
+from typing import (
+    Callable, Dict, Generic, List, Literal,
+    Optional, Tuple, TypedDict, TypeVar
+)
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from health import BreakerState, CircuitBreaker
+
+T_Replica = TypeVar("T_Replica")
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+RoutingStrategyLiteral = Literal["round_robin", "least_busy"]
+_STRATEGIES = ("round_robin", "least_busy")
+
+class ReplicaStatsDict(TypedDict):
+    """
+    Representa as estatísticas de uma réplica. `state` é o estado do
+    circuit breaker dela: "closed" quando está recebendo leituras.
+    """
+    name: str
+    state: BreakerState
+    active: int
+    reads: int
+    failures: int
+
+class _Replica(Generic[T_Replica]):
+    """Uma réplica, com o seu circuit breaker e os seus contadores."""
+    __slots__ = ("name", "value", "breaker", "active", "reads", "failures")
+
+    def __init__(self, name: str, value: T_Replica, breaker: CircuitBreaker) -> None:
+        self.name = name
+        self.value = value
+        self.breaker = breaker
+        self.active = 0
+        self.reads = 0
+        self.failures = 0
+
+# * ==========================
+# * == ESCOLHA DAS RÉPLICAS ==
+# * ==========================
+
+class ReplicaRouter(Generic[T_Replica]):
+    """
+    Escolhe a réplica de cada leitura entre as disponíveis, pela
+    estratégia "round_robin" (rodízio) ou "least_busy" (menos leituras
+    em andamento; os empates seguem o rodízio).
+
+    Cada réplica tem um `CircuitBreaker`: uma falha de conexão a tira
+    do rodízio por `eject_seconds`, tempo que dobra a cada nova falha
+    até `max_eject_seconds`. Passado esse tempo, uma única leitura
+    testa a réplica; se ela der certo, a réplica volta ao rodízio.
+    """
+    def __init__(
+        self,
+        replicas: Dict[str, T_Replica],
+        *,
+        strategy: RoutingStrategyLiteral = "round_robin",
+        failure_threshold: int = 1,
+        eject_seconds: float = 5.0,
+        max_eject_seconds: float = 60.0,
+        clock: Callable[[], float] = monotonic
+    ) -> None:
+        if strategy not in _STRATEGIES:
+            raise ValueError(f"Estratégia de réplicas inválida: {strategy}")
+        self.strategy = strategy
+        self._replicas: List[_Replica[T_Replica]] = []
+        for name, value in replicas.items():
+            breaker = CircuitBreaker(
+                failure_threshold=failure_threshold,
+                base_backoff=eject_seconds,
+                max_backoff=max_eject_seconds,
+                clock=clock
+            )
+            # O breaker começa aberto; as réplicas começam disponíveis.
+            breaker.record_success()
+            self._replicas.append(_Replica(name, value, breaker))
+        self._by_name = {replica.name: replica for replica in self._replicas}
+        self._next = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._replicas)
+
+    def choose(self) -> Optional[Tuple[str, T_Replica]]:
+        """
+        Escolhe a réplica de uma leitura e retorna o nome e o valor dela,
+        ou None se nenhuma estiver disponível. Cada escolha deve ser
+        encerrada com `release`.
+        """
+        with self._lock:
+            chosen: Optional[_Replica[T_Replica]] = None
+            available: List[_Replica[T_Replica]] = []
+            for replica in self._replicas:
+                if replica.breaker.is_available():
+                    available.append(replica)
+                elif chosen is None and replica.breaker.begin_probe():
+                    # O tempo fora acabou: esta leitura testa a réplica.
+                    chosen = replica
+            if chosen is None and available:
+                start = self._next % len(available)
+                self._next += 1
+                if self.strategy == "round_robin":
+                    chosen = available[start]
+                else:
+                    ordered = available[start:] + available[:start]
+                    chosen = min(ordered, key=lambda replica: replica.active)
+            if chosen is None:
+                return None
+            chosen.active += 1
+            chosen.reads += 1
+        return chosen.name, chosen.value
+
+    def release(self, name: str, *, failed: bool = False) -> None:
+        """
+        Encerra uma leitura escolhida por `choose`. `failed` indica uma
+        falha de conexão, que tira a réplica do rodízio.
+        """
+        replica = self._by_name[name]
+        with self._lock:
+            replica.active -= 1
+            if failed:
+                replica.failures += 1
+        if failed:
+            replica.breaker.record_failure()
+        else:
+            replica.breaker.record_success()
+
+    def values(self) -> List[T_Replica]:
+        """Retorna os valores de todas as réplicas."""
+        return [replica.value for replica in self._replicas]
+
+    def stats(self) -> List[ReplicaStatsDict]:
+        """Retorna as estatísticas de cada réplica."""
+        with self._lock:
+            return [
+                {
+                    "name": replica.name,
+                    "state": replica.breaker.state,
+                    "active": replica.active,
+                    "reads": replica.reads,
+                    "failures": replica.failures
+                }
+                for replica in self._replicas
+            ]
+
+# * ===================================
+# * == LEITURA DAS PRÓPRIAS ESCRITAS ==
+# * ===================================
+
+class RecentWriters:
+    """
+    Lembra os clientes que escreveram nos últimos `window_seconds`,
+    até `max_clients` (os mais antigos são esquecidos primeiro).
+    Enquanto isso, as réplicas podem ainda não ter as escritas deles.
+    """
+    def __init__(
+        self,
+        window_seconds: float,
+        *,
+        max_clients: int = 10000,
+        clock: Callable[[], float] = monotonic
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.max_clients = max_clients
+        self._clock = clock
+        self._written_at: OrderedDict[str, float] = OrderedDict()
+        self._last_write_at: Optional[float] = None
+        self._lock = Lock()
+
+    def record_write(self, client: Optional[str]) -> None:
+        """Registra uma escrita, de um cliente conhecido ou não (None)."""
+        now = self._clock()
+        with self._lock:
+            self._last_write_at = now
+            if client is None:
+                return
+            self._written_at[client] = now
+            self._written_at.move_to_end(client)
+            # A ordem é a da última escrita: os expirados ficam no começo.
+            while self._written_at and (
+                len(self._written_at) > self.max_clients
+                or now - next(iter(self._written_at.values())) >= self.window_seconds
+            ):
+                self._written_at.popitem(last=False)
+
+    def wrote_recently(self, client: Optional[str]) -> bool:
+        """Retorna se o cliente escreveu nos últimos `window_seconds`."""
+        if client is None:
+            return False
+        written_at = self._written_at.get(client)
+        return written_at is not None and self._clock() - written_at < self.window_seconds
+
+    def any_recent(self) -> bool:
+        """Retorna se houve alguma escrita, de qualquer cliente, nos últimos `window_seconds`."""
+        last_write_at = self._last_write_at
+        return last_write_at is not None and self._clock() - last_write_at < self.window_seconds
@@ -6,8 +6,54 @@ USE cantina_escolar;
 CREATE TABLE IF NOT EXISTS
     produtos (
         id INT AUTO_INCREMENT PRIMARY KEY,
+        -- O índice do UNIQUE também atende às buscas por prefixo (LIKE 'abc%').
         `name` VARCHAR(100) NOT NULL UNIQUE,
         `category` VARCHAR(50) NOT NULL,
         `price` DECIMAL(10, 2) NOT NULL,
         `time_stamp` TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
+
+-- Índices das buscas (GET /api/products/search). Ficam fora do CREATE
+-- TABLE para também serem criados em bancos que já existiam. Se o
+-- índice já existir, o erro é ignorado por `init_db`.
+
+-- Filtro por categoria, com ou sem faixa de preço e ordenação por preço.
+CREATE INDEX idx_produtos_category_price ON produtos (`category`, `price`);
+
+-- Faixa de preço sem categoria.
+CREATE INDEX idx_produtos_price ON produtos (`price`);
+
+-- Sincronização incremental (GET /api/products/changes). A coluna fica
+-- fora do CREATE TABLE para também ser criada em bancos que já existiam;
+-- se ela já existir, o erro é ignorado por `init_db`.
+ALTER TABLE produtos
+    ADD COLUMN `updated_at` TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+CREATE INDEX idx_produtos_updated_at ON produtos (`updated_at`);
+
+-- Registro dos produtos apagados, para que os clientes também
+-- removam as linhas. Antigos registros são limpos por `db.changes`.
+CREATE TABLE IF NOT EXISTS
+    produtos_removidos (
+        id INT PRIMARY KEY,
+        `deleted_at` TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+        INDEX idx_produtos_removidos_deleted_at (`deleted_at`)
+    );
+
+-- Toda exclusão, por qualquer caminho, deixa o seu registro.
+CREATE TRIGGER trg_produtos_removidos AFTER DELETE ON produtos
+    FOR EACH ROW
+    INSERT INTO produtos_removidos (id) VALUES (OLD.id)
+        ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6);
+
+-- Versão do catálogo, usada como ETag das leituras (veja `db.catalog_version`).
+-- Uma única linha, avançada uma vez por transação de escrita, logo antes
+-- do commit (veja `db._bump_catalog_version`).
+CREATE TABLE IF NOT EXISTS
+    catalogo_versao (
+        id TINYINT PRIMARY KEY,
+        versao BIGINT UNSIGNED NOT NULL
+    );
+
+INSERT IGNORE INTO catalogo_versao (id, versao) VALUES (1, 0);
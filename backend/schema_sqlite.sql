@@ -0,0 +1,67 @@
+-- Esquema equivalente ao de `schema.sql`, para o backend SQLite
+-- (CANTINA_DB_BACKEND=sqlite). Roda inteiro a cada inicialização.
+-- A collation CANTINA_CI e a função `like` são registradas em cada
+-- conexão por `storage.py`: comparam os nomes sem acentos e sem
+-- maiúsculas, como a collation utf8mb4_unicode_ci do MySQL.
+
+CREATE TABLE IF NOT EXISTS
+    produtos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        `name` VARCHAR(100) NOT NULL UNIQUE COLLATE CANTINA_CI
+            CHECK (length(`name`) <= 100),
+        `category` VARCHAR(50) NOT NULL CHECK (length(`category`) <= 50),
+        `price` DECIMAL(10, 2) NOT NULL CHECK (abs(`price`) < 100000000),
+        `time_stamp` TIMESTAMP DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')),
+        `updated_at` TIMESTAMP NOT NULL
+            DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))
+    );
+
+-- Índices das buscas (GET /api/products/search).
+CREATE INDEX IF NOT EXISTS idx_produtos_category_price ON produtos (`category`, `price`);
+
+CREATE INDEX IF NOT EXISTS idx_produtos_price ON produtos (`price`);
+
+-- Sincronização incremental (GET /api/products/changes).
+CREATE INDEX IF NOT EXISTS idx_produtos_updated_at ON produtos (`updated_at`);
+
+-- O SQLite não tem `ON UPDATE CURRENT_TIMESTAMP(6)`. Como no MySQL,
+-- só muda se algum valor mudou.
+CREATE TRIGGER IF NOT EXISTS trg_produtos_updated_at AFTER UPDATE ON produtos
+    FOR EACH ROW WHEN NEW.`updated_at` = OLD.`updated_at` AND (
+        NEW.`name` IS NOT OLD.`name` OR NEW.`category` IS NOT OLD.`category`
+        OR NEW.`price` IS NOT OLD.`price`
+    )
+BEGIN
+    UPDATE produtos
+        SET `updated_at` = strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')
+        WHERE id = NEW.id;
+END;
+
+-- Registro dos produtos apagados, para que os clientes também
+-- removam as linhas. Antigos registros são limpos por `db.changes`.
+CREATE TABLE IF NOT EXISTS
+    produtos_removidos (
+        id INTEGER PRIMARY KEY,
+        `deleted_at` TIMESTAMP NOT NULL
+            DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime'))
+    );
+
+CREATE INDEX IF NOT EXISTS idx_produtos_removidos_deleted_at ON produtos_removidos (`deleted_at`);
+
+-- Toda exclusão, por qualquer caminho, deixa o seu registro.
+CREATE TRIGGER IF NOT EXISTS trg_produtos_removidos AFTER DELETE ON produtos
+    FOR EACH ROW
+BEGIN
+    INSERT INTO produtos_removidos (id) VALUES (OLD.id)
+        ON CONFLICT (id) DO UPDATE
+        SET `deleted_at` = strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime');
+END;
+
+-- Versão do catálogo, usada como ETag das leituras (veja `db.catalog_version`).
+CREATE TABLE IF NOT EXISTS
+    catalogo_versao (
+        id INTEGER PRIMARY KEY,
+        versao INTEGER NOT NULL
+    );
+
+INSERT OR IGNORE INTO catalogo_versao (id, versao) VALUES (1, 0);
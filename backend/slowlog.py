@@ -0,0 +1,117 @@
+"""
+Esse módulo contém o registro dos comandos lentos do DB: cada
+comando que passa do tempo limite é guardado (os mais recentes) e
+enviado ao `logging`, opcionalmente com o `EXPLAIN` do MySQL.
+"""
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, TypedDict
+from collections import deque
+from threading import Lock
+from time import monotonic, time
+import logging
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+class SlowQueryDict(TypedDict):
+    """
+    Um comando lento. `rows` é None quando o número de linhas ainda
+    não é conhecido (ex.: um SELECT cujas linhas não foram lidas).
+    """
+    at: float
+    statement: str
+    parameters: int
+    rows: Optional[int]
+    duration_ms: float
+    explain: Optional[List[Dict[str, Any]]]
+
+# Executa o `EXPLAIN` de um comando com os seus valores.
+Explainer = Callable[[str, Sequence[Any]], List[Dict[str, Any]]]
+
+_LOGGER = logging.getLogger("cantina.slow_queries")
+
+# * =================================
+# * == REGISTRO DE COMANDOS LENTOS ==
+# * =================================
+
+class SlowQueryLog:
+    """
+    Guarda os últimos `max_entries` comandos que levaram pelo menos
+    `threshold_seconds`. Com `explain`, os SELECTs lentos recebem o
+    plano do MySQL, no máximo uma vez a cada `explain_interval`
+    segundos por formato de comando, já que o `EXPLAIN` também custa.
+    """
+    def __init__(
+        self,
+        *,
+        threshold_seconds: float,
+        max_entries: int = 100,
+        explain: Optional[Explainer] = None,
+        explain_interval: float = 60.0
+    ) -> None:
+        self.threshold_seconds = threshold_seconds
+        self._explain = explain
+        self.explain_interval = explain_interval
+        self._entries: Deque[SlowQueryDict] = deque(maxlen=max_entries)
+        self._explained_at: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def record(
+        self,
+        statement: str,
+        cmd: str,
+        values: Sequence[Any],
+        rows: Optional[int],
+        duration: float
+    ) -> None:
+        """
+        Registra um comando se ele passou do tempo limite. `statement`
+        é o formato do comando (sem os tamanhos das listas de `%s`) e
+        `cmd` é o comando executado, usado no `EXPLAIN`.
+        """
+        if duration < self.threshold_seconds:
+            return
+        entry: SlowQueryDict = {
+            "at": time(),
+            "statement": statement,
+            "parameters": len(values),
+            "rows": rows if rows is not None and rows >= 0 else None,
+            "duration_ms": round(duration * 1000, 3),
+            "explain": self._try_explain(statement, cmd, values)
+        }
+        with self._lock:
+            self._entries.append(entry)
+        _LOGGER.warning(
+            "Comando lento (%.1f ms, %d parâmetros, %s linhas): %s",
+            entry["duration_ms"], entry["parameters"],
+            "?" if entry["rows"] is None else entry["rows"], statement
+        )
+
+    def _try_explain(
+        self, statement: str, cmd: str, values: Sequence[Any]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Executa o `EXPLAIN` de um SELECT, se ligado e se o formato não foi explicado há pouco."""
+        if self._explain is None or not statement.upper().startswith("SELECT"):
+            return None
+        now = monotonic()
+        with self._lock:
+            explained_at = self._explained_at.get(statement)
+            if explained_at is not None and now - explained_at < self.explain_interval:
+                return None
+            self._explained_at[statement] = now
+        try:
+            return self._explain(cmd, values)
+        except Exception: # pylint: disable=broad-exception-caught
+            _LOGGER.debug("Falha no EXPLAIN de: %s", statement, exc_info=True)
+            return None
+
+    def entries(self) -> List[SlowQueryDict]:
+        """Retorna os comandos lentos guardados, do mais antigo ao mais recente."""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        """Apaga os comandos lentos guardados."""
+        with self._lock:
+            self._entries.clear()
+            self._explained_at.clear()
@@ -0,0 +1,89 @@
+"""
+Esse módulo contém o cache de comandos preparados (prepared
+statements) de uma conexão, independente do driver do banco.
+"""
+from typing import (
+    Callable, Generic, Hashable,
+    Tuple, TypedDict, TypeVar
+)
+from collections import OrderedDict
+
+T_Cursor = TypeVar("T_Cursor")
+
+class StatementCacheStatsDict(TypedDict):
+    """Representa um dicionário tipado com as estatísticas de um cache de comandos."""
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+class PreparedStatementCache(Generic[T_Cursor]):
+    """
+    Cache LRU de cursores preparados de uma única conexão, com um
+    cursor por comando. O servidor analisa cada comando uma única
+    vez; as próximas execuções enviam apenas os valores.
+
+    Passando de `max_size`, o cursor menos usado é fechado, o que
+    libera o comando no servidor. Como uma conexão só é usada por
+    uma thread de cada vez, o cache não tem lock.
+    """
+    def __init__(
+        self,
+        factory: Callable[[bool], T_Cursor],
+        *,
+        close: Callable[[T_Cursor], None],
+        max_size: int = 32
+    ) -> None:
+        self.factory = factory
+        self.close = close
+        self.max_size = max_size
+        self._cursors: OrderedDict[Tuple[Hashable, bool], T_Cursor] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def get(self, statement: Hashable, *, dictionary: bool = False) -> T_Cursor:
+        """
+        Retorna o cursor preparado do comando, criando-o se preciso.
+        O comando é preparado na primeira execução do cursor.
+        """
+        key = (statement, dictionary)
+        cursor = self._cursors.get(key)
+        if cursor is not None:
+            self._cursors.move_to_end(key)
+            self._hits += 1
+            return cursor
+        self._misses += 1
+        cursor = self.factory(dictionary)
+        self._cursors[key] = cursor
+        while len(self._cursors) > self.max_size:
+            _, oldest = self._cursors.popitem(last=False)
+            self._evictions += 1
+            self.close(oldest)
+        return cursor
+
+    def discard(self, statement: Hashable, *, dictionary: bool = False) -> None:
+        """Remove o cursor de um comando, por exemplo depois de um erro."""
+        cursor = self._cursors.pop((statement, dictionary), None)
+        if cursor is not None:
+            self.close(cursor)
+
+    def clear(self) -> None:
+        """Fecha todos os cursores do cache."""
+        while self._cursors:
+            _, cursor = self._cursors.popitem()
+            self.close(cursor)
+
+    def stats(self) -> StatementCacheStatsDict:
+        """Retorna as estatísticas atuais do cache."""
+        return {
+            "size": len(self._cursors),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions
+        }
@@ -136,6 +136,27 @@ export async function removeProductRequest(id) {
         console.log("ERRO INTERNO:", error.message || error);
     }
 }
+/**
+ * Pega todos os produtos do DB, seguindo as páginas
+ * da API pelo `next_cursor`.
+ * @returns {Promise<any>} Resposta da primeira página com
+ * `data` contendo os produtos de todas as páginas.
+ */
+async function getAllProductsRequest() {
+    const request = JSONRequest("GET");
+    const firstResponse = await getResponse(API_PRODUCT_URL, request);
+    if (firstResponse === null || !firstResponse.success)
+        return firstResponse;
+    let response = firstResponse;
+    while (response.next_cursor) {
+        const url = `${API_PRODUCT_URL}?cursor=${encodeURIComponent(response.next_cursor)}`;
+        response = await getResponse(url, request);
+        if (response === null || !response.success)
+            break;
+        firstResponse.data.push(...response.data);
+    }
+    return firstResponse;
+}
 /**
  * Pega os produtos do DB.
  * @param {string | null} id Id do produto procurado. Se null, será
@@ -144,8 +165,9 @@ export async function removeProductRequest(id) {
 export async function getProductRequest(id = null) {
     try {
         const request = JSONRequest("GET");
-        const url = id === null? API_PRODUCT_URL:`${API_PRODUCT_URL}/${id}`;
-        const response = await getResponse(url, request);
+        const response = id === null?
+            await getAllProductsRequest():
+            await getResponse(`${API_PRODUCT_URL}/${id}`, request);
         if (response === null)
             return null;
         if (response.success) {
@@ -191,6 +213,43 @@ export async function updateProductRequest(id, name = null, category = null, pri
         console.log("ERRO INTERNO:", error.message || error);
     }
 }
+/**
+ * Pega sugestões de nomes de produtos que começam com `prefix`,
+ * sem diferenciar acentos e maiúsculas.
+ * @param {string} prefix Começo do nome digitado.
+ * @param {number} limit Número máximo de sugestões.
+ * @returns {Promise<string[]>} Nomes sugeridos.
+ */
+export async function getSuggestionsRequest(prefix, limit = 10) {
+    try {
+        const params = new URLSearchParams({ q: prefix, limit: String(limit) });
+        const response = await getResponse(`${API_PRODUCT_URL}/suggest?${params}`, JSONRequest("GET"));
+        if (response === null || !response.success)
+            return [];
+        return response.data.map((suggestion) => suggestion.name);
+    } catch (error) {
+        console.log("ERRO INTERNO:", error.message || error);
+        return [];
+    }
+}
+/**
+ * Pega as mudanças nos produtos depois de um cursor.
+ * @param {string | null} since Cursor de `next_cursor`. Se null,
+ * só é retornado o cursor atual.
+ * @returns {Promise<any>} Resposta com `data.upserted`, `data.deleted`,
+ * `next_cursor` e `has_more`.
+ */
+export async function getChangesRequest(since = null) {
+    try {
+        const url = since === null?
+            `${API_PRODUCT_URL}/changes`:
+            `${API_PRODUCT_URL}/changes?since=${encodeURIComponent(since)}`;
+        return await getResponse(url, JSONRequest("GET"));
+    } catch (error) {
+        console.log("ERRO INTERNO:", error.message || error);
+        return null;
+    }
+}
 
 window.addProductRequest = addProductRequest;
 window.removeProductRequest = removeProductRequest;
@@ -0,0 +1,58 @@
+import { API_URL } from "./globals.js";
+import { deleteRow, upsertRow, syncTable } from "./table.js";
+import { showLoading } from "./dialog.js";
+import { closeOverlayEvent } from "./events.js";
+
+const API_EVENTS_URL = API_URL + "events";
+const loadingText = document.getElementById("loading-message");
+let hasConnected = false;
+let dbIsDown = false;
+
+/**
+ * Mostra uma mensagem de erro de conexão no dialog de loading.
+ * @param {string} message Mensagem exibida.
+ */
+function showConnectionError(message) {
+    window.dispatchEvent(closeOverlayEvent);
+    loadingText.innerHTML = `<font color="red">${message}</font>`;
+    setTimeout(showLoading, 500);
+}
+
+/**
+ * Abre a conexão de eventos com a API (Server-Sent Events) e
+ * aplica na tabela cada produto criado, atualizado ou apagado,
+ * sem recarregar a lista inteira. Se eventos forem perdidos, só
+ * as mudanças desde a última sincronização são buscadas
+ * (`syncTable`). Substitui os testes de conexão periódicos:
+ * a API avisa quando o DB cai ou volta.
+ * @returns {EventSource} Conexão aberta.
+ */
+export function startChangeFeed() {
+    const source = new EventSource(API_EVENTS_URL);
+    source.addEventListener("open", () => {
+        // Numa reconexão, eventos podem ter sido perdidos.
+        if (hasConnected)
+            syncTable();
+        hasConnected = true;
+    });
+    source.addEventListener("error", () => {
+        if (source.readyState !== EventSource.OPEN)
+            showConnectionError("Erro ao estabelecer conexão com a API.");
+    });
+    source.addEventListener("product_created", (e) => upsertRow(JSON.parse(e.data)));
+    source.addEventListener("product_updated", (e) => upsertRow(JSON.parse(e.data)));
+    source.addEventListener("product_deleted", (e) => deleteRow(JSON.parse(e.data).id));
+    source.addEventListener("resync", () => syncTable());
+    source.addEventListener("db_down", () => {
+        dbIsDown = true;
+        showConnectionError("Erro ao estabelecer conexão com o Banco de dados.");
+    });
+    source.addEventListener("db_up", () => {
+        if (!dbIsDown)
+            return;
+        dbIsDown = false;
+        window.dispatchEvent(closeOverlayEvent);
+        syncTable();
+    });
+    return source;
+}
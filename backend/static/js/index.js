@@ -1,4 +1,3 @@
-import { showLoading } from "./dialog.js";
 import {
     uncheckAllCheckBoxEvent,
     checkAllCheckBoxEvent,
@@ -8,6 +7,8 @@ import {
     toTopEvent
 } from "./events.js";
 import { globalListenerArgs } from "./globals.js";
+import { getSuggestionsRequest } from "./app.js";
+import { startChangeFeed } from "./feed.js";
 import { applyCallbackInElements, getIdRowFromElement, searchParent, mergeObjectInPlace } from "./utils.js";
 
 const headerNameDeleteSelected = document.querySelector(".column.action .cell.header");
@@ -19,6 +20,9 @@ const buttonsOpenDialog = [
     document.querySelector("#btn-add-product"),
     deleteSelectedsButton
 ]
+const nameInput = document.getElementById("input-add-product");
+const nameSuggestions = document.getElementById("product-name-suggestions");
+let idSuggestionsTimeOut = null;
 const buttonsCloseDialog = [
     document.querySelector("#btn-red")
 ];
@@ -35,6 +39,22 @@ const onButtonOpenDialogClick = (e) => window.dispatchEvent(openOverlayEvent(
     }
 ))
 const onButtonCloseDialogClick = () => window.dispatchEvent(closeOverlayEvent);
+/**
+ * Atualiza as sugestões do nome do produto. Espera o usuário
+ * parar de digitar para não fazer uma requisição por tecla.
+ */
+const onNameInput = () => {
+    clearTimeout(idSuggestionsTimeOut);
+    idSuggestionsTimeOut = setTimeout(async () => {
+        const prefix = nameInput.value.trim();
+        const names = prefix ? await getSuggestionsRequest(prefix) : [];
+        nameSuggestions.replaceChildren(...names.map((name) => {
+            const option = document.createElement("option");
+            option.value = name;
+            return option;
+        }));
+    }, 150);
+}
 
 export function indexListeners() {
     // Faz o dialog abrir ao clicar em qualquer botão em buttonsOpenDialog
@@ -43,6 +63,8 @@ export function indexListeners() {
     applyCallbackInElements("click", onButtonOpenDialogClick, document.querySelectorAll(".opt.remove"));
     // Faz o dialog fechar ao apertar algum botão que é para fecha-lo
     applyCallbackInElements("click", onButtonCloseDialogClick, buttonsCloseDialog);
+    // Sugere nomes de produtos enquanto o usuário digita
+    nameInput.addEventListener("input", onNameInput);
     //Faz o topButton subir a página até o topo
     toTopButton.addEventListener("click", () => dispatchEvent(toTopEvent));
     allCheckBoxButton.addEventListener("change", () => {
@@ -63,34 +85,5 @@ mergeObjectInPlace(globalListenerArgs, {
 loadEventListeners();
 indexListeners();
 
-let tempIdTimeIntervalTest = null;
-
-/**
- *Callback para realizar testes de conexão com a API e com o DB.
- */
-function test() {
-    const loadingMessage = document.querySelector("loading-message")
-    let idTimeOut = null;
-    if (!window.testConnection()) {
-        window.dispatchEvent(closeOverlayEvent);
-        loadingMessage.innerHTML = `
-        <font color="red">Erro ao estabelecer conexão com a API.</font>`;
-        if (idTimeOut === null)
-            idTimeOut = setTimeout(
-                showLoading, 500
-            );
-    }
-    else if (!window.testDBConnection()) {
-        window.dispatchEvent(closeOverlayEvent);
-        loadingMessage.innerHTML = `
-        <font color="red">Erro ao estabelecer conexão com o Banco de dados.</font>`;
-        if (idTimeOut === null)
-            idTimeOut = setTimeout(
-                showLoading, 500
-            );
-    }
-}
-
-if (tempIdTimeIntervalTest === null) {
-    tempIdTimeIntervalTest = setInterval(test, 5000);
-}
+// Mudanças na tabela e na conexão com o DB chegam pela API (Server-Sent Events).
+startChangeFeed();
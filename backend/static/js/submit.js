@@ -1,7 +1,7 @@
 import { addProductRequest, updateProductRequest, getProductRequest, removeProductRequest } from "./app.js";
-import { addRow, clearAllColumns, getRow, getAllRowIds } from "./table.js";
+import { addRow, clearAllColumns, getAllRowIds } from "./table.js";
 import { showLoading } from "./dialog.js";
-import { capitalize, getIdRowFromElement } from "./utils.js";
+import { capitalize, getIdRowFromElement, formatBrazilianDate } from "./utils.js";
 import { loadEventListeners, closeLoadingEvent } from "./events.js";
 import { indexListeners } from "./index.js";
 
@@ -10,47 +10,34 @@ const loadingText = document.getElementById("loading-message");
 let idTimeOut;
 
 export async function submitNewProduct(name, category, price) {
-    try {
-        const response = await addProductRequest(name, category.toLowerCase(), price);
-        showLoading()
-        if (!response?.success) {
-            loading.classList.add("red")
-            loadingText.innerHTML = "Falha ao adicionar o produto!";
-        } else {
-            loading.classList.add("green");
-            loadingText.innerHTML = "Produto adicionado com sucesso!";
-            if (idTimeOut === null)
-                idTimeOut = setTimeout(() => {
-                    closeLoadingEvent();
-                }, 2000);
-            }
-    } finally {
-        refeshTable();
-    }
+    const response = await addProductRequest(name, category.toLowerCase(), price);
+    showLoading()
+    if (!response?.success) {
+        loading.classList.add("red")
+        loadingText.innerHTML = "Falha ao adicionar o produto!";
+    } else {
+        loading.classList.add("green");
+        loadingText.innerHTML = "Produto adicionado com sucesso!";
+        if (idTimeOut === null)
+            idTimeOut = setTimeout(() => {
+                closeLoadingEvent();
+            }, 2000);
+        }
 }
 
 export async function submitUpdateProduct(id, name, category, price) {
-    try {
-        const response = await updateProductRequest(id, name, category.toLowerCase(), price);
-        showLoading()
-        if (!response?.success) {
-            loading.classList.add("red")
-            loadingText.innerHTML = "Falha ao tentar atualizar o produto!"
-        } else {
-            loading.classList.add("green");
-            loadingText.innerHTML = "Produto atualizado com sucesso!";
-            if (idTimeOut === null)
-                idTimeOut = setTimeout(() => {
-                    closeLoadingEvent();
-                }, 2000);
-            /** @type {Object<string, HTMLDivElement>} */
-            const { nameCell, categoryCell, priceCell } = getRow(id);
-            nameCell.querySelector("p").textContent = capitalize(name);
-            categoryCell.querySelector("p").textContent = capitalize(category);
-            priceCell.querySelector("p").textContent = "R$ " + price;
-        }
-    } finally {
-        refeshTable();
+    const response = await updateProductRequest(id, name, category.toLowerCase(), price);
+    showLoading()
+    if (!response?.success) {
+        loading.classList.add("red")
+        loadingText.innerHTML = "Falha ao tentar atualizar o produto!"
+    } else {
+        loading.classList.add("green");
+        loadingText.innerHTML = "Produto atualizado com sucesso!";
+        if (idTimeOut === null)
+            idTimeOut = setTimeout(() => {
+                closeLoadingEvent();
+            }, 2000);
     }
 }
 
@@ -58,21 +45,17 @@ export async function submitDeleteProduct(id, showLoading_ = true) {
     const response = removeProductRequest(id);
     if (showLoading_)
         showLoading()
-    try {
-        if (!response?.success) {
-            loading.classList.add("red")
-            loadingText.innerHTML = "Falha ao remover o produto."
-        } else {
-            loading.classList.add("green");
-            loadingText.innerHTML = "Produto removido com sucesso!";
-            if (idTimeOut === null) {
-                idTimeOut = setTimeout(() => {
-                    closeLoadingEvent();
-                }, 2000);
-            }
+    if (!response?.success) {
+        loading.classList.add("red")
+        loadingText.innerHTML = "Falha ao remover o produto."
+    } else {
+        loading.classList.add("green");
+        loadingText.innerHTML = "Produto removido com sucesso!";
+        if (idTimeOut === null) {
+            idTimeOut = setTimeout(() => {
+                closeLoadingEvent();
+            }, 2000);
         }
-    } finally {
-        refeshTable();
     }
 }
 
@@ -92,7 +75,7 @@ export async function refeshTable(otherTable = null) {
         if (otherTable === null) {
             response?.data.forEach(content => {
                 const { id, name, category, price, time_stamp } = content;
-                addRow(id, capitalize(name), capitalize(category), "R$ " + price, `Criado em: ${time_stamp}`);
+                addRow(id, capitalize(name), capitalize(category), "R$ " + price, `Criado em: ${formatBrazilianDate(time_stamp)}`);
             });
         } else {
             otherTable.forEach(
@@ -1,6 +1,8 @@
-import { closeOverlayEvent } from "./events.js";
+import { closeOverlayEvent, loadEventListeners } from "./events.js";
 import { refeshTable } from "./submit.js";
-import { getIdRowFromElement, parseBrazilianDate } from "./utils.js";
+import { getChangesRequest } from "./app.js";
+import { indexListeners } from "./index.js";
+import { capitalize, formatBrazilianDate, getIdRowFromElement, parseBrazilianDate } from "./utils.js";
 
 const sortByNewest = (a, b) => {
     const dateA = parseBrazilianDate(a.getAttribute("title"));
@@ -139,6 +141,25 @@ export function addRow(id, name, category, price, title = "") {
     actionColumn.appendChild(actionCell);
 }
 
+/**
+ * Adiciona a linha de um produto recebido da API ou,
+ * se ela já existir, atualiza os seus valores.
+ * @param {Object} product Produto enviado pela API.
+ */
+export function upsertRow(product) {
+    const { id, name, category, price, time_stamp } = product;
+    const row = getRow(id, false);
+    if (row === null) {
+        addRow(id, capitalize(name), capitalize(category), "R$ " + price, `Criado em: ${formatBrazilianDate(time_stamp)}`);
+        loadEventListeners();
+        indexListeners();
+        return;
+    }
+    row.name.querySelector("p").textContent = capitalize(name);
+    row.category.querySelector("p").textContent = capitalize(category);
+    row.price.querySelector("p").textContent = "R$ " + price;
+}
+
 /**
  * Retorna um array com os elementos HTML que compõe
  * a linha buscada.
@@ -341,6 +362,55 @@ document.querySelector("#order-by").addEventListener("change", e => {
     window.dispatchEvent(closeOverlayEvent);
 });
 
+/** Cursor da última sincronização (`next_cursor` da API). */
+let changesCursor = null;
+let isSyncing = false;
+let hasPendingSync = false;
+
+/**
+ * Sincroniza a tabela com a API. Na primeira vez, ou se o cursor
+ * expirar, carrega todos os produtos; depois, aplica só os produtos
+ * criados, alterados e apagados desde a última sincronização.
+ */
+export async function syncTable() {
+    if (isSyncing) {
+        hasPendingSync = true;
+        return;
+    }
+    isSyncing = true;
+    try {
+        if (changesCursor === null) {
+            // O cursor é pego antes da lista: o que mudar no meio
+            // tempo é aplicado logo em seguida.
+            const first = await getChangesRequest();
+            if (!first?.success)
+                return;
+            await refeshTable();
+            changesCursor = first.next_cursor;
+        }
+        let response;
+        do {
+            response = await getChangesRequest(changesCursor);
+            if (!response?.success) {
+                if (response?.error?.type === "ChangesExpiredError") {
+                    changesCursor = null;
+                    hasPendingSync = true;
+                }
+                return;
+            }
+            response.data.upserted.forEach(upsertRow);
+            response.data.deleted.forEach(deleteRow);
+            changesCursor = response.next_cursor;
+        } while (response.has_more);
+    } finally {
+        isSyncing = false;
+        if (hasPendingSync) {
+            hasPendingSync = false;
+            syncTable();
+        }
+    }
+}
+
 window.searchInTable = searchInTable;
 
-refeshTable();
+syncTable();
@@ -11,6 +11,19 @@ export function parseBrazilianDate(title) {
     return new Date(`${year}-${month}-${day}T${timePart}`);
 }
 
+/**
+ * Converte uma data ISO 8601 da API ("2025-12-11T08:46:55")
+ * para o formato exibido na tabela ("11/12/2025 - 08:46:55").
+ * @param {string} isoDate Data enviada pela API.
+ * @returns {string}
+ */
+export function formatBrazilianDate(isoDate) {
+    const match = /^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}:\d{2}:\d{2})/.exec(isoDate ?? "");
+    if (match === null) return isoDate;
+    const [, year, month, day, time] = match;
+    return `${day}/${month}/${year} - ${time}`;
+}
+
 export function mergeObjectInPlace(o, newObj) {
     for (const key of Object.keys(newObj)) {
         o[key] = newObj[key];
@@ -0,0 +1,174 @@
+"""
+Esse módulo contém o resumo por categoria dos produtos (contagem e
+preços mínimo, médio e máximo), mantido em memória a cada escrita.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypedDict
+from bisect import bisect_left, insort
+from decimal import Decimal
+from threading import Lock
+from enums import ProductCategory
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+class CategoryTotalsDict(TypedDict):
+    """Totais de uma categoria, como os do `GROUP BY category` no DB."""
+    category: str
+    count: int
+    total: Optional[Decimal]
+    min_price: Optional[Decimal]
+    max_price: Optional[Decimal]
+
+class CategoryStatsDict(TypedDict):
+    """Estatísticas de uma categoria. Sem produtos, os preços são None."""
+    category: str
+    count: int
+    min_price: Optional[Decimal]
+    avg_price: Optional[Decimal]
+    max_price: Optional[Decimal]
+
+_RowsLoader = Callable[[], Iterable[Tuple[int, str, Decimal]]]
+_RowsByIdLoader = Callable[[List[int]], Iterable[Tuple[int, str, Decimal]]]
+
+_CENTS = Decimal("0.01")
+
+def stats_from_totals(totals: Iterable[CategoryTotalsDict]) -> List[CategoryStatsDict]:
+    """
+    Converte os totais por categoria em estatísticas, com uma entrada
+    para cada `ProductCategory`, na ordem do Enum.
+    """
+    by_category = {row["category"]: row for row in totals}
+    stats: List[CategoryStatsDict] = []
+    for category in ProductCategory:
+        row = by_category.get(category.value)
+        if row is None or not row["count"]:
+            stats.append({
+                "category": category.value, "count": 0,
+                "min_price": None, "avg_price": None, "max_price": None
+            })
+            continue
+        total = Decimal(row["total"] or 0)
+        stats.append({
+            "category": category.value,
+            "count": row["count"],
+            "min_price": row["min_price"],
+            "avg_price": (total / row["count"]).quantize(_CENTS),
+            "max_price": row["max_price"]
+        })
+    return stats
+
+# * =======================
+# * == RESUMO EM MEMÓRIA ==
+# * =======================
+
+class _CategoryTotals:
+    """Contagem, soma e preços ordenados de uma categoria."""
+    __slots__ = ("count", "total", "prices")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = Decimal(0)
+        self.prices: List[Decimal] = []
+
+    def add(self, price: Decimal) -> None:
+        """Soma um produto à categoria."""
+        self.count += 1
+        self.total += price
+        insort(self.prices, price)
+
+    def remove(self, price: Decimal) -> None:
+        """Retira um produto da categoria."""
+        self.count -= 1
+        self.total -= price
+        del self.prices[bisect_left(self.prices, price)]
+
+class CategorySummary:
+    """
+    Resumo por categoria mantido a cada escrita, para que a leitura
+    custe O(categorias) e não O(linhas). Guarda a categoria e o preço
+    de cada id: numa escrita, `refresh` relê só os ids alterados e
+    desfaz os valores antigos antes de somar os novos. Os preços de
+    cada categoria ficam ordenados, então o mínimo e o máximo seguem
+    corretos mesmo quando o produto mais barato é removido.
+
+    `load_all` lê todos os trios (id, categoria, preço) do DB e
+    `load_ids` lê os trios dos ids indicados. As leituras no DB são
+    serializadas, como em `suggest.PrefixIndex`.
+    """
+    def __init__(self, load_all: _RowsLoader, load_ids: _RowsByIdLoader) -> None:
+        self._load_all = load_all
+        self._load_ids = load_ids
+        self._rows: Dict[int, Tuple[str, Decimal]] = {}
+        self._totals: Dict[str, _CategoryTotals] = {}
+        self._loaded = False
+        self._lock = Lock() # Protege os dados do resumo.
+        self._refresh_lock = Lock() # Serializa as leituras no DB.
+
+    @property
+    def loaded(self) -> bool:
+        """Se o resumo já foi carregado do DB."""
+        return self._loaded
+
+    def reload(self) -> None:
+        """Recalcula o resumo inteiro a partir do DB."""
+        with self._refresh_lock:
+            rows: Dict[int, Tuple[str, Decimal]] = {}
+            totals: Dict[str, _CategoryTotals] = {}
+            for id_, category, price in self._load_all():
+                price = Decimal(price)
+                rows[id_] = (category, price)
+                totals.setdefault(category, _CategoryTotals()).add(price)
+            with self._lock:
+                self._rows = rows
+                self._totals = totals
+                self._loaded = True
+
+    def refresh(self, ids: Optional[List[int]]) -> None:
+        """
+        Atualiza o resumo com os `ids` alterados, relendo-os do DB.
+        Com `ids` None (alterações desconhecidas), recalcula tudo.
+        """
+        if ids is None:
+            self.reload()
+            return
+        if not ids:
+            return
+        with self._refresh_lock:
+            if not self._loaded:
+                return # Será carregado por inteiro na próxima leitura.
+            new_rows = {id_: (category, Decimal(price)) for id_, category, price in self._load_ids(ids)}
+            with self._lock:
+                for id_ in ids:
+                    old = self._rows.pop(id_, None)
+                    if old is not None:
+                        self._totals[old[0]].remove(old[1])
+                    new = new_rows.get(id_)
+                    if new is not None:
+                        self._rows[id_] = new
+                        self._totals.setdefault(new[0], _CategoryTotals()).add(new[1])
+
+    def invalidate(self) -> None:
+        """Descarta o resumo; ele será recarregado na próxima leitura."""
+        with self._lock:
+            self._rows = {}
+            self._totals = {}
+            self._loaded = False
+
+    def totals(self) -> List[CategoryTotalsDict]:
+        """Retorna os totais de cada categoria com produtos."""
+        with self._lock:
+            return [
+                {
+                    "category": category,
+                    "count": totals.count,
+                    "total": totals.total,
+                    "min_price": totals.prices[0],
+                    "max_price": totals.prices[-1]
+                }
+                for category, totals in self._totals.items() if totals.count
+            ]
+
+    def stats(self) -> List[CategoryStatsDict]:
+        """Retorna as estatísticas de cada `ProductCategory`."""
+        return stats_from_totals(self.totals())
@@ -0,0 +1,154 @@
+"""
+Esse módulo contém o índice em memória dos nomes dos produtos,
+usado para sugerir nomes enquanto o usuário digita.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypedDict
+from bisect import bisect_left, insort
+from threading import Lock
+from utils import fold_text
+
+# * ===============================
+# * == DEFININDO TIPOS ESTÁTICOS ==
+# * ===============================
+
+class SuggestionDict(TypedDict):
+    """Uma sugestão de nome de produto."""
+    id: int
+    name: str
+
+_NamesLoader = Callable[[], Iterable[Tuple[int, str]]]
+_NamesByIdLoader = Callable[[List[int]], Iterable[Tuple[int, str]]]
+
+# * =====================
+# * == ÍNDICE DE NOMES ==
+# * =====================
+
+class PrefixIndex:
+    """
+    Índice de prefixos dos nomes: uma lista ordenada de pares
+    (nome normalizado, id). Uma busca é uma busca binária até o
+    primeiro nome com o prefixo, seguida de uma leitura sequencial
+    enquanto os nomes continuarem com ele. Os nomes são comparados
+    sem acentos e sem diferenciar maiúsculas (veja `fold_text`).
+
+    `load_all` lê todos os pares (id, nome) do DB e `load_ids` lê os
+    pares dos ids indicados. As leituras no DB são serializadas, para
+    que o índice reflita sempre a leitura mais recente.
+
+    Para limitar a memória, no máximo `max_entries` nomes são guardados.
+    Acima disso, o índice fica incompleto (`complete` é False) e quem o
+    usa deve buscar as sugestões no DB.
+    """
+    def __init__(
+        self,
+        load_all: _NamesLoader,
+        load_ids: _NamesByIdLoader,
+        *,
+        max_entries: int = 100000
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("`max_entries` deve ser maior que zero.")
+        self._load_all = load_all
+        self._load_ids = load_ids
+        self._max_entries = max_entries
+        self._entries: List[Tuple[str, int]] = []
+        self._names: Dict[int, Tuple[str, str]] = {} # id -> (nome normalizado, nome)
+        self._loaded = False
+        self._complete = True
+        self._lock = Lock() # Protege os dados do índice.
+        self._refresh_lock = Lock() # Serializa as leituras no DB.
+
+    @property
+    def loaded(self) -> bool:
+        """Se o índice já foi carregado do DB."""
+        return self._loaded
+
+    @property
+    def complete(self) -> bool:
+        """Se todos os nomes do DB cabem no índice."""
+        return self._complete
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def reload(self) -> None:
+        """Recarrega o índice inteiro do DB."""
+        with self._refresh_lock:
+            names: Dict[int, Tuple[str, str]] = {}
+            complete = True
+            for id_, name in self._load_all():
+                if len(names) >= self._max_entries:
+                    complete = False
+                    break
+                names[id_] = (fold_text(name), name)
+            entries = sorted((key, id_) for id_, (key, _) in names.items())
+            with self._lock:
+                self._entries = entries
+                self._names = names
+                self._complete = complete
+                self._loaded = True
+
+    def refresh(self, ids: Optional[List[int]]) -> None:
+        """
+        Atualiza os nomes dos `ids` alterados, relendo-os do DB: os
+        encontrados são atualizados e os que sumiram, removidos.
+        Com `ids` None (alterações desconhecidas), recarrega tudo.
+        """
+        if ids is None:
+            self.reload()
+            return
+        if not ids:
+            return
+        with self._refresh_lock:
+            if not self._loaded:
+                return # Será carregado por inteiro na próxima busca.
+            rows = dict(self._load_ids(ids))
+            with self._lock:
+                for id_ in ids:
+                    self._remove(id_)
+                    if id_ in rows:
+                        self._add(id_, rows[id_])
+
+    def invalidate(self) -> None:
+        """Descarta o índice; ele será recarregado na próxima busca."""
+        with self._lock:
+            self._entries = []
+            self._names = {}
+            self._complete = True
+            self._loaded = False
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[SuggestionDict]:
+        """Retorna até `limit` nomes que começam com `prefix`, em ordem alfabética."""
+        key = fold_text(prefix)
+        suggestions: List[SuggestionDict] = []
+        with self._lock:
+            # (key,) vem antes de qualquer (key, id), então a busca
+            # para no primeiro nome que começa com o prefixo.
+            i = bisect_left(self._entries, (key,))
+            while i < len(self._entries) and len(suggestions) < limit:
+                entry_key, id_ = self._entries[i]
+                if not entry_key.startswith(key):
+                    break
+                suggestions.append({"id": id_, "name": self._names[id_][1]})
+                i += 1
+        return suggestions
+
+    def _remove(self, id_: int) -> None:
+        """Remove o nome de um id. Deve ser chamado com `_lock`."""
+        old = self._names.pop(id_, None)
+        if old is None:
+            return
+        entry = (old[0], id_)
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def _add(self, id_: int, name: str) -> None:
+        """Adiciona o nome de um id. Deve ser chamado com `_lock`."""
+        if len(self._names) >= self._max_entries:
+            self._complete = False
+            return
+        key = fold_text(name)
+        self._names[id_] = (key, name)
+        insort(self._entries, (key, id_))
@@ -6,6 +6,9 @@ from typing import (
     Optional, Literal
 )
 from enum import Enum
+import base64
+import json
+import unicodedata
 from flask import jsonify, Response
 
 AnyIterable: TypeAlias = Iterable[Any]
@@ -130,15 +133,58 @@ def to_unique_depth(
         temp_list.append(element)
     return to(temp_list)
 
+def fold_text(text: str) -> str:
+    """
+    Remove os acentos e as diferenças entre maiúsculas e minúsculas
+    de um texto, para comparações como as da collation `utf8mb4_unicode_ci`.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return stripped.casefold()
+
+def encode_cursor(cursor: Dict[str, Any]) -> str:
+    """Converte um dicionário de paginação em um cursor opaco."""
+    raw = json.dumps(cursor, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Converte um cursor opaco de volta no dicionário de paginação,
+    cujos valores são sempre textos ou números.
+
+    Raises:
+        ValueError: O cursor é inválido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        decoded = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido.") from e
+    if not isinstance(decoded, dict) or not all(
+        isinstance(value, (str, int, float)) for value in decoded.values()
+    ):
+        raise ValueError("Cursor inválido.")
+    return decoded
+
+def not_modified_response(etag: str) -> _HTTPResponse:
+    """Retorna uma resposta `304 Not Modified` com o ETag indicado."""
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response, 304
+
 def http_response(
     code: int = 200,
     message: str = "OK",
     *,
     data: Optional[Any] = None,
     error: Optional[Any] = None,
+    extra: Optional[Dict[str, Any]] = None,
     preset: Optional[_HTTPResponsePresetLiteral] = None
 ) -> _HTTPResponse:
-    """Retorna uma resposta HTTP usando jsonify."""
+    """
+    Retorna uma resposta HTTP usando jsonify. Os campos em
+    `extra` são adicionados ao corpo da resposta.
+    """
     if preset == "sql_error":
         return http_response(500, "Um erro interno de SQL ocorreu.", error=error)
     if preset == "generic_internal_error":
@@ -155,6 +201,8 @@ def http_response(
     }
     if data is not None:
         response["data"] = data
+    if extra:
+        response.update(extra)
     if error is not None:
         if isinstance(error, BaseException):
             error_info = {
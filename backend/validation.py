@@ -0,0 +1,193 @@
+"""
+Esse módulo contém a validação dos JSON recebidos pela API.
+
+Os modelos do pydantic são criados uma única vez, no carregamento
+do módulo, e reutilizados em todas as requisições.
+"""
+from typing import (
+    Union, Literal, List,
+    Tuple, Optional, Dict,
+    Any, TypeAlias
+)
+from decimal import Decimal
+from pydantic import (
+    BaseModel, ConfigDict, Field,
+    TypeAdapter, ValidationError, model_validator
+)
+from pydantic_core import ErrorDetails
+from enums import ProductCategory, ProductSort
+import config
+
+_PriceType: TypeAlias = Union[int, float, Decimal]
+_ValidationErrors: TypeAlias = List[ErrorDetails]
+
+# * =============
+# * == MODELOS ==
+# * =============
+
+class ProductDict(BaseModel):
+    """Representa a estrutura de um dicionário representando um produto."""
+    model_config = ConfigDict(use_enum_values=True)
+    name: str
+    price: _PriceType
+    category: ProductCategory
+
+class ProductUpdateDict(BaseModel):
+    """
+    Representa a estrutura de uma atualização parcial de um produto,
+    em que todos os campos são opcionais.
+
+    Os campos podem ser omitidos, mas não enviados como null: o padrão
+    None não é validado e fica de fora do `model_dump(exclude_unset=True)`.
+    """
+    model_config = ConfigDict(extra="forbid", use_enum_values=True)
+    name: str = Field(default=None)
+    price: _PriceType = Field(default=None)
+    category: ProductCategory = Field(default=None)
+
+class BulkFilterDict(BaseModel):
+    """Representa os filtros de igualdade de uma operação em massa."""
+    model_config = ConfigDict(extra="forbid")
+    name: Optional[str] = None
+    price: Optional[_PriceType] = None
+    category: Optional[ProductCategory] = None
+
+class BulkDeleteDict(BaseModel):
+    """Representa o corpo de DELETE /api/products."""
+    model_config = ConfigDict(extra="forbid")
+    ids: Optional[List[int]] = Field(default=None, min_length=1)
+    filter: Optional[BulkFilterDict] = None
+
+class BulkSetDict(BaseModel):
+    """Representa os novos valores de PATCH /api/products."""
+    model_config = ConfigDict(extra="forbid")
+    price: Optional[_PriceType] = None
+    category: Optional[ProductCategory] = None
+
+class BulkUpdateDict(BulkDeleteDict):
+    """Representa o corpo de PATCH /api/products."""
+    set: Optional[BulkSetDict] = None
+    price_factor: Optional[Decimal] = Field(default=None, gt=0)
+
+class SearchArgsDict(BaseModel):
+    """Representa a query string de GET /api/products/search."""
+    model_config = ConfigDict(extra="forbid")
+    category: Optional[ProductCategory] = None
+    min_price: Optional[Decimal] = Field(default=None, ge=0)
+    max_price: Optional[Decimal] = Field(default=None, ge=0)
+    name: Optional[str] = Field(default=None, min_length=1, max_length=100)
+    sort: ProductSort = ProductSort.ID
+    limit: int = Field(
+        default=config.PRODUCTS_PAGE_SIZE, ge=1, le=config.PRODUCTS_MAX_PAGE_SIZE
+    )
+
+    @model_validator(mode="after")
+    def check_price_range(self) -> "SearchArgsDict":
+        """Verifica se o preço mínimo não é maior que o máximo."""
+        if (
+            self.min_price is not None and self.max_price is not None
+            and self.min_price > self.max_price
+        ):
+            raise ValueError("`min_price` não pode ser maior que `max_price`.")
+        return self
+
+_PRODUCT_LIST_ADAPTER = TypeAdapter(List[ProductDict])
+
+# * ======================
+# * == FUNÇÕES PÚBLICAS ==
+# * ======================
+
+def validate_product(
+    product_dict: Any,
+    *,
+    partial: bool = False
+) -> Union[Tuple[Dict[str, Any], Literal[None]], Tuple[Literal[None], _ValidationErrors]]:
+    """
+    Valida um dicionário que representa um produto. Com `partial`,
+    todos os campos são opcionais (usado no PUT), mas ao menos um
+    deve ser enviado.
+
+    Returns:
+        (tuple): Os campos validados e None, ou None e os erros.
+    """
+    model = ProductUpdateDict if partial else ProductDict
+    try:
+        product = model.model_validate(product_dict)
+    except ValidationError as VError:
+        return None, VError.errors()
+    fields = product.model_dump(exclude_unset=True)
+    if partial and not fields:
+        return None, [{
+            "type": "missing",
+            "loc": (),
+            "msg": "Ao menos um campo deve ser enviado.",
+            "input": product_dict
+        }]
+    return fields, None
+
+def is_valide_product_json(
+    product_dict: dict,
+    *,
+    partial: bool = False
+) -> Union[Tuple[Literal[True], Literal[None]], Tuple[Literal[False], _ValidationErrors]]:
+    """Verifica se um dicionário que representa um produto é valido em tipo."""
+    _, errors = validate_product(product_dict, partial=partial)
+    if errors is not None:
+        return False, errors
+    return True, None
+
+def validate_products(
+    products: List[Any]
+) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, _ValidationErrors]]:
+    """
+    Valida uma lista de produtos numa única chamada ao pydantic.
+
+    Returns:
+        (tuple): Os campos validados de cada item (None nos inválidos)
+        e um dicionário com os erros de cada índice inválido.
+    """
+    try:
+        validated = _PRODUCT_LIST_ADAPTER.validate_python(products)
+    except ValidationError as VError:
+        errors: Dict[int, _ValidationErrors] = {}
+        for error in VError.errors():
+            index, *loc = error["loc"]
+            error["loc"] = tuple(loc)
+            errors.setdefault(index, []).append(error) # pyright: ignore[reportArgumentType]
+        fields: List[Optional[Dict[str, Any]]] = [None] * len(products)
+        for i, product in enumerate(products):
+            if i not in errors:
+                fields[i] = ProductDict.model_validate(product).model_dump()
+        return fields, errors
+    return [product.model_dump() for product in validated], {}
+
+def validate_bulk(
+    bulk_dict: Any,
+    *,
+    is_update: bool
+) -> Union[Tuple[BulkDeleteDict, Literal[None]], Tuple[Literal[None], _ValidationErrors]]:
+    """
+    Valida o corpo de uma operação em massa.
+
+    Returns:
+        (tuple): O modelo validado e None, ou None e os erros.
+    """
+    model = BulkUpdateDict if is_update else BulkDeleteDict
+    try:
+        return model.model_validate(bulk_dict), None
+    except ValidationError as VError:
+        return None, VError.errors()
+
+def validate_search(
+    args: Dict[str, str]
+) -> Union[Tuple[SearchArgsDict, Literal[None]], Tuple[Literal[None], _ValidationErrors]]:
+    """
+    Valida a query string de uma busca.
+
+    Returns:
+        (tuple): O modelo validado e None, ou None e os erros.
+    """
+    try:
+        return SearchArgsDict.model_validate(args), None
+    except ValidationError as VError:
+        return None, VError.errors(include_context=False)
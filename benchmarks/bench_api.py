@@ -0,0 +1,296 @@
+"""
+Teste de carga da API: vazão e latência com clientes concorrentes.
+
+Cada cliente é uma thread com a sua própria conexão HTTP, que sorteia
+as operações de `--mix` (listar, ler, criar, atualizar e apagar) até
+o fim de `--duration`. Os primeiros `--warmup` segundos não contam.
+O resultado traz requisições por segundo e os percentis p50, p95 e
+p99 de cada operação, em JSON, para ser comparado com `report.py`.
+
+Sem `--url`, a aplicação roda neste processo (servidor do werkzeug
+com threads) e o limite de escritas é desligado. Ela precisa do
+banco configurado em `config` (CANTINA_DB_*). Os produtos
+criados pelo teste (nomes "bench <id da execução> ...") são apagados
+no fim.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_api.py [--clients 8] [--duration 10] [--output api.json]
+    python benchmarks/bench_api.py --url http://127.0.0.1:5000 --mix list=80,get=20
+"""
+from typing import Dict, List, Optional, Tuple
+from http.client import HTTPConnection
+from threading import Event, Thread
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+import argparse
+import json
+import os
+import random
+import secrets
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from report import MetricDict, build_results, metric, write_results # pylint: disable=wrong-import-position
+
+OPERATIONS = ("list", "get", "create", "update", "delete")
+DEFAULT_MIX = "list=40,get=40,create=10,update=5,delete=5"
+# Uma amostra: (operação, início em segundos, latência em segundos, código de status).
+_Sample = Tuple[str, float, float, int]
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Lê o `--mix` no formato "operação=peso,...".
+
+    Raises:
+        ValueError: Operação desconhecida ou nenhum peso positivo.
+    """
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Operação desconhecida no mix: {name}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("O mix precisa de ao menos um peso positivo.")
+    return mix
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Percentil pelo método do posto mais próximo; 0 sem valores."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+class Client:
+    """Um cliente da API, com uma conexão HTTP persistente."""
+    def __init__(self, host: str, port: int) -> None:
+        self._connection = HTTPConnection(host, port, timeout=30)
+
+    def request(self, method: str, path: str, body: Optional[object] = None) -> Tuple[int, object]:
+        """Envia uma requisição e retorna o código de status e o JSON da resposta (ou None)."""
+        headers = {"Connection": "keep-alive"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            self._connection.request(method, path, payload, headers)
+            response = self._connection.getresponse()
+            data = response.read()
+        except (OSError, ConnectionError):
+            # O servidor fechou a conexão: reabre e tenta uma vez.
+            self._connection.close()
+            self._connection.request(method, path, payload, headers)
+            response = self._connection.getresponse()
+            data = response.read()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def close(self) -> None:
+        """Fecha a conexão."""
+        self._connection.close()
+
+class Worker(Thread):
+    """Thread de um cliente: sorteia e executa operações até `stop` ser sinalizado."""
+    def __init__(
+        self,
+        index: int,
+        host: str,
+        port: int,
+        mix: Dict[str, float],
+        shared_ids: List[int],
+        run_id: str,
+        stop: Event,
+        seed: int
+    ) -> None:
+        super().__init__(name=f"bench-client-{index}", daemon=True)
+        self.index = index
+        self.client = Client(host, port)
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.shared_ids = shared_ids
+        self.run_id = run_id
+        self.stop = stop
+        self.random = random.Random(seed + index)
+        self.samples: List[_Sample] = []
+        self.created: List[int] = []
+        self._counter = 0
+
+    def _new_product(self) -> dict:
+        self._counter += 1
+        return {
+            "name": f"bench {self.run_id} {self.index}-{self._counter}",
+            "category": "salgado",
+            "price": f"{self.random.uniform(1, 20):.2f}"
+        }
+
+    def _execute(self, operation: str) -> Tuple[str, int]:
+        """Executa uma operação e retorna o nome registrado e o código de status."""
+        if operation == "delete" and not self.created:
+            operation = "create" # Ainda não há um produto próprio para apagar.
+        if operation == "list":
+            return operation, self.client.request("GET", "/api/products?limit=50")[0]
+        if operation == "get":
+            return operation, self.client.request(
+                "GET", f"/api/products/{self.random.choice(self.shared_ids)}"
+            )[0]
+        if operation == "update":
+            id_ = self.random.choice(self.created or self.shared_ids)
+            return operation, self.client.request(
+                "PUT", f"/api/products/{id_}", {"price": f"{self.random.uniform(1, 20):.2f}"}
+            )[0]
+        if operation == "delete":
+            id_ = self.created.pop(self.random.randrange(len(self.created)))
+            return operation, self.client.request("DELETE", f"/api/products/{id_}")[0]
+        status, body = self.client.request("POST", "/api/products", self._new_product())
+        if status == 201 and isinstance(body, dict):
+            self.created.append(body["data"]["id"])
+        return operation, status
+
+    def run(self) -> None:
+        while not self.stop.is_set():
+            operation = self.random.choices(self.operations, self.weights)[0]
+            start = perf_counter()
+            try:
+                operation, status = self._execute(operation)
+            except (OSError, ConnectionError):
+                status = 0 # Falha de conexão.
+            self.samples.append((operation, start, perf_counter() - start, status))
+        self.client.close()
+
+def start_local_server() -> Tuple[str, int]:
+    """Sobe a aplicação neste processo e retorna o endereço dela."""
+    # O teste de carga não deve esbarrar no limite de escritas.
+    os.environ.setdefault("CANTINA_WRITE_RATE_LIMIT_BURST", "1000000000")
+    os.environ.setdefault("CANTINA_WRITE_RATE_LIMIT_PER_SECOND", "1000000000")
+    from werkzeug.serving import WSGIRequestHandler, make_server # pylint: disable=import-outside-toplevel
+    import app as app_module # pylint: disable=import-outside-toplevel
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        """Mantém as conexões abertas entre as requisições (HTTP/1.1)."""
+        protocol_version = "HTTP/1.1"
+
+        def log_request(self, code="-", size="-") -> None:
+            pass
+
+    # O monitor de saúde inicializa o DB ao subir; espera por ele.
+    for _ in range(50):
+        if app_module.db.db_has_initialized():
+            break
+        sleep(0.1)
+    else:
+        if not app_module.on_test_connection():
+            raise SystemExit("Sem conexão com o DB: configure as variáveis CANTINA_DB_*.")
+    server = make_server(
+        "127.0.0.1", 0, app_module.app, threaded=True, request_handler=KeepAliveHandler
+    )
+    Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+    return "127.0.0.1", server.server_port
+
+def seed_products(client: Client, run_id: str, count: int) -> List[int]:
+    """Cria os produtos lidos e atualizados durante o teste."""
+    ids: List[int] = []
+    for start in range(0, count, 500):
+        products = [
+            {"name": f"bench {run_id} seed-{i}", "category": "doce", "price": "4.50"}
+            for i in range(start, min(count, start + 500))
+        ]
+        status, body = client.request("POST", "/api/products/batch", products)
+        if status not in (201, 207) or not isinstance(body, dict):
+            raise SystemExit(f"Falha ao criar os produtos iniciais (status {status}).")
+        ids.extend(item["id"] for item in body["data"] if item["success"])
+    if not ids:
+        raise SystemExit("Nenhum produto inicial foi criado.")
+    return ids
+
+def summarize(
+    samples: List[_Sample], measured_from: float, measured_seconds: float
+) -> Dict[str, MetricDict]:
+    """
+    Calcula as métricas das amostras feitas depois do aquecimento. Os
+    erros são as respostas fora de 2xx/3xx e as falhas de conexão.
+    """
+    by_operation: Dict[str, List[float]] = {}
+    errors = 0
+    for operation, start, latency, status in samples:
+        if start < measured_from:
+            continue
+        by_operation.setdefault(operation, []).append(latency * 1000)
+        by_operation.setdefault("all", []).append(latency * 1000)
+        if not 200 <= status < 400:
+            errors += 1
+    metrics: Dict[str, MetricDict] = {}
+    for operation in (*OPERATIONS, "all"):
+        latencies = sorted(by_operation.get(operation, []))
+        if not latencies:
+            continue
+        metrics[f"{operation}.rps"] = metric(
+            round(len(latencies) / measured_seconds, 1), "req/s", lower_is_better=False
+        )
+        for percent in (50, 95, 99):
+            metrics[f"{operation}.p{percent}_ms"] = metric(
+                round(percentile(latencies, percent), 3), "ms"
+            )
+    metrics["errors"] = metric(errors, "count")
+    return metrics
+
+def main() -> None:
+    """Executa o teste de carga."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--url", help="API já rodando (padrão: sobe a aplicação neste processo)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=2.0, help="segundos descartados")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"pesos (padrão: {DEFAULT_MIX})")
+    parser.add_argument("--seed-products", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1, help="semente do sorteio das operações")
+    parser.add_argument("--output", "-o", help="arquivo JSON do resultado (padrão: só a tabela)")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname or "127.0.0.1", url.port or 80
+    else:
+        host, port = start_local_server()
+    run_id = secrets.token_hex(3)
+    setup_client = Client(host, port)
+    shared_ids = seed_products(setup_client, run_id, args.seed_products)
+
+    stop = Event()
+    workers = [
+        Worker(i, host, port, mix, shared_ids, run_id, stop, args.seed) for i in range(args.clients)
+    ]
+    started_at = perf_counter()
+    for worker in workers:
+        worker.start()
+    sleep(args.warmup + args.duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    measured_from = started_at + args.warmup
+    # As requisições em andamento no fim também contam.
+    measured_seconds = perf_counter() - measured_from
+
+    leftover = shared_ids + [id_ for worker in workers for id_ in worker.created]
+    for start in range(0, len(leftover), 1000):
+        setup_client.request("DELETE", "/api/products", {"ids": leftover[start:start + 1000]})
+    setup_client.close()
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    metrics = summarize(samples, measured_from, measured_seconds)
+    for name, value in metrics.items():
+        print(f"{name:<24} {value["value"]:>12} {value["unit"]}", file=sys.stderr)
+    if args.output:
+        write_results(build_results("api", metrics, {
+            "clients": args.clients, "duration": args.duration, "warmup": args.warmup,
+            "mix": mix, "seed_products": args.seed_products, "url": args.url
+        }), args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark da serialização de uma lista grande de produtos.
+
+Compara o caminho antigo (`strftime` em cada linha no db e o
+provedor padrão do Flask) com o `FastJSONProvider`, que converte
+as datas direto para ISO 8601, nos backends stdlib e orjson (se
+instalado).
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_json.py
+"""
+from decimal import Decimal
+from timeit import repeat
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from flask import Flask # pylint: disable=wrong-import-position
+from flask.json.provider import DefaultJSONProvider # pylint: disable=wrong-import-position
+from json_provider import FastJSONProvider, orjson # pylint: disable=wrong-import-position
+
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+ROWS = [
+    {
+        "id": i,
+        "name": f"Produto {i}",
+        "category": "salgado",
+        "price": Decimal("5.50"),
+        "time_stamp": NOW
+    }
+    for i in range(5000)
+]
+APP = Flask(__name__)
+
+def old_encode() -> bytes:
+    """O caminho antigo: formata as datas no db e usa o provedor padrão."""
+    rows = [dict(row) for row in ROWS]
+    for row in rows:
+        row["time_stamp"] = row["time_stamp"].strftime("%d/%m/%Y - %H:%M:%S")
+    with APP.app_context():
+        return DefaultJSONProvider(APP).response({"data": rows}).get_data()
+
+def new_encode(provider: FastJSONProvider) -> bytes:
+    """O caminho novo: as linhas vão direto para o provedor."""
+    rows = [dict(row) for row in ROWS]
+    with APP.app_context():
+        return provider.response({"data": rows}).get_data()
+
+def bench(label: str, stmt, number: int = 10) -> float:
+    """Executa `stmt` e imprime o melhor tempo por chamada, em milissegundos."""
+    best = min(repeat(stmt, number=number, repeat=5)) / number * 1e3
+    print(f"{label:<40} {best:>10.2f} ms")
+    return best
+
+def main() -> None:
+    """Executa os benchmarks."""
+    print(f"== Lista de {len(ROWS)} produtos ==")
+    old = bench("strftime + DefaultJSONProvider", old_encode)
+    backends = ["stdlib"] + (["orjson"] if orjson is not None else [])
+    for backend in backends:
+        provider = FastJSONProvider(APP, backend) # pyright: ignore[reportArgumentType]
+        new = bench(f"FastJSONProvider ({backend})", lambda p=provider: new_encode(p))
+        print(f"{'ganho':<40} {old / new:>10.1f}x")
+
+if __name__ == "__main__":
+    main()
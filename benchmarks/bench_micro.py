@@ -0,0 +1,92 @@
+"""
+Microbenchmarks das funções chamadas em toda requisição.
+
+Mede `utils.to_unique_depth`, os construtores de SQL de `query`
+(`_where_SQL` e `Table.select`), a validação de `validation`, a
+resposta de `utils.http_response` e as métricas de `metrics`.
+Não precisa do MySQL. O resultado (melhor tempo por chamada, em
+microssegundos) sai em JSON, para ser comparado com `report.py`.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_micro.py [--output micro.json] [--repeat 5]
+"""
+from typing import Callable, Dict
+from decimal import Decimal
+from timeit import repeat
+import argparse
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from flask import Flask # pylint: disable=wrong-import-position
+from json_provider import FastJSONProvider # pylint: disable=wrong-import-position
+from metrics import Histogram # pylint: disable=wrong-import-position
+from query import Table, _where_SQL, _shape, eq, ge, in_, le, starts_with # pylint: disable=wrong-import-position
+from utils import http_response, to_unique_depth # pylint: disable=wrong-import-position
+from validation import validate_product, validate_products # pylint: disable=wrong-import-position
+from report import MetricDict, build_results, metric, write_results # pylint: disable=wrong-import-position
+
+TABLE = Table(
+    "produtos", ("id", "name", "category", "price", "time_stamp"), decimal_columns=("price",)
+)
+CONDITIONS = [
+    eq("category", "salgado"), ge("price", Decimal("2.00")), le("price", Decimal("9.90")),
+    starts_with("name", "Cox")
+]
+IDS = list(range(1, 101))
+NESTED = (("name", "Coxinha"), [("price", 5.5), ("category", "salgado")], {"id": 1})
+PRODUCT = {"name": "Coxinha", "price": 5.5, "category": "salgado"}
+BATCH = [{**PRODUCT, "name": f"Coxinha {i}"} for i in range(100)]
+ROWS = [
+    {
+        "id": i, "name": f"Produto {i}", "category": "salgado", "price": Decimal("5.50"),
+        "time_stamp": datetime.datetime(2025, 1, 1, 12, 0, 0)
+    }
+    for i in range(50)
+]
+
+def bench(stmt: Callable[[], object], number: int, repeats: int) -> float:
+    """Retorna o melhor tempo por chamada de `stmt`, em microssegundos."""
+    return min(repeat(stmt, number=number, repeat=repeats)) / number * 1e6
+
+def main() -> None:
+    """Executa os microbenchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--output", "-o", help="arquivo JSON do resultado (padrão: só a tabela)")
+    parser.add_argument("--repeat", type=int, default=5, help="repetições; vale a melhor")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app, "auto") # pyright: ignore[reportArgumentType]
+    histogram = Histogram("bench_seconds", "Benchmark.", ("route",))
+    shape = _shape([*CONDITIONS, in_("id", IDS)])
+
+    # O contexto da requisição é criado uma vez, para medir só a resposta.
+    request_context = app.test_request_context()
+    request_context.push()
+    cases: Dict[str, tuple] = {
+        "utils.to_unique_depth": (lambda: to_unique_depth(NESTED), 20000),
+        "query._where_SQL (5 condições)": (lambda: _where_SQL(shape), 20000),
+        "query.Table.select (compilado)": (
+            lambda: TABLE.select("*", CONDITIONS, order_by=("price", "id"), limit=50), 20000
+        ),
+        "query.Table.select (IN de 100)": (lambda: TABLE.select("*", [in_("id", IDS)]), 5000),
+        "validation.validate_product": (lambda: validate_product(PRODUCT), 20000),
+        "validation.validate_products (100)": (lambda: validate_products(BATCH), 200),
+        "utils.http_response (vazio)": (lambda: http_response(200), 20000),
+        "utils.http_response (50 linhas)": (lambda: http_response(200, data=ROWS), 2000),
+        "metrics.Histogram.observe": (lambda: histogram.observe(0.003, "/api/products"), 50000),
+    }
+    metrics: Dict[str, MetricDict] = {}
+    for name, (stmt, number) in cases.items():
+        value = bench(stmt, number, args.repeat)
+        metrics[name] = metric(round(value, 3), "us")
+        print(f"{name:<40} {value:>12.2f} us", file=sys.stderr)
+    request_context.pop()
+    if args.output:
+        write_results(build_results("micro", metrics, {"repeat": args.repeat}), args.output)
+
+if __name__ == "__main__":
+    main()
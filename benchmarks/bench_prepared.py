@@ -0,0 +1,72 @@
+"""
+Benchmark dos comandos em texto contra os comandos preparados.
+
+Executa laços de INSERT e de SELECT por id numa tabela temporária,
+primeiro com um cursor comum (o servidor analisa cada comando) e
+depois com um cursor preparado (o comando é analisado uma vez).
+Precisa do servidor MySQL configurado em `config` (CANTINA_DB_*).
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_prepared.py [repetições]
+"""
+from time import perf_counter
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from mysql.connector import connect # pylint: disable=wrong-import-position
+import config # pylint: disable=wrong-import-position
+
+INSERT_CMD = "INSERT INTO bench_produtos (name, category, price) VALUES (%s, %s, %s)"
+SELECT_CMD = "SELECT id, name, category, price, time_stamp FROM bench_produtos WHERE id = %s"
+
+def run(conn, prepared: bool, repeat: int) -> None:
+    """Executa os laços de INSERT e SELECT e imprime as taxas."""
+    conn.cursor().execute("TRUNCATE TABLE bench_produtos")
+    cursor = conn.cursor(prepared=prepared)
+    label = "preparado" if prepared else "texto"
+
+    start = perf_counter()
+    for i in range(repeat):
+        cursor.execute(INSERT_CMD, (f"Produto {i}", "salgado", 5.5))
+    conn.commit()
+    elapsed = perf_counter() - start
+    print(f"{"INSERT (" + label + ")":<24} {repeat / elapsed:>10.0f} ops/s")
+
+    start = perf_counter()
+    for i in range(repeat):
+        cursor.execute(SELECT_CMD, (i + 1,))
+        cursor.fetchall()
+    elapsed = perf_counter() - start
+    print(f"{"SELECT por id (" + label + ")":<24} {repeat / elapsed:>10.0f} ops/s")
+    cursor.close()
+
+def main() -> None:
+    """Executa o benchmark."""
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    conn = connect(
+        host=config.DB_HOST,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        connection_timeout=config.DB_CONNECT_TIMEOUT
+    )
+    cursor = conn.cursor()
+    cursor.execute("CREATE DATABASE IF NOT EXISTS cantina_bench")
+    cursor.execute("USE cantina_bench")
+    cursor.execute(
+        "CREATE TEMPORARY TABLE bench_produtos ("
+        "id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+        "category VARCHAR(50) NOT NULL, price DECIMAL(10, 2) NOT NULL, "
+        "time_stamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    cursor.close()
+    try:
+        run(conn, prepared=False, repeat=repeat)
+        run(conn, prepared=True, repeat=repeat)
+    finally:
+        conn.cursor().execute("DROP DATABASE IF EXISTS cantina_bench")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
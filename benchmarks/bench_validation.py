@@ -0,0 +1,58 @@
+"""
+Microbenchmark da validação dos produtos.
+
+Compara o validador antigo, que criava o modelo do pydantic a cada
+chamada, com os modelos pré-compilados de `validation.py`, e a
+validação item a item de um lote com a validação numa única chamada.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_validation.py
+"""
+from typing import Union
+from decimal import Decimal
+from timeit import repeat
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from pydantic import BaseModel, ValidationError # pylint: disable=wrong-import-position
+from enums import ProductCategory # pylint: disable=wrong-import-position
+from validation import validate_product, validate_products # pylint: disable=wrong-import-position
+
+PRODUCT = {"name": "Coxinha", "price": 5.5, "category": "salgado"}
+BATCH = [{**PRODUCT, "name": f"Coxinha {i}"} for i in range(1000)]
+
+def old_is_valide_product_json(product_dict: dict) -> bool:
+    """O validador antigo: o modelo era criado dentro da função."""
+    class BaseProductDict(BaseModel):
+        """Representa a estrutura de um dicionário representando um produto."""
+        name: str
+        price: Union[int, float, Decimal]
+        category: ProductCategory
+    try:
+        _ = BaseProductDict(**product_dict)
+    except ValidationError:
+        return False
+    return True
+
+def bench(label: str, stmt, number: int) -> float:
+    """Executa `stmt` e imprime o melhor tempo por chamada, em microssegundos."""
+    best = min(repeat(stmt, number=number, repeat=5)) / number * 1e6
+    print(f"{label:<40} {best:>12.2f} us")
+    return best
+
+def main() -> None:
+    """Executa os benchmarks."""
+    print("== Um produto ==")
+    old = bench("modelo criado a cada chamada", lambda: old_is_valide_product_json(PRODUCT), 200)
+    new = bench("modelo pré-compilado", lambda: validate_product(PRODUCT), 20000)
+    print(f"{'ganho':<40} {old / new:>12.1f}x")
+
+    print(f"== Lote de {len(BATCH)} produtos ==")
+    old = bench("item a item (pré-compilado)", lambda: [validate_product(p) for p in BATCH], 20)
+    new = bench("uma chamada (TypeAdapter)", lambda: validate_products(BATCH), 20)
+    print(f"{'ganho':<40} {old / new:>12.1f}x")
+
+if __name__ == "__main__":
+    main()
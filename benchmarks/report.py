@@ -0,0 +1,129 @@
+"""
+Resultados dos benchmarks em JSON, para comparar execuções entre commits.
+
+Cada arquivo guarda a suíte, o commit, a versão do Python e as
+métricas medidas. Cada métrica diz se um valor menor é melhor
+(tempos) ou pior (requisições por segundo), para que `compare`
+saiba o que é uma regressão.
+
+Uso (na raiz do projeto):
+    python benchmarks/report.py base.json novo.json [--threshold 10]
+
+Termina com código 1 se alguma métrica piorar mais que `threshold` %.
+"""
+from typing import Dict, List, Optional, TypedDict
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+class MetricDict(TypedDict):
+    """Uma métrica medida."""
+    value: float
+    unit: str
+    lower_is_better: bool
+
+class ResultsDict(TypedDict):
+    """Um arquivo de resultados."""
+    suite: str
+    commit: Optional[str]
+    python: str
+    created_at: str
+    config: Dict[str, object]
+    metrics: Dict[str, MetricDict]
+
+class RegressionDict(TypedDict):
+    """A diferença de uma métrica entre duas execuções."""
+    name: str
+    base: float
+    new: float
+    change_percent: float
+    regressed: bool
+
+def metric(value: float, unit: str, *, lower_is_better: bool = True) -> MetricDict:
+    """Cria uma métrica."""
+    return {"value": value, "unit": unit, "lower_is_better": lower_is_better}
+
+def current_commit() -> Optional[str]:
+    """Retorna o commit atual do repositório, ou None fora do git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def build_results(
+    suite: str, metrics: Dict[str, MetricDict], config: Optional[Dict[str, object]] = None
+) -> ResultsDict:
+    """Monta o resultado de uma execução."""
+    return {
+        "suite": suite,
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": config or {},
+        "metrics": metrics
+    }
+
+def write_results(results: ResultsDict, path: Optional[str]) -> None:
+    """Salva o resultado em `path` (ou imprime na saída padrão, com `path` None ou "-")."""
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if path is None or path == "-":
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text + "\n")
+
+def compare(base: ResultsDict, new: ResultsDict, threshold_percent: float) -> List[RegressionDict]:
+    """
+    Compara as métricas presentes nas duas execuções. Uma métrica
+    regrediu se piorou mais que `threshold_percent` %.
+    """
+    changes: List[RegressionDict] = []
+    for name, base_metric in base["metrics"].items():
+        new_metric = new["metrics"].get(name)
+        if new_metric is None or not base_metric["value"]:
+            continue
+        change = (new_metric["value"] - base_metric["value"]) / base_metric["value"] * 100
+        worse = change if base_metric["lower_is_better"] else -change
+        changes.append({
+            "name": name,
+            "base": base_metric["value"],
+            "new": new_metric["value"],
+            "change_percent": round(change, 2),
+            "regressed": worse > threshold_percent
+        })
+    return changes
+
+def main() -> None:
+    """Compara dois arquivos de resultados."""
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="piora máxima aceita, em %% (padrão: 10)")
+    args = parser.parse_args()
+    with open(args.base, encoding="utf-8") as file:
+        base: ResultsDict = json.load(file)
+    with open(args.new, encoding="utf-8") as file:
+        new: ResultsDict = json.load(file)
+    changes = compare(base, new, args.threshold)
+    for change in changes:
+        flag = "REGRESSÃO" if change["regressed"] else ""
+        print(
+            f"{change["name"]:<40} {change["base"]:>12.3f} {change["new"]:>12.3f} "
+            f"{change["change_percent"]:>+8.1f}% {flag}"
+        )
+    regressions = [change["name"] for change in changes if change["regressed"]]
+    if regressions:
+        print(f"{len(regressions)} métrica(s) pioraram mais de {args.threshold}%.", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os módulos em `backend` se importam pelo nome (ex.: `import db`),
+# como quando a aplicação roda de dentro da pasta `backend`.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
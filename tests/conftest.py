@@ -0,0 +1,13 @@
+import pytest
+
+class FakeClock:
+    """Relógio manual: os testes avançam o tempo mudando `now`."""
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    """Relógio manual para os testes de backoff, TTL e janelas de tempo."""
+    return FakeClock()
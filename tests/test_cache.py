@@ -0,0 +1,36 @@
+from backend import cache
+
+def test_tag_invalidation():
+    """Testa se a invalidação remove apenas as entradas com a tag."""
+    cache_ = cache.TaggedLRUCache()
+    cache_.set("lista", [1, 2], tags=("list",), generation=cache_.generation)
+    cache_.set("id-1", [1], tags=(("id", 1),), generation=cache_.generation)
+    cache_.set("id-2", [2], tags=(("id", 2),), generation=cache_.generation)
+    cache_.invalidate_tags("list", ("id", 1))
+    assert cache_.get("lista") is cache.MISSING
+    assert cache_.get("id-1") is cache.MISSING
+    assert cache_.get("id-2") == [2]
+    stats = cache_.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+def test_stale_generation():
+    """Testa se uma leitura iniciada antes de uma invalidação é descartada."""
+    cache_ = cache.TaggedLRUCache()
+    generation = cache_.generation
+    cache_.invalidate_tags("list")
+    assert not cache_.set("lista", [1], tags=("list",), generation=generation)
+    assert cache_.get("lista") is cache.MISSING
+
+def test_lru_and_ttl(clock):
+    """Testa a remoção por LRU e por TTL."""
+    cache_ = cache.TaggedLRUCache(max_entries=2, ttl_seconds=10, clock=clock)
+    for key in ("a", "b"):
+        cache_.set(key, key, generation=cache_.generation)
+    cache_.get("a")
+    cache_.set("c", "c", generation=cache_.generation)
+    assert cache_.get("b") is cache.MISSING
+    assert cache_.get("a") == "a"
+    clock.now = 10
+    assert cache_.get("a") is cache.MISSING
+    assert cache_.stats()["evictions"] == 2
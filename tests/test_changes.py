@@ -0,0 +1,23 @@
+import time
+from backend import db, enums
+
+def test_changes_since_cursor():
+    """Testa se `changes` retorna só o que mudou depois do cursor, incluindo as exclusões."""
+    db.drop_db(force_drop=True)
+    db.init_db()
+    first_id = db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+    time.sleep(0.01)
+    cursor = db.changes(None, 10)["next_cursor"]
+    # O cursor inicial volta CHANGES_GRACE_SECONDS: a Coxinha pode vir de novo.
+    second_id = db.insert("Suco", enums.ProductCategory.BEBIDAS, 4)
+    db.update(("id", second_id), price=4.5)
+    db.delete(("id", first_id))
+
+    upserted, deleted = {}, set()
+    page = {"next_cursor": cursor, "has_more": True}
+    while page["has_more"]:
+        page = db.changes(page["next_cursor"], 1)
+        upserted.update({row["id"]: row for row in page["upserted"]})
+        deleted.update(page["deleted"])
+    assert deleted == {first_id}
+    assert str(upserted[second_id]["price"]) == "4.50"
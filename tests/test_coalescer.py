@@ -0,0 +1,36 @@
+from threading import Event
+import pytest
+from backend import coalescer
+
+def test_batches_and_per_operation_errors():
+    """Testa se escritas concorrentes viram um lote e se cada uma recebe o seu resultado."""
+    batches = []
+    release = Event()
+
+    def run_batch(operations):
+        release.wait(1)
+        batches.append(len(operations))
+        return [operation(None) for operation in operations]
+
+    writer = coalescer.WriteCoalescer(run_batch, max_batch=3, linger_seconds=0.05)
+    futures = [writer.submit(lambda _, i=i: i * 10) for i in range(4)]
+    futures.append(writer.submit(lambda _: ValueError("nome repetido")))
+    release.set()
+    assert [future.result(1) for future in futures[:4]] == [0, 10, 20, 30]
+    with pytest.raises(ValueError):
+        futures[4].result(1)
+    writer.close()
+    assert batches[0] == 3 and sum(batches) == 5
+    assert writer.stats()["operations"] == 5
+
+def test_failed_batch_fails_every_write():
+    """Testa se um erro no lote inteiro (ex.: no commit) chega a todos."""
+    def run_batch(operations):
+        raise ConnectionError("sem conexão")
+
+    writer = coalescer.WriteCoalescer(run_batch, linger_seconds=0.01)
+    futures = [writer.submit(lambda _: None) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(1)
+    writer.close()
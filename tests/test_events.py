@@ -0,0 +1,22 @@
+import pytest
+from backend import events
+
+def test_publish_and_overflow():
+    """Testa a entrega dos eventos e a troca da fila cheia por um `resync`."""
+    broker = events.EventBroker(queue_size=2, max_subscribers=2)
+    fast, slow = broker.subscribe(), broker.subscribe()
+    with pytest.raises(events.TooManySubscribersError):
+        broker.subscribe()
+    broker.publish("product_created", {"id": 1})
+    assert fast.get(timeout=0) == {"id": 1, "type": "product_created", "data": {"id": 1}}
+    broker.publish("product_deleted", {"id": 1})
+    broker.publish("db_down")
+    assert fast.get(timeout=0)["type"] == "product_deleted"
+    assert fast.get(timeout=0)["type"] == "db_down"
+    assert slow.get(timeout=0) == {"id": 3, "type": events.RESYNC_EVENT, "data": None}
+    assert slow.get(timeout=0) is None
+    slow.close()
+    assert len(broker) == 1
+    assert events.format_sse({"id": 4, "type": "db_up", "data": None}, lambda _: "null") == (
+        "id: 4\nevent: db_up\ndata: null\n\n"
+    )
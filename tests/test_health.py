@@ -0,0 +1,52 @@
+from mysql.connector.errors import DatabaseError
+from backend import health
+
+def test_breaker_backoff(clock):
+    """Testa as transições e o backoff exponencial do circuit breaker."""
+    transitions = []
+    breaker = health.CircuitBreaker(base_backoff=1, max_backoff=4, clock=clock)
+    breaker.add_listener(lambda old, new: transitions.append((old, new)))
+    assert breaker.begin_probe()
+    breaker.record_success()
+    assert breaker.is_available()
+    breaker.record_failure()
+    assert breaker.state == health.OPEN
+    assert not breaker.begin_probe()
+    for expected_backoff in (2, 4, 4):
+        clock.now += breaker.retry_after()
+        assert breaker.begin_probe()
+        assert breaker.state == health.HALF_OPEN
+        breaker.record_failure()
+        assert breaker.retry_after() == expected_backoff
+    clock.now += breaker.retry_after()
+    assert breaker.begin_probe()
+    breaker.record_success()
+    assert breaker.is_available()
+    assert transitions[:3] == [
+        (health.OPEN, health.HALF_OPEN),
+        (health.HALF_OPEN, health.CLOSED),
+        (health.CLOSED, health.OPEN)
+    ]
+
+def test_monitor_report_error():
+    """Testa se um erro de conexão numa rota abre o circuito."""
+    breaker = health.CircuitBreaker()
+    monitor = health.HealthMonitor(lambda: True, breaker)
+    monitor.check()
+    assert breaker.is_available()
+    monitor.report_error(ValueError())
+    assert breaker.is_available()
+    monitor.report_error(health.Error(msg="Lock wait timeout", errno=1205))
+    assert breaker.is_available()
+    monitor.report_error(health.InterfaceError())
+    assert not breaker.is_available()
+
+def test_connection_error_by_errno():
+    """Testa se o `DatabaseError` da extensão em C com o código 2003 conta como DB fora do ar."""
+    breaker = health.CircuitBreaker()
+    breaker.record_success()
+    monitor = health.HealthMonitor(lambda: True, breaker)
+    error = DatabaseError(msg="Can't connect to MySQL server", errno=2003)
+    assert health.is_connection_error(error)
+    monitor.report_error(error)
+    assert not breaker.is_available()
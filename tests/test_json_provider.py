@@ -0,0 +1,21 @@
+from decimal import Decimal
+import datetime
+from flask import Flask
+from backend import json_provider
+
+def test_backends_encode_the_same():
+    """Testa se os dois backends convertem `Decimal` e `datetime` igual."""
+    app = Flask(__name__)
+    row = {
+        "id": 1,
+        "name": "Pão de queijo",
+        "price": Decimal("4.50"),
+        "time_stamp": datetime.datetime(2025, 3, 7, 9, 5, 1)
+    }
+    backends = ["stdlib"] + (["orjson"] if json_provider.orjson is not None else [])
+    for backend in backends:
+        provider = json_provider.FastJSONProvider(app, backend) # pyright: ignore[reportArgumentType]
+        decoded = provider.loads(provider.dumps(row))
+        assert decoded["price"] == "4.50"
+        assert decoded["time_stamp"] == "2025-03-07T09:05:01"
+        assert decoded["name"] == "Pão de queijo"
@@ -0,0 +1,41 @@
+import pytest
+from backend import metrics
+
+def test_histogram_buckets_are_cumulative():
+    """Testa se os buckets do histograma são acumulados e se o +Inf conta tudo."""
+    registry = metrics.Registry()
+    histogram = registry.histogram("latency_seconds", "Latência.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+    assert histogram.snapshot("/a") == ([2, 3, 4], 3.65, 4)
+    assert histogram.snapshot("/b") is None
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+
+def test_counter_gauges_and_label_escaping():
+    """Testa os contadores, os gauges lidos de funções e o escape dos labels."""
+    registry = metrics.Registry()
+    counter = registry.counter("responses_total", "Respostas.", ("status",))
+    counter.inc('5"00')
+    counter.inc('5"00', amount=2)
+    with pytest.raises(ValueError):
+        counter.inc("200", amount=-1)
+    registry.gauge("subscribers", "Assinantes.", lambda: 3)
+    registry.stats("pool", "Pool", lambda: {"size": 2, "enabled": True, "name": "x"})
+    registry.stats("cache", "Cache", lambda: None)
+    text = registry.render()
+    assert 'responses_total{status="5\\"00"} 3' in text
+    assert "subscribers 3" in text
+    assert "pool_size 2" in text
+    assert "pool_enabled" not in text and "pool_name" not in text and "cache_" not in text
+
+def test_registering_again_reuses_the_metric():
+    """Testa se registrar a mesma métrica de novo a reaproveita, e se outro tipo falha."""
+    registry = metrics.Registry()
+    counter = registry.counter("hits_total", "Acertos.")
+    assert registry.counter("hits_total", "Acertos.") is counter
+    with pytest.raises(ValueError):
+        registry.histogram("hits_total", "Acertos.")
@@ -0,0 +1,56 @@
+from threading import Thread
+from time import sleep
+import pytest
+from backend import pool
+
+class FakeConnection:
+    """Conexão falsa para testar o pool sem um servidor MySQL."""
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+
+def make_pool(**options):
+    """Cria um pool de conexões falsas."""
+    return pool.ConnectionPool(
+        FakeConnection,
+        close=lambda conn: setattr(conn, "closed", True),
+        ping=lambda conn: conn.alive,
+        **options
+    )
+
+def test_reuse_connection():
+    """Testa se uma conexão devolvida é reutilizada."""
+    pool_ = make_pool(max_size=2)
+    conn1 = pool_.acquire()
+    pool_.release(conn1)
+    conn2 = pool_.acquire()
+    assert conn1 is conn2
+    stats = pool_.stats()
+    assert stats["created"] == 1
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+
+def test_acquire_timeout():
+    """Testa o tempo limite quando o pool está cheio."""
+    pool_ = make_pool(max_size=1, acquire_timeout=0.05)
+    conn = pool_.acquire()
+    with pytest.raises(pool.PoolTimeoutError):
+        pool_.acquire()
+    assert pool_.stats()["timeouts"] == 1
+    Thread(target=lambda: (sleep(0.05), pool_.release(conn))).start()
+    assert pool_.acquire(timeout=1) is conn
+
+def test_recycle_stale_connection():
+    """Testa a reciclagem de conexões quebradas e antigas."""
+    pool_ = make_pool(max_size=1, ping_after_seconds=0)
+    conn1 = pool_.acquire()
+    pool_.release(conn1)
+    conn1.alive = False
+    conn2 = pool_.acquire()
+    assert conn2 is not conn1
+    assert conn1.closed
+    pool_.release(conn2)
+    pool_.max_lifetime_seconds = 0
+    conn3 = pool_.acquire()
+    assert conn3 is not conn2
+    assert pool_.stats()["recycled"] == 2
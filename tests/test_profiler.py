@@ -0,0 +1,46 @@
+import os
+import time
+import pstats
+from backend import profiler
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+def test_token_and_sampling_choose_requests(tmp_path):
+    """Testa se o cabeçalho com o token (e só ele) ou o sorteio escolhem a requisição."""
+    request_profiler = profiler.RequestProfiler(
+        str(tmp_path), sample_rate=0.5, token="segredo", chance=lambda: 0.9
+    )
+    assert request_profiler.should_profile("segredo")
+    assert not request_profiler.should_profile("errado")
+    assert not request_profiler.should_profile(None)
+    request_profiler.sample_rate = 1.0
+    assert request_profiler.should_profile(None)
+
+def test_pstats_profile_and_file_limit(tmp_path):
+    """Testa o perfil do cProfile, um perfil por vez e o limite de arquivos."""
+    request_profiler = profiler.RequestProfiler(str(tmp_path), max_files=2)
+    names = []
+    for _ in range(3):
+        profile = request_profiler.start("GET /api/products")
+        assert profile is not None
+        assert request_profiler.start("GET /api/products") is None
+        busy_work(0.01)
+        names.append(profile.stop())
+    assert sorted(os.listdir(tmp_path)) == names[1:]
+    assert names[0].endswith("-GET_api_products.prof")
+    stats = pstats.Stats(os.path.join(tmp_path, names[-1]))
+    assert any(function[2] == "busy_work" for function in stats.stats) # pyright: ignore[reportAttributeAccessIssue]
+
+def test_collapsed_stacks(tmp_path):
+    """Testa se o formato "collapsed" grava as pilhas da thread medida."""
+    request_profiler = profiler.RequestProfiler(str(tmp_path), output_format="collapsed")
+    profile = request_profiler.start("GET /")
+    busy_work(0.05)
+    name = profile.stop() # pyright: ignore[reportOptionalMemberAccess]
+    with open(os.path.join(tmp_path, name), encoding="utf-8") as file:
+        lines = file.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("test_profiler.py:busy_work" in line for line in lines)
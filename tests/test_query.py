@@ -0,0 +1,47 @@
+from decimal import Decimal
+import pytest
+from backend import query, enums
+
+TABLE = query.Table("produtos", ("id", "name", "category", "price"), decimal_columns=("price",))
+
+def test_select_conditions():
+    """Testa o SELECT com vários operadores, ordenação e limite."""
+    cmd, values = TABLE.select(
+        ("id", "name"),
+        [
+            query.in_("id", [1, 2, 3]),
+            query.between("price", 4, 5.5),
+            query.starts_with("name", "50%"),
+            query.eq("category", enums.ProductCategory.DOCES)
+        ],
+        order_by=("-price", "id"),
+        limit=10
+    )
+    assert cmd == (
+        "SELECT id, name FROM `produtos` WHERE id IN (%s, %s, %s) AND "
+        "price BETWEEN %s AND %s AND name LIKE %s AND category = %s "
+        "ORDER BY price DESC, id ASC LIMIT %s"
+    )
+    assert values == [1, 2, 3, Decimal("4"), Decimal("5.5"), "50\\%%", "doce", 10]
+
+def test_compiled_once_per_shape():
+    """Testa se o SQL de um mesmo formato é compilado uma única vez."""
+    before = TABLE.compiled_stats()["update"]
+    first = TABLE.update({"price": 1}, [query.eq("id", 1)])
+    second = TABLE.update({"price": 2}, [query.eq("id", 7)])
+    after = TABLE.compiled_stats()["update"]
+    assert first[0] == second[0]
+    assert second[1] == [Decimal("2"), 7]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+def test_invalid_columns():
+    """Testa se colunas fora da tabela e condições vazias são recusadas."""
+    with pytest.raises(ValueError):
+        TABLE.select(("id; DROP TABLE produtos",))
+    with pytest.raises(ValueError):
+        TABLE.select(order_by=("nome",))
+    with pytest.raises(ValueError):
+        TABLE.delete([])
+    with pytest.raises(ValueError):
+        TABLE.delete([query.in_("id", [])])
@@ -0,0 +1,31 @@
+from backend import ratelimit
+
+def test_memory_bucket(clock):
+    """Testa a rajada, o reabastecimento e o tempo de espera."""
+    store = ratelimit.MemoryBucketStore(clock=clock)
+    assert store.take("a", 2, 0.5) == (True, 0.0)
+    assert store.take("a", 2, 0.5) == (True, 0.0)
+    assert store.take("a", 2, 0.5) == (False, 2.0)
+    assert store.take("b", 2, 0.5)[0]
+    clock.now = 2
+    assert store.take("a", 2, 0.5)[0]
+
+def test_memory_bucket_eviction(clock):
+    """Testa a remoção de buckets parados e dos menos usados."""
+    store = ratelimit.MemoryBucketStore(max_keys=2, idle_seconds=10, clock=clock)
+    for key in ("a", "b", "c"):
+        store.take(key, 1, 1)
+    assert len(store) == 2
+    clock.now = 10
+    store.take("d", 1, 1)
+    assert len(store) == 1
+
+def test_sqlite_bucket(tmp_path):
+    """Testa os buckets compartilhados em SQLite."""
+    path = str(tmp_path / "buckets.sqlite3")
+    store1 = ratelimit.SQLiteBucketStore(path)
+    store2 = ratelimit.SQLiteBucketStore(path)
+    assert store1.take("a", 1, 0.001)[0]
+    allowed, retry_after = store2.take("a", 1, 0.001)
+    assert not allowed
+    assert retry_after > 0
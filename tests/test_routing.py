@@ -0,0 +1,104 @@
+import pytest
+from mysql.connector.errors import DatabaseError
+from backend import config, db, enums, routing, storage
+
+def test_router_strategies_and_ejection(clock):
+    """Testa o rodízio, a réplica menos ocupada e a saída de uma réplica que falhou."""
+    router = routing.ReplicaRouter({"a": 1, "b": 2}, eject_seconds=5, clock=clock)
+    names = [router.choose()[0] for _ in range(4)]
+    assert names == ["a", "b", "a", "b"]
+    for name in names:
+        router.release(name)
+    router.release(router.choose()[0], failed=True)
+    assert [router.choose()[0] for _ in range(2)] == ["b", "b"]
+    router.release("b")
+    router.release("b")
+    clock.now += 5
+    # Passado o tempo fora, uma única leitura testa a réplica.
+    assert router.choose()[0] == "a"
+    assert router.choose()[0] == "b"
+    router.release("a")
+    router.release("b")
+    assert {stats["name"]: stats["state"] for stats in router.stats()} == {"a": "closed", "b": "closed"}
+
+    busy = routing.ReplicaRouter({"a": 1, "b": 2}, strategy="least_busy")
+    assert busy.choose()[0] == "a"
+    assert [busy.choose()[0] for _ in range(2)] == ["b", "a"]
+    busy.release("a")
+    busy.release("a")
+    assert busy.choose()[0] == "a"
+
+def test_recent_writers(clock):
+    """Testa a janela em que as leituras de quem escreveu vão ao primário."""
+    writers = routing.RecentWriters(1.0, max_clients=2, clock=clock)
+    writers.record_write("a")
+    assert writers.wrote_recently("a") and writers.any_recent()
+    assert not writers.wrote_recently("b") and not writers.wrote_recently(None)
+    writers.record_write("b")
+    writers.record_write("c")
+    assert not writers.wrote_recently("a")
+    clock.now += 1
+    assert not writers.wrote_recently("c") and not writers.any_recent()
+
+@pytest.fixture
+def replicated_db(tmp_path):
+    """Um primário e duas réplicas do SQLite; cada réplica tem um produto só dela."""
+    db.configure_backend("sqlite", path=str(tmp_path / "primary.sqlite3"))
+    db.init_db()
+    dsns = []
+    for name in ("r1", "r2"):
+        dsn = f"sqlite:///{tmp_path / name}.sqlite3"
+        replica = storage.backend_from_dsn(dsn)
+        replica.create_schema()
+        conn = replica.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO produtos (name, category, price) VALUES (%s, %s, %s)",
+            (name, enums.ProductCategory.SALGADOS.value, "1.00")
+        )
+        conn.commit()
+        conn.close()
+        dsns.append(dsn)
+    db.configure_cache(enabled=False)
+    db.configure_replicas(dsns, read_your_writes_seconds=60)
+    yield dsns
+    db.configure_replicas((), read_your_writes_seconds=config.DB_READ_YOUR_WRITES_MS / 1000)
+    db.configure_cache()
+    db.drop_db()
+    db.configure_backend()
+
+def _names():
+    return [row["name"] for row in db.select(("name",)) or []]
+
+def test_reads_go_to_replicas(replicated_db):
+    """Testa se as leituras alternam entre as réplicas e se quem escreveu lê do primário."""
+    assert [_names() for _ in range(2)] == [["r1"], ["r2"]]
+    token = db.bind_client("cliente")
+    try:
+        db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+        assert _names() == ["Coxinha"]
+    finally:
+        db.unbind_client(token)
+    with db.primary_reads():
+        assert _names() == ["Coxinha"]
+    assert _names() in (["r1"], ["r2"])
+
+def test_failed_replica_is_ejected(replicated_db, tmp_path):
+    """Testa se uma réplica fora do ar sai do rodízio e a leitura vai ao primário."""
+    broken = f"sqlite:///{tmp_path / 'nao-existe' / 'r3.sqlite3'}"
+    db.configure_replicas([broken, replicated_db[0]])
+    db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+    assert _names() == ["Coxinha"]
+    assert [_names() for _ in range(2)] == [["r1"], ["r1"]]
+    stats = {replica["name"]: replica for replica in db.replica_stats()}
+    assert stats[storage.redact_dsn(broken)]["state"] == "open"
+    assert stats[storage.redact_dsn(broken)]["failures"] == 1
+
+def test_replica_down_by_errno(replicated_db, monkeypatch):
+    """Testa se o `DatabaseError` 2003 de uma réplica a tira do rodízio e a leitura vai ao primário."""
+    def replica_down(pool, query):
+        raise DatabaseError(msg="Can't connect to MySQL server", errno=2003)
+    monkeypatch.setattr(db, "_read_on_replica", replica_down)
+    assert _names() == []
+    states = sorted((replica["state"], replica["failures"]) for replica in db.replica_stats())
+    assert states == [("closed", 0), ("open", 1)]
@@ -0,0 +1,41 @@
+import pytest
+from backend import db, enums, config
+
+# O `EXPLAIN` e o `ANALYZE TABLE` usados aqui são os do MySQL.
+pytestmark = pytest.mark.skipif(config.DB_BACKEND != "mysql", reason="precisa do MySQL")
+
+def _uses_index(plan: list) -> bool:
+    """Retorna se nenhuma tabela do `EXPLAIN` é lida por varredura completa."""
+    return all(row["type"] != "ALL" and row["key"] is not None for row in plan)
+
+def test_search_uses_indexes():
+    """Testa, com `EXPLAIN`, se as buscas mais comuns usam um índice."""
+    db.drop_db(force_drop=True)
+    db.init_db()
+    categories = list(enums.ProductCategory)
+    db.insert_many([
+        {"name": f"Produto {i:04d}", "category": categories[i % len(categories)], "price": i / 4}
+        for i in range(2000)
+    ])
+    conn, cursor = db.start_connection()
+    cursor.execute("ANALYZE TABLE produtos")
+    cursor.fetchall()
+    db.close_connection(conn, cursor)
+
+    common_filters = [
+        {"category": enums.ProductCategory.DOCES, "min_price": 10, "max_price": 20},
+        {"category": enums.ProductCategory.BEBIDAS, "sort": enums.ProductSort.PRICE, "limit": 10},
+        {"min_price": 100, "max_price": 110},
+        {"name_prefix": "Produto 012"}
+    ]
+    for filters in common_filters:
+        plan = db.explain_search(**filters) # pyright: ignore[reportArgumentType]
+        assert _uses_index(plan), (filters, plan)
+
+    products = db.search(
+        category=enums.ProductCategory.DOCES, min_price=10, max_price=20,
+        sort=enums.ProductSort.PRICE_DESC
+    ) or []
+    prices = [product["price"] for product in products]
+    assert prices and prices == sorted(prices, reverse=True)
+    assert all(product["category"] == "doce" for product in products)
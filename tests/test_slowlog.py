@@ -0,0 +1,30 @@
+from backend import slowlog
+
+def test_only_slow_queries_are_recorded():
+    """Testa se só os comandos acima do limite são guardados, e só os mais recentes."""
+    log = slowlog.SlowQueryLog(threshold_seconds=0.1, max_entries=2)
+    log.record("SELECT 1", "SELECT 1", (), -1, 0.05)
+    for rows in (1, 2, 3):
+        log.record("DELETE FROM t WHERE id = %s", "DELETE FROM t WHERE id = %s", (rows,), rows, 0.2)
+    entries = log.entries()
+    assert [entry["rows"] for entry in entries] == [2, 3]
+    assert entries[0]["parameters"] == 1 and entries[0]["duration_ms"] == 200.0
+    assert entries[0]["explain"] is None
+
+def test_explain_runs_once_per_statement_shape():
+    """Testa se o EXPLAIN roda só para SELECTs e uma vez por formato dentro do intervalo."""
+    calls = []
+
+    def explain(cmd, values):
+        calls.append(cmd)
+        return [{"type": "ALL", "rows": 10}]
+
+    log = slowlog.SlowQueryLog(threshold_seconds=0, explain=explain, explain_interval=60)
+    log.record("SELECT * FROM t", "SELECT * FROM t", (), -1, 1.0)
+    log.record("SELECT * FROM t", "SELECT * FROM t", (), -1, 1.0)
+    log.record("UPDATE t SET a = %s", "UPDATE t SET a = %s", (1,), 1, 1.0)
+    entries = log.entries()
+    assert calls == ["SELECT * FROM t"]
+    assert entries[0]["explain"] == [{"type": "ALL", "rows": 10}]
+    assert entries[0]["rows"] is None
+    assert entries[1]["explain"] is None and entries[2]["explain"] is None
@@ -0,0 +1,20 @@
+from backend import statements
+
+def test_lru_eviction_closes_cursor():
+    """Testa se o cursor menos usado é fechado ao passar do tamanho máximo."""
+    closed = []
+    cache = statements.PreparedStatementCache(
+        lambda dictionary: object(), close=closed.append, max_size=2
+    )
+    first = cache.get("SELECT 1")
+    cache.get("SELECT 2")
+    assert cache.get("SELECT 1") is first
+    cache.get("SELECT 3")
+    assert len(cache) == 2
+    assert len(closed) == 1 and closed[0] is not first
+    assert cache.get("SELECT 1", dictionary=True) is not first
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 2
+    cache.clear()
+    assert len(cache) == 0 and len(closed) == 4
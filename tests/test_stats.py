@@ -0,0 +1,36 @@
+from decimal import Decimal
+from backend import stats
+
+def test_summary_follows_writes():
+    """Testa se o resumo acompanha inserções, mudanças e remoções."""
+    db_rows = {1: ("doce", Decimal("2.00")), 2: ("doce", Decimal("5.00")), 3: ("bebida", Decimal("4.50"))}
+    summary = stats.CategorySummary(
+        lambda: [(id_, *row) for id_, row in db_rows.items()],
+        lambda ids: [(id_, *db_rows[id_]) for id_ in ids if id_ in db_rows]
+    )
+    summary.reload()
+    by_category = {row["category"]: row for row in summary.stats()}
+    assert by_category["doce"]["count"] == 2
+    assert by_category["doce"]["avg_price"] == Decimal("3.50")
+    assert by_category["salgado"] == {
+        "category": "salgado", "count": 0, "min_price": None, "avg_price": None, "max_price": None
+    }
+
+    del db_rows[1] # o mais barato
+    db_rows[3] = ("doce", Decimal("9.00"))
+    db_rows[4] = ("salgado", Decimal("6.00"))
+    summary.refresh([1, 3, 4])
+    by_category = {row["category"]: row for row in summary.stats()}
+    assert by_category["doce"]["count"] == 2
+    assert by_category["doce"]["min_price"] == Decimal("5.00")
+    assert by_category["doce"]["max_price"] == Decimal("9.00")
+    assert by_category["bebida"]["count"] == 0
+    assert by_category["salgado"]["avg_price"] == Decimal("6.00")
+
+    group_by = [
+        {"category": "doce", "count": 2, "total": Decimal("14.00"),
+         "min_price": Decimal("5.00"), "max_price": Decimal("9.00")},
+        {"category": "salgado", "count": 1, "total": Decimal("6.00"),
+         "min_price": Decimal("6.00"), "max_price": Decimal("6.00")}
+    ]
+    assert summary.stats() == stats.stats_from_totals(group_by)
@@ -0,0 +1,124 @@
+from decimal import Decimal
+import sqlite3
+import pytest
+from mysql.connector.errors import DatabaseError, IntegrityError, ProgrammingError
+from backend import db, enums, health, storage
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Usa um banco do SQLite num arquivo temporário durante o teste."""
+    db.configure_backend("sqlite", path=str(tmp_path / "cantina.sqlite3"))
+    db.init_db()
+    yield
+    db.drop_db()
+    db.configure_backend()
+
+def test_sqlite_crud(sqlite_db):
+    """Testa inserir, listar, atualizar e apagar produtos no backend SQLite."""
+    id_ = db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5.5)
+    db.insert_many([
+        {"name": "Suco", "category": enums.ProductCategory.BEBIDAS, "price": 4},
+        {"name": "Brigadeiro", "category": enums.ProductCategory.DOCES, "price": 2.25}
+    ])
+    product = db.select(id=id_)[0]
+    assert product["name"] == "Coxinha" and product["price"] == Decimal("5.50")
+    # Os mesmos valores também contam como uma linha encontrada.
+    assert db.update(("id", id_), price=5.5) == 1
+    assert db.update(("id", id_), price=6) == 1
+    assert db.select(id=id_)[0]["price"] == Decimal("6.00")
+    assert db.delete(("id", id_)) == 1
+    assert [row["name"] for row in db.select(order_by_columns=("name",))] == ["Brigadeiro", "Suco"]
+
+def test_insert_row_matches_select(sqlite_db):
+    """Testa se a linha retornada pelo INSERT é igual à relida, com as datas do DB e o preço arredondado."""
+    product = db.insert_row("Coxinha", enums.ProductCategory.SALGADOS, Decimal("1.125"))
+    assert product["price"] == Decimal("1.13")
+    with db.primary_reads():
+        assert product == db.select(id=product["id"])[0]
+
+def test_sqlite_names_ignore_accents_and_case(sqlite_db):
+    """Testa se os nomes se comparam como na collation do MySQL: sem acentos e sem maiúsculas."""
+    db.insert("Café", enums.ProductCategory.BEBIDAS, 3)
+    with pytest.raises(IntegrityError):
+        db.insert("CAFE", enums.ProductCategory.BEBIDAS, 3)
+    assert [row["name"] for row in db.search(name_prefix="caf")] == ["Café"]
+    assert not db.search(name_prefix="ca%")
+
+def test_insert_many_when_name_keys_disagree_with_db(sqlite_db, monkeypatch):
+    """Testa se um nome que o DB acha repetido, mas `_name_key` não, vira um erro do item."""
+    db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+    # Diferencia maiúsculas, ao contrário da collation.
+    monkeypatch.setattr(db, "_name_key", lambda name: name)
+    results = db.insert_many([
+        {"name": "COXINHA", "category": enums.ProductCategory.SALGADOS, "price": 5},
+        {"name": "Suco", "category": enums.ProductCategory.BEBIDAS, "price": 4}
+    ])
+    assert results[0]["id"] is None and results[0]["error"]
+    assert results[1]["id"] is not None and results[1]["error"] is None
+
+def test_sqlite_changes(sqlite_db):
+    """Testa se as exclusões deixam registro e `changes` as retorna no SQLite."""
+    cursor = db.changes(None, 10)["next_cursor"]
+    id_ = db.insert("Pastel", enums.ProductCategory.SALGADOS, 7)
+    db.delete(("id", id_))
+    page = db.changes(cursor, 10)
+    assert page["deleted"] == [id_]
+
+def test_catalog_version_per_write(sqlite_db):
+    """Testa se cada escrita avança a versão uma vez e só invalida o cache afetado."""
+    first = db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+    second = db.insert("Suco", enums.ProductCategory.BEBIDAS, 4)
+    version = int(db.catalog_version())
+    db.select(id=first)
+    db.update_many(ids=[first, second], price_factor=2)
+    assert db.known_catalog_version() == db.catalog_version() == str(version + 1)
+    db.select(id=first)
+    hits = db.cache_stats()["hits"]
+    db.update(("id", second), price=3)
+    assert db.select(id=first)[0]["price"] == Decimal("10.00")
+    assert db.cache_stats()["hits"] == hits + 1
+
+def test_catalog_version_sees_other_writers(sqlite_db, tmp_path):
+    """Testa se a escrita de outro processo muda a versão do catálogo e limpa o cache."""
+    id_ = db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+    version = db.catalog_version()
+    assert db.select(id=id_)[0]["price"] == Decimal("5.00")
+    # Uma conexão própria, como a de outro processo.
+    other = storage.SQLiteBackend(path=str(tmp_path / "cantina.sqlite3")).connect()
+    cursor = other.cursor()
+    cursor.execute("UPDATE produtos SET price = 6 WHERE id = %s", (id_,))
+    cursor.execute("UPDATE catalogo_versao SET versao = versao + 1 WHERE id = 1")
+    other.commit()
+    other.close()
+    assert db.known_catalog_version() == version
+    assert db.catalog_version() != version
+    assert db.select(id=id_)[0]["price"] == Decimal("6.00")
+
+def test_sqlite_lock_does_not_open_breaker(tmp_path):
+    """Testa se o banco travado por outra escrita não conta como DB fora do ar."""
+    path = str(tmp_path / "cantina.sqlite3")
+    db.configure_backend("sqlite", path=path, timeout=0.05)
+    db.init_db()
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    breaker = health.CircuitBreaker()
+    breaker.record_success()
+    monitor = health.HealthMonitor(lambda: True, breaker)
+    try:
+        with pytest.raises(DatabaseError) as error:
+            db.insert("Coxinha", enums.ProductCategory.SALGADOS, 5)
+        assert not health.is_connection_error(error.value)
+        monitor.report_error(error.value)
+        assert breaker.is_available()
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    # Um comando inválido também não é uma falha de conexão.
+    conn, cursor = db.start_connection()
+    try:
+        with pytest.raises(ProgrammingError):
+            cursor.execute("SELECT * FROM nao_existe")
+    finally:
+        db.close_connection(conn, cursor, with_commit=False)
+        db.drop_db()
+        db.configure_backend()
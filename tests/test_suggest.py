@@ -0,0 +1,31 @@
+from backend import suggest
+
+def test_prefix_lookup_ignores_accents_and_case():
+    """Testa se as sugestões ignoram acentos e maiúsculas e saem em ordem."""
+    rows = [(1, "Pão de Queijo"), (2, "Café"), (3, "pastel"), (4, "Paçoca")]
+    index = suggest.PrefixIndex(lambda: rows, lambda ids: [])
+    index.reload()
+    assert [s["name"] for s in index.suggest("PA")] == ["Paçoca", "Pão de Queijo", "pastel"]
+    assert index.suggest("cafe") == [{"id": 2, "name": "Café"}]
+    assert len(index.suggest("pa", limit=2)) == 2
+    assert not index.suggest("x")
+
+def test_refresh_and_max_entries():
+    """Testa a atualização por ids e o limite de nomes guardados."""
+    db_rows = {1: "Coxinha", 2: "Suco"}
+    index = suggest.PrefixIndex(
+        lambda: list(db_rows.items()),
+        lambda ids: [(id_, db_rows[id_]) for id_ in ids if id_ in db_rows],
+        max_entries=2
+    )
+    index.reload()
+    db_rows[1] = "Empada"
+    del db_rows[2]
+    index.refresh([1, 2])
+    assert not index.suggest("co") and not index.suggest("su")
+    assert index.suggest("emp") == [{"id": 1, "name": "Empada"}]
+    db_rows.update({3: "Bolo", 4: "Brigadeiro"})
+    index.refresh([3, 4])
+    assert len(index) == 2 and not index.complete
+    index.invalidate()
+    assert not index.loaded
@@ -1,3 +1,4 @@
+import pytest
 from backend import utils
 
 def test_to_unique_depth():
@@ -8,3 +9,17 @@ def test_to_unique_depth():
     sequence2 = {"name": "Coxinha", "price": 5.2}
     expected2 = ("name", "Coxinha", "price", 5.2)
     assert utils.to_unique_depth(sequence2) == expected2
+
+def test_cursor_round_trip():
+    """Testa as funções `encode_cursor` e `decode_cursor`."""
+    cursor = utils.encode_cursor({"after_id": 42})
+    assert utils.decode_cursor(cursor) == {"after_id": 42}
+    with pytest.raises(ValueError):
+        utils.decode_cursor("não é um cursor")
+    # Um `after_id` que não é um número nem um texto viraria um TypeError no `int`.
+    with pytest.raises(ValueError):
+        utils.decode_cursor(utils.encode_cursor({"after_id": [1]}))
+    with pytest.raises(ValueError):
+        utils.decode_cursor(utils.encode_cursor({"after_id": {"id": 1}}))
+    with pytest.raises(ValueError):
+        utils.decode_cursor(utils.encode_cursor({"after_id": None}))
@@ -0,0 +1,31 @@
+from backend import validation
+
+def test_partial_product():
+    """Testa a validação parcial usada no PUT."""
+    fields, errors = validation.validate_product({"price": 4.5}, partial=True)
+    assert errors is None
+    assert fields == {"price": 4.5}
+    fields, errors = validation.validate_product({"id": 1, "price": 4.5}, partial=True)
+    assert fields is None and errors
+    fields, errors = validation.validate_product({}, partial=True)
+    assert fields is None and errors
+
+def test_partial_product_rejects_null():
+    """Testa se a validação parcial recusa campos enviados como null."""
+    fields, errors = validation.validate_product({"name": None}, partial=True)
+    assert fields is None and errors and errors[0]["loc"] == ("name",)
+    fields, errors = validation.validate_product({"price": None}, partial=True)
+    assert fields is None and errors and errors[0]["loc"][:1] == ("price",)
+
+def test_batch_errors_by_index():
+    """Testa se a validação em lote separa os erros por índice."""
+    products = [
+        {"name": "Coxinha", "price": 5.5, "category": "salgado"},
+        {"name": "Suco", "price": "caro", "category": "bebida"},
+        "não é um produto"
+    ]
+    fields, errors = validation.validate_products(products)
+    assert fields[0] == {"name": "Coxinha", "price": 5.5, "category": "salgado"}
+    assert fields[1] is None and fields[2] is None
+    assert set(errors) == {1, 2}
+    assert all(error["loc"][:1] != (1,) for error in errors[1])